@@ -0,0 +1,289 @@
+"""
+BENCHMARK SUITE FOR THE PERCENTILE ENGINE
+
+Generates synthetic geometric-random-walk price panels (one column per index,
+365 rows per year like the engine's 1825-day windows, staggered start dates)
+and measures how the calculation paths scale:
+
+    stages          load / CAGR / rank / pivot / monthly mean / publish, timed
+                    one by one on the shared engine functions
+    v2              calculate_corrected_method.calculate_final_summary_v2
+    v2_compact      the same with compact=True (float32 / int32 CompactPanel)
+    summary         calculate_summary.calculate_final_summary (old method)
+    cached          calculation_cache.latest_summary (what the comparison
+                    scripts call): a cold run, then a warm one from disk
+
+Every (panel size, target) pair runs in a fresh process so its peak RSS is
+its own. Results go to a JSON file under data/benchmarks/ (not checked in);
+pass an earlier file with --baseline to see which cases got slower.
+
+A full 5-year CAGR plus a 5-year rank window needs ~10 years of rows, so
+shorter panels only measure the path to an empty result; a case that fails
+is recorded with its error instead of stopping the run.
+
+Usage:
+    python benchmark.py                         # standard grid
+    python benchmark.py --preset quick          # smoke test
+    python benchmark.py --indices 50 500 --years 5 10 --targets stages v2
+    python benchmark.py --baseline data/benchmarks/before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import RunReport, peak_rss_mb
+from rolling_engine import DAYS_PER_YEAR
+
+RESULTS_FILE = Path('data/benchmarks/benchmark_results.json')
+REGRESSION_RATIO = 1.2
+
+# (indices, years) grids
+PRESETS = {
+    'quick': [(50, 12), (200, 12)],
+    'standard': [(50, 12), (500, 20), (5000, 40)],
+    'full': [(n, y) for n in (50, 500, 5000) for y in (5, 12, 20, 40)],
+}
+
+TARGETS = ('stages', 'v2', 'v2_compact', 'summary', 'cached')
+
+
+def synthetic_panel(n_indices, years, seed=0):
+    """
+    Wide price frame of geometric random walks.
+
+    Each index gets its own drift (-5%..+20% a year) and volatility
+    (10%..40% a year), starts on a random day in the first 40% of the range,
+    and has ~1% missing days.
+
+    Returns:
+        DataFrame with a DATE column and columns IDX0000, IDX0001, ...
+    """
+    rng = np.random.default_rng(seed)
+    n_days = years * DAYS_PER_YEAR
+    dates = pd.date_range(end='2025-11-14', periods=n_days, freq='D')
+
+    drift = rng.uniform(-0.05, 0.20, n_indices) / DAYS_PER_YEAR
+    vol = rng.uniform(0.10, 0.40, n_indices) / np.sqrt(DAYS_PER_YEAR)
+    log_returns = rng.standard_normal((n_days, n_indices)) * vol + (drift - vol ** 2 / 2)
+    values = np.round(1000 * np.exp(np.cumsum(log_returns, axis=0)), 2)
+
+    starts = rng.integers(0, int(n_days * 0.4), n_indices)
+    values[np.arange(n_days)[:, None] < starts] = np.nan
+    values[rng.random(values.shape) < 0.01] = np.nan
+
+    df = pd.DataFrame(values, columns=[f"IDX{j:04d}" for j in range(n_indices)])
+    df.insert(0, 'DATE', dates)
+    return df
+
+
+def _time_stages(df, workdir):
+    """Per-stage measurements (instrumentation.RunReport records) on the shared engine"""
+    from functools import partial
+
+    from calculate_corrected_method import latest_month_summary, monthly_mean_frame
+    from name_registry import NameRegistry
+    from price_store import build_store, load_price_matrix
+    from rolling_engine import apply_columns, matrix_to_frame, rolling_cagr, rolling_percentile_rank
+    from update_frontend_final import build_frontend_data
+
+    report = RunReport('stages')
+
+    csv_file = Path(workdir) / 'panel.csv'
+    out = df.copy()
+    out['DATE'] = out['DATE'].dt.strftime('%d/%m/%y')
+    out.to_csv(csv_file, index=False)
+    del out
+
+    with report.stage('load_csv', rows=len(df)):
+        build_store(csv_file, cache_dir=Path(workdir) / 'cache')
+
+    with report.stage('load', rows=len(df)):
+        dates, symbols, values = load_price_matrix(csv_file, cache_dir=Path(workdir) / 'cache')
+        values = np.array(values, order='F')
+    observed = ~np.isnan(values)
+    observations = int(observed.sum())
+
+    with report.stage('cagr', rows=observations):
+        cagr = apply_columns(values, partial(rolling_cagr, window=1825, years=5), mask=observed)
+
+    with report.stage('rank', rows=observations):
+        ranks = apply_columns(cagr, partial(rolling_percentile_rank, window=1825), mask=observed, out=cagr)
+
+    with report.stage('pivot') as stage:
+        df_processed = matrix_to_frame(ranks, dates, symbols)
+        stage['rows'] = len(df_processed)
+
+    with report.stage('monthly_mean', rows=len(df_processed)):
+        df_month_mean = monthly_mean_frame(df_processed)
+
+    with report.stage('publish', rows=len(df_month_mean)):
+        df_final_summary = latest_month_summary(df_month_mean)
+        registry = NameRegistry(
+            {'id': symbol, 'csv': symbol, 'display': symbol, 'category': 'Thematic'} for symbol in symbols
+        )
+        corrected = {name: float(value) for name, value in df_final_summary['final_pct_value'].items()}
+        entries, _ = build_frontend_data(corrected, {}, {}, registry)
+        with open(Path(workdir) / 'indices.json', 'w') as f:
+            json.dump(entries, f, indent=2)
+
+    return report.stages
+
+
+def _run_target(target, n_indices, years, seed, workers):
+    """Run one benchmark case (in a child process) and return its record"""
+    df = synthetic_panel(n_indices, years, seed)
+    record = {
+        'target': target,
+        'indices': n_indices,
+        'years': years,
+        'rows': len(df),
+        'observations': int(df.iloc[:, 1:].notna().to_numpy().sum()),
+        'baseline_rss_mb': peak_rss_mb(),
+    }
+
+    start = time.perf_counter()
+    try:
+        _run_case(record, target, df, workers)
+    except Exception as exc:
+        record['error'] = f"{type(exc).__name__}: {exc}"
+    record['seconds'] = time.perf_counter() - start
+    record['peak_rss_mb'] = peak_rss_mb()
+    return record
+
+
+def _run_case(record, target, df, workers):
+    with contextlib.redirect_stdout(io.StringIO()):
+        if target == 'stages':
+            with tempfile.TemporaryDirectory() as workdir:
+                record['stages'] = _time_stages(df, workdir)
+        elif target in ('v2', 'v2_compact'):
+            from calculate_corrected_method import calculate_final_summary_v2
+            report = RunReport('calculate_final_summary_v2')
+            try:
+                calculate_final_summary_v2(
+                    df, workers=workers, report=report, compact=target == 'v2_compact'
+                )
+            finally:
+                record['stages'] = report.stages
+        elif target == 'summary':
+            from calculate_summary import calculate_final_summary
+            calculate_final_summary(df)
+        elif target == 'cached':
+            from calculation_cache import latest_summary
+            with tempfile.TemporaryDirectory() as cache_dir:
+                for run in ('cold', 'warm'):
+                    start = time.perf_counter()
+                    latest_summary(df, 'new', cache_dir=cache_dir, workers=workers)
+                    record[f'{run}_seconds'] = time.perf_counter() - start
+
+
+def _environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare_to_baseline(results, baseline_file):
+    """Print time ratios against an earlier results file; returns slower cases"""
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+    previous = {
+        (r['target'], r['indices'], r['years']): r for r in baseline['results']
+    }
+    slower = []
+    print(f"\nCompared with {baseline_file} ({baseline['environment'].get('commit')}):")
+    for record in results:
+        old = previous.get((record['target'], record['indices'], record['years']))
+        if old is None or 'error' in old or 'error' in record:
+            continue
+        ratio = record['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        flag = '⚠' if ratio > REGRESSION_RATIO else '✓'
+        print(f"  {flag} {record['target']:<42} {record['indices']:>5} x {record['years']:>2}y  "
+              f"{old['seconds']:8.2f}s -> {record['seconds']:8.2f}s  ({ratio:.2f}x)")
+        if ratio > REGRESSION_RATIO:
+            slower.append(record)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the percentile engine on synthetic panels")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='standard')
+    parser.add_argument('--indices', type=int, nargs='+', help="override the preset's index counts")
+    parser.add_argument('--years', type=int, nargs='+', help="override the preset's history lengths")
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS), choices=TARGETS, metavar='TARGET',
+                        help=f"what to run (default: all of {', '.join(TARGETS)})")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for v2")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=str(RESULTS_FILE))
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    if args.indices or args.years:
+        sizes = [(n, y) for n in (args.indices or [50]) for y in (args.years or [5])]
+    else:
+        sizes = PRESETS[args.preset]
+
+    print("="*80)
+    print("PERCENTILE ENGINE BENCHMARK")
+    print("="*80)
+    print()
+
+    results = []
+    for n_indices, years in sizes:
+        for target in args.targets:
+            # Fresh process per case so peak RSS is not shared between cases
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                record = pool.submit(
+                    _run_target, target, n_indices, years, args.seed, args.workers
+                ).result()
+            results.append(record)
+            rss = f"{record['peak_rss_mb']:8.0f} MB" if record['peak_rss_mb'] is not None else ''
+            mark = '⚠' if 'error' in record else '✓'
+            print(f"{mark} {target:<42} {n_indices:>5} x {years:>2}y  {record['seconds']:8.2f}s {rss}")
+            if 'error' in record:
+                print(f"     {record['error']}")
+            for stage in record.get('stages', []):
+                print(f"     {stage['name']:<14} {RunReport.format_stage(stage)}")
+            if 'warm_seconds' in record:
+                print(f"     cold {record['cold_seconds']:.2f}s, warm (from cache) {record['warm_seconds']:.3f}s")
+
+    report = {'environment': _environment(), 'results': results}
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved to: {args.output}")
+
+    if args.baseline:
+        slower = compare_to_baseline(results, args.baseline)
+        if slower:
+            print(f"\n⚠ {len(slower)} case(s) more than {REGRESSION_RATIO:.1f}x slower than the baseline")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,119 +14,155 @@ Key Implementation:
 - Ranking: Today's CAGR vs. recent 5-year CAGR history (NOT all history)
 """
 
+import json
+import os
+from functools import partial
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-def calculate_final_summary_v2(df, date_column='DATE'):
+from compact_panel import CompactPanel, panel_month_means, rank_panel
+from instrumentation import RunReport
+from monthly_history import HISTORY_FILE, history_from_month_mean, save_history
+from name_registry import load_registry
+from price_store import load_prices
+from rolling_engine import (
+    HORIZONS,
+    PrefixSums,
+    apply_columns,
+    bucket_starts,
+    cross_sectional_rank,
+    matrix_to_frame,
+    multi_horizon_rank_frame,
+    parse_window,
+    period_bounds,
+    period_ids,
+    rolling_cagr,
+    rolling_cagr_by_date,
+    rolling_percentile_rank,
+    rolling_percentile_rank_by_date,
+    value_matrix,
+    window_years,
+)
+
+RUN_REPORT_FILE = Path('data/CORRECTED_METHOD1_run_report.json')
+CATEGORY_GROUPS_FILE = Path('data/categorized_indices.json')
+CROSS_SECTION_FILE = Path('data/CROSS_SECTIONAL_summary.xlsx')
+PERIOD_SUMMARY_FILE = Path('data/PERIOD_summary.xlsx')
+
+# Extra summary granularities refreshed with every run ({sheet name: offset
+# alias or period start dates}, see period_mean_frame); the last period of
+# each is the current one so far
+PERIODS = {
+    'weekly': 'W-FRI',
+    'fortnightly': '2W-FRI',
+    'month_to_date': 'MS',
+}
+
+
+def window_kernels(window):
     """
-    Calculate percentile rank using rolling 5-year window method.
-    This matches the notebook implementation.
+    CAGR and rank kernels for a window spec.
     
     Args:
-        df: DataFrame with date column and index value columns
-        date_column: Name of the date column
+        window: Observations (e.g. 1825) or a calendar offset such as '5Y'
     
     Returns:
-        DataFrame with final percentile rankings for the latest month
+        Tuple of (label, cagr kernel, rank kernel, whether the kernels
+        need the row dates passed to apply_columns)
     """
-    
-    print("Step 1: Melting dataframe to long format...")
-    # Melt to long format
-    df_melted = df.melt(
-        id_vars=[date_column], 
-        var_name='SYMBOL', 
-        value_name='VALUE'
-    )
-    df_melted = df_melted.dropna()
-    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
-    df_melted = df_melted.dropna()
-    
-    # Sort by SYMBOL and DATE
-    df_melted = df_melted.sort_values(['SYMBOL', date_column]).reset_index(drop=True)
-    
-    print(f"   Data points: {len(df_melted)}")
-    print(f"   Unique symbols: {df_melted['SYMBOL'].nunique()}")
-    
-    print("\nStep 2: Calculating 5-year rolling CAGR (1825 days)...")
-    # Calculate 5-year rolling CAGR
-    pr_cagr = 1825
-    
-    def calc_cagr(x):
-        """Calculate CAGR: (Value_t / Value_t-1825)^(1/5) - 1"""
-        if len(x) < pr_cagr:
-            return np.nan
-        first, last = x.iloc[0], x.iloc[-1]
-        if first <= 0 or last <= 0:
-            return np.nan
-        return (last / first) ** (1/5) - 1
-    
-    df_melted['Rolling_CAGR'] = (
-        df_melted.groupby('SYMBOL')['VALUE']
-        .rolling(pr_cagr, min_periods=pr_cagr)  # Require full 5 years
-        .apply(calc_cagr, raw=False)
-        .reset_index(level=0, drop=True)
+    # Observation-count windows keep the notebook's 1825 rows = 5 years;
+    # calendar windows ('5Y') look up each start date by binary search
+    window_spec, window = window, parse_window(window)
+    if isinstance(window, int):
+        return (
+            f"{window} days",
+            partial(rolling_cagr, window=window, years=window_years(window)),
+            partial(rolling_percentile_rank, window=window),
+            False,
+        )
+    return (
+        f"calendar {str(window_spec).upper()}",
+        partial(rolling_cagr_by_date, window=window),
+        partial(rolling_percentile_rank_by_date, window=window),
+        True,
     )
+
+
+def monthly_mean_frame(df_processed, prefix_sums=None):
+    """
+    Monthly average percentile per index.
     
-    # Check how many valid CAGRs we have
-    valid_cagr_count = df_melted['Rolling_CAGR'].notna().sum()
-    print(f"   Valid CAGR values: {valid_cagr_count}")
+    Month buckets come from the sorted date index (int month ids, boundary
+    offsets) and the means from cumulative-sum differences with NaN-aware
+    counts (rolling_engine.PrefixSums), for all indices in one NumPy pass.
+    
+    Args:
+        df_processed: Daily percentile ranks (sorted DatetimeIndex x indices)
+        prefix_sums: PrefixSums of df_processed, to share it with other
+            granularities (see period_mean_frame); built if omitted
     
-    print("\nStep 3: Calculating percentile rank (rolling 1825-day window)...")
-    # Calculate percentile rank against rolling 5-year window
-    pr_rank = 1825
-    
-    def percentile_rank_rolling(x):
-        """
-        Rank the LATEST CAGR value against the last 1825 days of CAGR values.
-        This is the KEY difference from the all-history method.
-        """
-        if len(x) < pr_rank:
-            return np.nan
-        x_clean = pd.Series(x).dropna()
-        if len(x_clean) == 0:
-            return np.nan
-        # Rank the most recent value against the window
-        return x_clean.rank(pct=True).iloc[-1]
-    
-    df_melted['Percentile_Rank'] = (
-        df_melted.groupby('SYMBOL')['Rolling_CAGR']
-        .rolling(pr_rank, min_periods=pr_rank)  # Require full 5-year window
-        .apply(percentile_rank_rolling, raw=False)
-        .reset_index(level=0, drop=True)
+    Returns:
+        DataFrame indexed by (year, month), newest month first
+    """
+    if prefix_sums is None:
+        prefix_sums = PrefixSums(df_processed.to_numpy(dtype=np.float64))
+    ids = period_ids(df_processed.index, 'M')
+    starts = bucket_starts(ids)
+    months = ids[starts]
+    index = pd.MultiIndex.from_arrays(
+        [(months // 12 + 1970).astype(np.int32), (months % 12 + 1).astype(np.int32)],
+        names=['year', 'month']
     )
+    df_month_mean = pd.DataFrame(prefix_sums.means(starts), index=index, columns=df_processed.columns)
+    return df_month_mean.iloc[::-1]
+
+
+def period_mean_frame(df_processed, periods='W-FRI', prefix_sums=None):
+    """
+    Average percentile per index for each period of a custom granularity.
     
-    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
+    Only the period boundaries are computed per call; the sums come from the
+    PrefixSums of the daily matrix, so pass the same one to several calls
+    (weekly, fortnightly, month-to-date, ...) to reduce it only once.
     
-    valid_rank_count = len(df_melted)
-    print(f"   Valid percentile ranks: {valid_rank_count}")
+    Args:
+        df_processed: Daily percentile ranks (sorted DatetimeIndex x indices)
+        periods: Pandas offset alias ('W-FRI' weeks ending Friday, '2W-FRI'
+            fortnights, 'SMS' half months, 'MS' months, ...) or explicit
+            period start dates (see rolling_engine.period_bounds)
+        prefix_sums: PrefixSums of df_processed (built if omitted)
     
-    print("\nStep 4: Pivoting back to wide format...")
-    # Pivot back to wide format
-    df_processed = df_melted.pivot_table(
-        values='Percentile_Rank', 
-        index=date_column, 
-        columns='SYMBOL'
+    Returns:
+        DataFrame indexed by the first calendar day of each period
+        (period_start), oldest first; the last row is the current (possibly
+        unfinished) period, e.g. month-to-date
+    """
+    if prefix_sums is None:
+        prefix_sums = PrefixSums(df_processed.to_numpy(dtype=np.float64))
+    labels, starts, ends = period_bounds(df_processed.index, periods)
+    return pd.DataFrame(
+        prefix_sums.means(starts, ends),
+        index=pd.DatetimeIndex(labels, name='period_start'),
+        columns=df_processed.columns
     )
+
+
+def latest_month_summary(df_month_mean, dropna=True):
+    """
+    Latest month's percentile per index (the heatmap values).
     
-    print(f"   Shape: {df_processed.shape}")
-    
-    print("\nStep 5: Calculating monthly averages...")
-    # Calculate monthly averages
-    df_processed['year'] = df_processed.index.year
-    df_processed['month'] = df_processed.index.month
-    df_month_mean = df_processed.groupby(['year', 'month']).mean(numeric_only=True)
-    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
-    
-    print(f"   Months available: {len(df_month_mean)}")
+    Args:
+        df_month_mean: Output of monthly_mean_frame (newest month first)
+        dropna: Leave out indices without a value in the latest month
+            (False keeps them as NaN at the end, like the old method)
     
-    print("\nStep 6: Extracting latest month summary...")
+    Returns:
+        DataFrame indexed by SYMBOL with a final_pct_value column, ascending
+    """
     # Extract most recent month and transpose
     df_final_summary = df_month_mean.reset_index()
-    latest_year = df_final_summary.iloc[0]['year']
-    latest_month = df_final_summary.iloc[0]['month']
-    print(f"   Latest month: {int(latest_year)}-{int(latest_month):02d}")
-    
     df_final_summary = df_final_summary.iloc[0:1, :].transpose()
     df_final_summary.columns = ["final_pct_value"]
     df_final_summary.drop(["year", "month"], inplace=True)
@@ -136,12 +172,320 @@ def calculate_final_summary_v2(df, date_column='DATE'):
         df_final_summary['final_pct_value'], 
         errors='coerce'
     )
-    df_final_summary = df_final_summary.dropna()
+    if dropna:
+        df_final_summary = df_final_summary.dropna()
     df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
+    return df_final_summary
+
+
+def latest_period_summary(df_period_mean):
+    """
+    Latest period's percentile per index, in the layout of
+    latest_month_summary (final_pct_value column, ascending).
+    
+    Args:
+        df_period_mean: Output of period_mean_frame (oldest period first)
+    """
+    df_final_summary = df_period_mean.iloc[-1].dropna().to_frame('final_pct_value')
+    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
+    return df_final_summary
+
+
+def save_period_summaries(period_means, period_file=PERIOD_SUMMARY_FILE):
+    """
+    Write the latest period of each granularity to one workbook, one sheet
+    per name (final_pct_value ascending, plus period_start: the first
+    calendar day of that period).
+    
+    Args:
+        period_means: {name: period_mean_frame output}
+        period_file: Output .xlsx path
+    """
+    with pd.ExcelWriter(period_file) as writer:
+        for name, df_period_mean in period_means.items():
+            df_summary = latest_period_summary(df_period_mean)
+            df_summary['period_start'] = df_period_mean.index[-1]
+            df_summary.to_excel(writer, sheet_name=name)
+    return Path(period_file)
+
+
+def _dense_rank_frame(df, date_column, window, workers, report):
+    """Steps 1-4 of calculate_final_summary_v2 on dense float64 matrices"""
+    print("Step 1: Building wide value matrix...")
+    with report.stage('build_matrix', rows=len(df)) as stage:
+        # Work on the wide 2-D float array directly (no melt/pivot round trip)
+        df = df.sort_values(date_column, kind='mergesort')
+        dates, symbols, values = value_matrix(df, date_column)
+        observed = ~np.isnan(values)
+        stage['observations'] = int(observed.sum())
+    
+    print(f"   Data points: {observed.sum()}")
+    print(f"   Unique symbols: {observed.any(axis=0).sum()}")
+    
+    window_label, cagr_kernel, rank_kernel, by_date = window_kernels(window)
+    kernel_dates = dates if by_date else None
+    
+    print(f"\nStep 2: Calculating {window_years(window):g}-year rolling CAGR ({window_label})...")
+    with report.stage('cagr', rows=int(observed.sum())) as stage:
+        # Vectorized per-symbol CAGR: only the first and last value of each
+        # window matter, so no Python call per window is needed.
+        # With workers > 1 the indices are sharded over a process pool
+        cagr = apply_columns(
+            values,
+            cagr_kernel,
+            mask=observed,
+            workers=workers,
+            dates=kernel_dates
+        )
+        del values
+        
+        # Check how many valid CAGRs we have
+        valid_cagr_count = np.count_nonzero(~np.isnan(cagr))
+        stage['valid'] = int(valid_cagr_count)
+    print(f"   Valid CAGR values: {valid_cagr_count}")
+    
+    print(f"\nStep 3: Calculating percentile rank (rolling {window_label} window)...")
+    with report.stage('rank', rows=int(observed.sum())) as stage:
+        # Rank the LATEST CAGR value against the CAGR values in the window
+        # (sorted-window engine, same average-tie pct rank as pandas).
+        # Ranks overwrite the CAGR matrix in place to keep peak memory down.
+        ranks = apply_columns(
+            cagr,
+            rank_kernel,
+            mask=observed,
+            out=cagr,
+            workers=workers,
+            dates=kernel_dates
+        )
+        
+        valid_rank_count = np.count_nonzero(~np.isnan(ranks))
+        stage['valid'] = int(valid_rank_count)
+    print(f"   Valid percentile ranks: {valid_rank_count}")
+    
+    print("\nStep 4: Labelling wide percentile matrix...")
+    with report.stage('pivot') as stage:
+        df_processed = matrix_to_frame(ranks, dates, symbols, date_column)
+        stage['rows'] = len(df_processed)
+    
+    print(f"   Shape: {df_processed.shape}")
+    return df_processed
+
+
+def _compact_month_means(df, date_column, window, report):
+    """Steps 1-5 of calculate_final_summary_v2 on a CompactPanel"""
+    print("Step 1: Building compact panel (float32 values, int32 days)...")
+    with report.stage('build_matrix', rows=len(df)) as stage:
+        panel = CompactPanel.from_frame(df, date_column)
+        stage['observations'] = len(panel)
+        stage['bytes'] = panel.nbytes
+    
+    print(f"   Data points: {len(panel)} ({panel.values.dtype})")
+    print(f"   Unique symbols: {int(np.count_nonzero(np.diff(panel.indptr)))}")
+    
+    window_label, cagr_kernel, rank_kernel, by_date = window_kernels(window)
+    
+    # CAGR and rank run back to back per index in float64 temporaries; the
+    # float32 ranks overwrite the prices (Steps 2 + 3 in one pass)
+    print(f"\nStep 2-3: Calculating {window_years(window):g}-year rolling CAGR and "
+          f"percentile rank ({window_label})...")
+    with report.stage('rank', rows=len(panel)) as stage:
+        ranks = rank_panel(panel, cagr_kernel, rank_kernel, by_date, out=panel.values)
+        valid_rank_count = np.count_nonzero(~np.isnan(ranks))
+        stage['valid'] = int(valid_rank_count)
+    print(f"   Valid percentile ranks: {valid_rank_count}")
+    
+    print("\nStep 4-5: Calculating monthly averages...")
+    with report.stage('monthly_mean', rows=len(panel)) as stage:
+        df_month_mean = panel_month_means(panel, ranks)
+        stage['months'] = len(df_month_mean)
+    
+    print(f"   Months available: {len(df_month_mean)}")
+    return df_month_mean
+
+
+def calculate_final_summary_v2(df, date_column='DATE', workers=None, return_history=False,
+                               report=None, window=1825, compact=False, periods=None):
+    """
+    Calculate percentile rank using rolling 5-year window method.
+    This matches the notebook implementation.
+    
+    Args:
+        df: DataFrame with date column and index value columns
+        date_column: Name of the date column
+        workers: Number of worker processes for the per-index steps
+            (default: serial; results are identical either way)
+        return_history: Also return the full monthly-mean table
+        report: instrumentation.RunReport that receives one stage per step
+            (wall / CPU time, rows, memory); a private one is used if omitted
+        window: CAGR and ranking window: observations (default: 1825, the
+            notebook's "5 years") or a calendar offset such as '5Y'
+        compact: Keep only the observed cells as float32 values / int32 days
+            (compact_panel.py) instead of dense float64 matrices; less than
+            half the working memory, monthly means within
+            compact_panel.TOLERANCE of the float64 result. Runs serially
+            (workers is ignored)
+        periods: Optional {name: offset alias or period start dates} of
+            extra granularities (e.g. {'weekly': 'W-FRI', 'month_to_date':
+            'MS'}), averaged from the same daily rank matrix as the months
+            (see period_mean_frame); not available with compact=True
+    
+    Returns:
+        DataFrame with final percentile rankings for the latest month; with
+        return_history and/or periods, a tuple of that DataFrame, the
+        monthly means indexed by (year, month) x indices (return_history)
+        and {name: period_mean_frame output} (periods), in that order
+    """
+    if report is None:
+        report = RunReport('calculate_final_summary_v2', verbose=True)
+    if compact and periods:
+        raise ValueError("periods needs the dense daily rank matrix (compact=False)")
+    
+    if compact:
+        df_month_mean = _compact_month_means(df, date_column, window, report)
+    else:
+        df_processed = _dense_rank_frame(df, date_column, window, workers, report)
+        
+        print("\nStep 5: Calculating monthly averages...")
+        with report.stage('monthly_mean', rows=len(df_processed)) as stage:
+            # Shared with the extra periods below: one pass over the matrix
+            prefix_sums = PrefixSums(df_processed.to_numpy(dtype=np.float64))
+            df_month_mean = monthly_mean_frame(df_processed, prefix_sums)
+            stage['months'] = len(df_month_mean)
+        
+        print(f"   Months available: {len(df_month_mean)}")
+    
+    print("\nStep 6: Extracting latest month summary...")
+    with report.stage('latest_month', rows=len(df_month_mean)) as stage:
+        latest_year, latest_month = df_month_mean.index[0]
+        print(f"   Latest month: {int(latest_year)}-{int(latest_month):02d}")
+        df_final_summary = latest_month_summary(df_month_mean)
+        stage['indices'] = len(df_final_summary)
     
     print(f"\nFinal summary: {len(df_final_summary)} indices")
     
-    return df_final_summary
+    results = [df_final_summary]
+    if return_history:
+        results.append(df_month_mean.sort_index())
+    if periods:
+        print("\nStep 7: Averaging over custom periods...")
+        period_means = {}
+        for name, spec in periods.items():
+            with report.stage(f'period_{name}', rows=len(df_processed)) as stage:
+                period_means[name] = period_mean_frame(df_processed, spec, prefix_sums)
+                stage['periods'] = len(period_means[name])
+            print(f"   {name}: {len(period_means[name])} periods, "
+                  f"latest {period_means[name].index[-1].date()}")
+        results.append(period_means)
+    return results[0] if len(results) == 1 else tuple(results)
+
+
+def calculate_multi_horizon_summary(df, date_column='DATE', horizons=None):
+    """
+    Latest-month percentile rank for several CAGR horizons at once.
+    
+    Same method as calculate_final_summary_v2, but the 1Y/3Y/5Y/10Y CAGR and
+    rank windows are all computed in one sweep over each index's data.
+    
+    Args:
+        df: DataFrame with date column and index value columns
+        date_column: Name of the date column
+        horizons: Mapping of name -> window in days (default: 1Y, 3Y, 5Y, 10Y)
+    
+    Returns:
+        DataFrame indexed by SYMBOL with one column per horizon
+        (NaN where an index has too little history for that horizon)
+    """
+    if horizons is None:
+        horizons = HORIZONS
+    
+    df_processed = multi_horizon_rank_frame(df, date_column, horizons)
+    
+    # Monthly averages, then the most recent month across all horizons
+    latest = monthly_mean_frame(df_processed).iloc[0]
+    
+    df_horizon_summary = latest.unstack('HORIZON').reindex(columns=list(horizons))
+    df_horizon_summary = df_horizon_summary.dropna(how='all')
+    df_horizon_summary.columns.name = None
+    return df_horizon_summary
+
+
+def load_category_groups(categories_file=CATEGORY_GROUPS_FILE, registry=None):
+    """
+    {CSV column name: category group} from categorized_indices.json.
+    
+    The file lists 'tri - ...' names per group ('Broad', 'Sector', ...);
+    the registry turns them into CSV column names. Names the registry does
+    not know are left out.
+    """
+    if registry is None:
+        registry = load_registry()
+    with open(categories_file, 'r', encoding='utf-8') as f:
+        categorized = json.load(f)
+    
+    groups = {}
+    for group, items in categorized.items():
+        for item in items:
+            csv_name = registry.field(item['fullName'], 'csv') or registry.field(item.get('shortName'), 'csv')
+            if csv_name:
+                groups[csv_name] = group
+    return groups
+
+
+def cross_sectional_summary(cagr, dates, symbols, groups=None, date_column='DATE'):
+    """
+    Latest-month cross-sectional percentiles from a daily CAGR matrix.
+    
+    Args:
+        cagr: 2-D CAGR array (dates x symbols)
+        dates: Row dates
+        symbols: Column names
+        groups: Optional {symbol: category group} for the peer ranking
+        date_column: Name for the date index
+    
+    Returns:
+        DataFrame indexed by SYMBOL with 'all_indices' (rank among every
+        index on each day) and, with groups, 'category' (rank among the
+        index's category peers), both averaged over the latest month
+    """
+    ranks = {'all_indices': cross_sectional_rank(cagr)}
+    if groups:
+        ranks['category'] = cross_sectional_rank(cagr, [groups.get(symbol) for symbol in symbols])
+    
+    columns = {}
+    for name, matrix in ranks.items():
+        df_month_mean = monthly_mean_frame(matrix_to_frame(matrix, dates, symbols, date_column))
+        columns[name] = latest_month_summary(df_month_mean)['final_pct_value']
+    df_cross_section = pd.DataFrame(columns).reindex(columns=list(ranks))
+    df_cross_section.index.name = 'SYMBOL'
+    return df_cross_section.sort_values('all_indices')
+
+
+def calculate_cross_sectional_summary(df, groups=None, date_column='DATE', window=1825, workers=None):
+    """
+    Rank each index's CAGR against the other indices on the same day.
+    
+    calculate_final_summary_v2 ranks an index against its own history; this
+    ranks the same CAGR matrix along the index axis, over all indices and
+    within category groups, so both views can be published side by side.
+    
+    Args:
+        df: DataFrame with date column and index value columns
+        groups: {CSV column name: category group} (see load_category_groups)
+        date_column: Name of the date column
+        window: CAGR window, as in calculate_final_summary_v2
+        workers: Number of worker processes for the CAGR step
+    
+    Returns:
+        DataFrame indexed by SYMBOL with 'all_indices' and 'category' columns
+    """
+    df = df.sort_values(date_column, kind='mergesort')
+    dates, symbols, values = value_matrix(df, date_column)
+    _, cagr_kernel, _, by_date = window_kernels(window)
+    cagr = apply_columns(
+        values, cagr_kernel, mask=~np.isnan(values), out=values,
+        workers=workers, dates=dates if by_date else None
+    )
+    return cross_sectional_summary(cagr, dates, symbols, groups, date_column)
 
 
 def main():
@@ -157,12 +501,15 @@ def main():
         print(f"Error: {csv_file} not found!")
         return
     
-    print(f"Loading data from: {csv_file}")
-    df = pd.read_csv(csv_file)
+    report = RunReport('calculate_corrected_method', verbose=True)
+    report.info.update({'input': str(csv_file), 'workers': os.cpu_count()})
     
-    # Convert DATE to datetime
-    df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%y')
-    df = df.sort_values('DATE')
+    print(f"Loading data from: {csv_file}")
+    with report.stage('load') as stage:
+        # Columnar cache: CSV is parsed once, later runs memory-map it
+        df = load_prices(csv_file)
+        df = df.sort_values('DATE')
+        stage['rows'] = len(df)
     
     print(f"Data loaded: {len(df)} rows, {len(df.columns)-1} index columns")
     print(f"Date range: {df['DATE'].min()} to {df['DATE'].max()}")
@@ -171,14 +518,29 @@ def main():
     # Calculate summary
     print("Starting calculation...")
     print("-"*80)
-    df_final_summary = calculate_final_summary_v2(df, date_column='DATE')
+    df_final_summary, df_month_mean, period_means = calculate_final_summary_v2(
+        df, date_column='DATE', workers=os.cpu_count(), return_history=True, report=report,
+        periods=PERIODS
+    )
     print("-"*80)
     
     # Save results
     output_file = 'data/CORRECTED_METHOD1_summary.xlsx'
-    df_final_summary.to_excel(output_file)
+    with report.stage('save_summary', rows=len(df_final_summary)):
+        df_final_summary.to_excel(output_file)
     print(f"\n✓ Results saved to: {output_file}")
     
+    # Every closed month (months x indices) for the rotation heatmap
+    with report.stage('save_history', rows=len(df_month_mean)):
+        history = history_from_month_mean(df_month_mean)
+        save_history(history)
+    print(f"✓ Monthly history ({len(history['months'])} months) saved to: {HISTORY_FILE}")
+    
+    # Weekly / fortnightly / month-to-date from the same daily ranks
+    with report.stage('save_periods'):
+        save_period_summaries(period_means)
+    print(f"✓ Period summaries ({', '.join(period_means)}) saved to: {PERIOD_SUMMARY_FILE}")
+    
     # Display results
     print("\n" + "="*80)
     print("TOP 10 INDICES (Strongest Recent Performance)")
@@ -200,6 +562,40 @@ def main():
     print(f"Min percentile: {df_final_summary['final_pct_value'].min():.4f}")
     print(f"Max percentile: {df_final_summary['final_pct_value'].max():.4f}")
     print()
+    
+    # Multi-horizon view (1Y / 3Y / 5Y / 10Y) for the frontend
+    print("="*80)
+    print("MULTI-HORIZON SUMMARY (1Y / 3Y / 5Y / 10Y)")
+    print("="*80)
+    with report.stage('multi_horizon', rows=len(df)):
+        df_horizon_summary = calculate_multi_horizon_summary(df, date_column='DATE')
+        horizon_file = 'data/MULTI_HORIZON_summary.xlsx'
+        df_horizon_summary.to_excel(horizon_file)
+    print(df_horizon_summary.describe().loc[['count', 'mean']].to_string())
+    print(f"\n✓ Results saved to: {horizon_file}")
+    
+    # Same CAGR ranked against the other indices (all / category peers)
+    print("\n" + "="*80)
+    print("CROSS-SECTIONAL SUMMARY (vs all indices / vs category peers)")
+    print("="*80)
+    with report.stage('cross_section', rows=len(df)):
+        groups = load_category_groups() if CATEGORY_GROUPS_FILE.exists() else None
+        df_cross_section = calculate_cross_sectional_summary(
+            df, groups, date_column='DATE', workers=os.cpu_count()
+        )
+        df_cross_section.to_excel(CROSS_SECTION_FILE)
+    print(df_cross_section.describe().loc[['count', 'mean']].to_string())
+    print(f"\n✓ Results saved to: {CROSS_SECTION_FILE}")
+    
+    # Per-step timings / memory next to the summary workbook
+    latest_year, latest_month = df_month_mean.index[-1]
+    report.info.update({
+        'indices': len(df_final_summary),
+        'latest_month': f"{int(latest_year)}-{int(latest_month):02d}",
+    })
+    report.save(RUN_REPORT_FILE)
+    print(f"✓ Run report saved to: {RUN_REPORT_FILE}")
+    print()
 
 
 if __name__ == "__main__":
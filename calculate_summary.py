@@ -7,6 +7,15 @@ import pandas as pd
 import numpy as np
 import json
 
+from price_store import load_prices
+from rolling_engine import (
+    apply_columns,
+    matrix_to_frame,
+    rolling_cagr,
+    rolling_percentile_rank,
+    value_matrix,
+)
+
 def calculate_final_summary(df_with_daily_values, date_column='DATE'):
     """
     Calculate percentile rank summary for the most recent month
@@ -23,51 +32,33 @@ def calculate_final_summary(df_with_daily_values, date_column='DATE'):
     DataFrame with percentile ranks for each index in the most recent month
     """
     
-    # Step 1: Melt dataframe to long format
-    df_melted = df_with_daily_values.melt(
-        id_vars=[date_column], 
-        var_name='SYMBOL', 
-        value_name='VALUE'
-    )
-    df_melted = df_melted.dropna()
-    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
-    df_melted = df_melted.dropna()
+    # Step 1: Split the wide frame into a 2-D value matrix
+    # (rows stay in their original order, as in the melted frame)
+    dates, symbols, values = value_matrix(df_with_daily_values, date_column)
+    observed = ~np.isnan(values)
     
     # Step 2: Calculate 5-Year Rolling CAGR
     # Formula: (Value_now / Value_5_years_ago)^(1/5) - 1
     pr_cagr = 1825  # 5 years in days
-    df_melted['Rolling_CAGR'] = (
-        df_melted.groupby(['SYMBOL'])['VALUE']
-        .rolling(pr_cagr)
-        .apply(lambda x: (x.iloc[-1]/x.iloc[0])**(1/5) - 1 if len(x) >= pr_cagr and x.iloc[0] > 0 else np.nan, raw=False)
-        .round(5)
-        .reset_index(0, drop=True)
+    cagr = apply_columns(
+        values,
+        lambda v: np.round(rolling_cagr(v, window=pr_cagr, years=5, strict=False), 5),
+        mask=observed
     )
+    del values
     
     # Step 3: Calculate Percentile Rank over last 5 years
     # This ranks each index's current CAGR against its own 5-year history
     pr_rank = 5 * 365  # 5 years
-    def percentile_rank(x):
-        if len(x) > 0:
-            return pd.Series(x).rank(pct=True).iloc[-1]
-        return np.nan
-    
-    df_melted['Percentile_Rank'] = (
-        df_melted.groupby(['SYMBOL'])['Rolling_CAGR']
-        .rolling(pr_rank, min_periods=1)
-        .apply(percentile_rank, raw=False)
-        .round(5)
-        .reset_index(0, drop=True)
+    ranks = apply_columns(
+        cagr,
+        lambda c: np.round(rolling_percentile_rank(c, window=pr_rank, min_periods=1), 5),
+        mask=observed,
+        out=cagr
     )
     
-    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
-    
-    # Step 4: Pivot back to wide format
-    df_processed = df_melted.pivot_table(
-        values='Percentile_Rank', 
-        index=date_column, 
-        columns='SYMBOL'
-    )
+    # Step 4: Label the wide percentile matrix
+    df_processed = matrix_to_frame(ranks, dates, symbols, date_column)
     
     # Step 5: Calculate monthly averages
     df_processed['year'] = df_processed.index.year
@@ -94,10 +85,8 @@ def calculate_final_summary(df_with_daily_values, date_column='DATE'):
 if __name__ == "__main__":
     # Read the raw data
     print("Reading raw data...")
-    df = pd.read_csv('data/Latest_Indices_rawdata_14112025.csv')
-    
-    # Convert DATE column to datetime
-    df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%y')
+    # (parsed once, then memory-mapped from data/price_cache/)
+    df = load_prices('data/Latest_Indices_rawdata_14112025.csv')
     
     print(f"Data loaded: {len(df)} rows, {len(df.columns)} columns")
     print(f"Date range: {df['DATE'].min()} to {df['DATE'].max()}")
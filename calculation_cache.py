@@ -0,0 +1,345 @@
+"""
+MEMOIZED CALCULATION ENGINE FOR THE COMPARISON SCRIPTS
+
+test_calculation_methods.py, compare_excel_vs_new.py,
+final_excel_vs_new_comparison.py and detailed_sample_comparison.py all need
+the same rolling CAGR -> percentile rank -> monthly mean chain on the same
+raw CSV. Each used to carry its own copy and run it from scratch; now they
+ask this module, which runs it once per (data, method) and keeps the result
+on disk:
+
+    data/calculation_cache/<key>/
+        cagr.npy         daily rolling CAGR (rows x symbols, column-major)
+        ranks.npy        daily percentile ranks
+        dates.npy        row dates
+        month_means.npy  monthly mean ranks (months x symbols, oldest first)
+        months.npy       (year, month) of each month_means row
+        meta.json        symbols, method parameters, data hash
+
+<key> hashes the data (dates, column names, values) together with the method
+parameters, CACHE_VERSION and the source of the engine modules (SOURCE_FILES),
+so a changed CSV, parameter or kernel gets its own entry; a warm entry is
+memory-mapped instead of recomputed. After a new entry is written, entries
+built from other engine code are removed and only the KEEP_ENTRIES most
+recently used ones per method are kept. Entries are built in a private
+temporary directory and renamed into place, so concurrent runs do not
+interfere: the one that loses the race uses the winner's entry.
+
+Methods (METHODS):
+
+    new   strict 1825-observation windows (calculate_final_summary_v2)
+    old   calculate_summary.calculate_final_summary: partial windows
+          allowed, CAGRs and ranks rounded to 5 decimals, rows in file order,
+          indices without a latest-month value kept as NaN in the summary
+
+Any parameter can be overridden per call, e.g. window='5Y' for calendar
+windows:
+
+    from calculation_cache import daily_ranks, latest_summary
+    df_new = latest_summary(df, 'new')
+    df_ranks = daily_ranks(df, 'new', window='5Y')
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache, partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calculate_corrected_method import latest_month_summary, monthly_mean_frame, window_kernels
+from rolling_engine import apply_columns, matrix_to_frame, value_matrix
+
+CACHE_DIR = Path('data/calculation_cache')
+# Bump when the entry layout changes; kernel edits are caught by SOURCE_FILES
+CACHE_VERSION = 2
+# Modules whose code decides the results; their contents are part of the key
+SOURCE_FILES = [
+    Path(__file__).with_name('calculation_cache.py'),
+    Path(__file__).with_name('calculate_corrected_method.py'),
+    Path(__file__).with_name('rolling_engine.py'),
+]
+# Entries kept per method (parameters + date column), most recently used first
+KEEP_ENTRIES = 2
+# Temporary directories older than this are left over from a crashed run
+STALE_TMP_SECONDS = 3600
+
+METHODS = {
+    'new': {'window': 1825, 'strict': True, 'min_periods': None, 'decimals': None, 'sort_dates': True,
+            'dropna': True},
+    'old': {'window': 1825, 'strict': False, 'min_periods': 1, 'decimals': 5, 'sort_dates': False,
+            'dropna': False},
+}
+# Parameters applied when an entry is read, so they are not part of its key
+READ_PARAMS = ('dropna',)
+
+
+def frame_sha256(df, date_column='DATE'):
+    """
+    sha256 of a wide price frame's content (dates, column names, values).
+
+    Values are hashed as the float64 matrix the engine sees, so a frame read
+    from the CSV and one from the price cache give the same digest.
+    """
+    dates, symbols, values = value_matrix(df, date_column)
+    digest = hashlib.sha256()
+    digest.update(json.dumps([date_column] + symbols).encode('utf-8'))
+    digest.update(dates.to_numpy().astype('datetime64[ns]').tobytes())
+    digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def source_sha256():
+    """sha256 over the contents of SOURCE_FILES"""
+    digest = hashlib.sha256()
+    for path in SOURCE_FILES:
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def method_params(method='new', **overrides):
+    """
+    Parameters of a named method, with overrides applied.
+
+    Args:
+        method: Key of METHODS
+        **overrides: window, strict, min_periods, decimals, sort_dates, dropna
+
+    Returns:
+        Dict of all parameters
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r} (expected one of {', '.join(METHODS)})")
+    unknown = set(overrides) - set(METHODS[method])
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    return {**METHODS[method], **overrides}
+
+
+def _rounded(func, decimals, *args):
+    """func(*args) rounded like the old method (picklable for workers)"""
+    return np.round(func(*args), decimals)
+
+
+def _kernels(params):
+    """(CAGR kernel, rank kernel, whether they take dates) for the parameters"""
+    _, cagr_kernel, rank_kernel, by_date = window_kernels(params['window'])
+    cagr_kernel = partial(cagr_kernel, strict=params['strict'])
+    if params['min_periods'] is not None:
+        rank_kernel = partial(rank_kernel, min_periods=params['min_periods'])
+    if params['decimals'] is not None:
+        cagr_kernel = partial(_rounded, cagr_kernel, params['decimals'])
+        rank_kernel = partial(_rounded, rank_kernel, params['decimals'])
+    return cagr_kernel, rank_kernel, by_date
+
+
+def _entry_params(params):
+    """The parameters that decide an entry's contents (not how it is read)"""
+    return {name: value for name, value in params.items() if name not in READ_PARAMS}
+
+
+def _entry_dir(df, date_column, params, cache_dir):
+    data_hash = frame_sha256(df, date_column)
+    payload = {
+        'version': CACHE_VERSION,
+        'code': source_sha256(),
+        'data': data_hash,
+        'date_column': date_column,
+        'params': _entry_params(params),
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return Path(cache_dir) / hashlib.sha256(blob).hexdigest()[:24], data_hash
+
+
+def _compute(df, date_column, params, entry_dir, data_hash, workers):
+    """Run the rolling chain once and write the cache entry"""
+    if params['sort_dates']:
+        df = df.sort_values(date_column, kind='mergesort')
+    dates, symbols, values = value_matrix(df, date_column)
+    observed = ~np.isnan(values)
+    cagr_kernel, rank_kernel, by_date = _kernels(params)
+    kernel_dates = dates if by_date else None
+
+    cagr = apply_columns(values, cagr_kernel, mask=observed, workers=workers, dates=kernel_dates)
+    del values
+    ranks = apply_columns(cagr, rank_kernel, mask=observed, workers=workers, dates=kernel_dates)
+
+    df_month_mean = monthly_mean_frame(matrix_to_frame(ranks, dates, symbols, date_column)).iloc[::-1]
+    months = np.column_stack([
+        df_month_mean.index.get_level_values('year'), df_month_mean.index.get_level_values('month')
+    ]).astype(np.int32)
+
+    # Written to a private temporary directory and renamed, so a half-written
+    # entry is never picked up and concurrent runs never share a directory
+    entry_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=entry_dir.name + '.', suffix='.tmp', dir=entry_dir.parent))
+    np.save(tmp_dir / 'cagr.npy', cagr)
+    np.save(tmp_dir / 'ranks.npy', ranks)
+    np.save(tmp_dir / 'dates.npy', dates.to_numpy())
+    np.save(tmp_dir / 'month_means.npy', np.asfortranarray(df_month_mean.to_numpy()))
+    np.save(tmp_dir / 'months.npy', months)
+    meta = {
+        'version': CACHE_VERSION,
+        'code_sha256': source_sha256(),
+        'data_sha256': data_hash,
+        'date_column': date_column,
+        'params': _entry_params(params),
+        'symbols': symbols,
+        'month_symbols': list(df_month_mean.columns),
+    }
+    with open(tmp_dir / 'meta.json', 'w') as f:
+        json.dump(meta, f, indent=2, default=str)
+    try:
+        tmp_dir.rename(entry_dir)
+    except OSError:
+        # Another process finished the same entry first; use theirs
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (entry_dir / 'meta.json').exists():
+            raise
+
+
+def _entry_age(meta_file):
+    try:
+        return meta_file.stat().st_mtime
+    except OSError:
+        return None
+
+
+def prune_cache(cache_dir=CACHE_DIR, keep=KEEP_ENTRIES):
+    """
+    Remove entries built by other engine code, all but the keep most
+    recently used entries of each method, and abandoned temporary
+    directories.
+
+    Args:
+        cache_dir: Directory holding the entries
+        keep: Entries to keep per method (parameters + date column)
+
+    Returns:
+        Number of directories removed
+    """
+    cache_dir = Path(cache_dir)
+    if not cache_dir.is_dir():
+        return 0
+    code = source_sha256()
+    stale, by_method = [], {}
+    for path in cache_dir.iterdir():
+        if not path.is_dir():
+            continue
+        if path.name.endswith('.tmp'):
+            if time.time() - path.stat().st_mtime > STALE_TMP_SECONDS:
+                stale.append(path)
+            continue
+        used = _entry_age(path / 'meta.json')
+        if used is None:
+            continue
+        try:
+            meta = _load_meta(path)
+        except (OSError, ValueError):
+            continue
+        if meta.get('version') != CACHE_VERSION or meta.get('code_sha256') != code:
+            stale.append(path)
+            continue
+        method = json.dumps([meta['date_column'], meta['params']], sort_keys=True, default=str)
+        by_method.setdefault(method, []).append((used, path))
+    for entries in by_method.values():
+        entries.sort(reverse=True)
+        stale.extend(path for _, path in entries[keep:])
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+    return len(stale)
+
+
+def cached_entry(df, method='new', date_column='DATE', cache_dir=CACHE_DIR, workers=None, **params):
+    """
+    Cache directory holding the method's results for df, computing them on
+    a miss.
+
+    Args:
+        df: DataFrame with date column and index value columns
+        method: Key of METHODS
+        date_column: Name of the date column
+        cache_dir: Directory holding the entries
+        workers: Worker processes for a cold run (results do not depend on it)
+        **params: Overrides of the method's parameters (see METHODS)
+
+    Returns:
+        Path of the entry directory
+    """
+    params = method_params(method, **params)
+    entry_dir, data_hash = _entry_dir(df, date_column, params, cache_dir)
+    meta_file = entry_dir / 'meta.json'
+    if meta_file.exists():
+        # Marks the entry as used, for prune_cache
+        try:
+            os.utime(meta_file)
+        except OSError:
+            pass
+    else:
+        _compute(df, date_column, params, entry_dir, data_hash, workers)
+        prune_cache(cache_dir)
+    return entry_dir
+
+
+def _load_meta(entry_dir):
+    with open(entry_dir / 'meta.json', 'r') as f:
+        return json.load(f)
+
+
+def _daily_frame(name, df, method, date_column, cache_dir, workers, params):
+    entry_dir = cached_entry(df, method, date_column, cache_dir, workers, **params)
+    meta = _load_meta(entry_dir)
+    matrix = np.load(entry_dir / f'{name}.npy', mmap_mode='c')
+    dates = pd.DatetimeIndex(np.load(entry_dir / 'dates.npy'))
+    return matrix_to_frame(matrix, dates, meta['symbols'], date_column)
+
+
+def daily_cagr(df, method='new', date_column='DATE', cache_dir=CACHE_DIR, workers=None, **params):
+    """Daily rolling CAGR (sorted dates x indices); arguments as in cached_entry"""
+    return _daily_frame('cagr', df, method, date_column, cache_dir, workers, params)
+
+
+def daily_ranks(df, method='new', date_column='DATE', cache_dir=CACHE_DIR, workers=None, **params):
+    """Daily percentile ranks (sorted dates x indices); arguments as in cached_entry"""
+    return _daily_frame('ranks', df, method, date_column, cache_dir, workers, params)
+
+
+def monthly_means(df, method='new', date_column='DATE', cache_dir=CACHE_DIR, workers=None, **params):
+    """
+    Monthly mean percentile per index, in the layout of
+    calculate_corrected_method.monthly_mean_frame (newest month first).
+    Arguments as in cached_entry.
+    """
+    entry_dir = cached_entry(df, method, date_column, cache_dir, workers, **params)
+    meta = _load_meta(entry_dir)
+    months = np.load(entry_dir / 'months.npy')
+    index = pd.MultiIndex.from_arrays([months[:, 0], months[:, 1]], names=['year', 'month'])
+    df_month_mean = pd.DataFrame(
+        np.load(entry_dir / 'month_means.npy'),
+        index=index,
+        columns=pd.Index(meta['month_symbols'], name='SYMBOL')
+    )
+    return df_month_mean.iloc[::-1]
+
+
+def latest_summary(df, method='new', date_column='DATE', cache_dir=CACHE_DIR, workers=None, **params):
+    """
+    Latest month's percentile per index (final_pct_value, ascending), as
+    calculate_corrected_method.latest_month_summary. Indices without a
+    latest-month value are left out unless the method's dropna is False
+    ('old' keeps them as NaN). Arguments as in cached_entry.
+    """
+    dropna = method_params(method, **params)['dropna']
+    return latest_month_summary(monthly_means(df, method, date_column, cache_dir, workers, **params), dropna)
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Remove every cached entry"""
+    shutil.rmtree(cache_dir, ignore_errors=True)
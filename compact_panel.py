@@ -0,0 +1,281 @@
+"""
+COMPACT PANEL REPRESENTATION
+
+calculate_final_summary_v2 works on a dense float64 (dates x indices) matrix
+plus a second one for the CAGRs/ranks. Most indices start years after the
+first date, so much of that matrix is NaN padding, and every cell is 8
+bytes. A CompactPanel keeps only the observed cells, grouped by index:
+
+    values   float32 per observation (float64 if float32 would lose precision)
+    days     int32 day offset from `epoch` per observation
+    indptr   index j's observations are values[indptr[j]:indptr[j + 1]]
+    symbols  index names; the long view's SYMBOL column is a Categorical
+             over them (codes implied by indptr, never stored per row)
+
+rank_panel() runs the CAGR + percentile kernels one index at a time in
+float64 temporaries and stores the ranks as float32 (optionally over the
+values themselves), and panel_month_means()
+averages them per calendar month without building a dates x indices frame.
+
+Run this file to check the compact path against the float64 reference:
+
+    python compact_panel.py       # max abs error must stay below TOLERANCE
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Largest relative float32 round-trip error accepted for the prices
+VALUE_RTOL = 1e-6
+# Largest accepted difference from the float64 reference (monthly means)
+TOLERANCE = 1e-4
+
+
+class CompactPanel:
+    """
+    Observed (index, day, value) cells of a wide price frame.
+
+    Build with CompactPanel.from_frame(); see the module docstring for the
+    layout.
+    """
+
+    def __init__(self, symbols, epoch, days, values, indptr):
+        self.symbols = list(symbols)
+        self.epoch = np.datetime64(epoch, 'D')
+        self.days = days
+        self.values = values
+        self.indptr = indptr
+
+    @classmethod
+    def from_frame(cls, df, date_column='DATE', value_dtype=None):
+        """
+        Compress a wide DataFrame (date column + one column per index).
+
+        Non-numeric cells and rows without a date are dropped, so the cells
+        kept are the ones value_matrix() would mark as observed.
+
+        Args:
+            df: Wide price DataFrame
+            date_column: Name of the date column
+            value_dtype: np.float32 or np.float64 (default: float32 unless
+                some price would change by more than VALUE_RTOL)
+
+        Returns:
+            CompactPanel
+        """
+        dates = pd.DatetimeIndex(df[date_column])
+        # Row order by date without copying the frame (stable, like mergesort)
+        order = None if dates.is_monotonic_increasing else np.argsort(dates.to_numpy(), kind='stable')
+        if order is not None:
+            dates = dates[order]
+        has_date = ~dates.isna()
+        day_numbers = dates.to_numpy().astype('datetime64[D]').astype(np.int64)
+        epoch = int(day_numbers[has_date].min()) if has_date.any() else 0
+        day_offsets = np.zeros(len(dates), dtype=np.int32)
+        day_offsets[has_date] = day_numbers[has_date] - epoch
+        symbols = [col for col in df.columns if col != date_column]
+
+        def observed(symbol):
+            column = pd.to_numeric(df[symbol], errors='coerce').to_numpy(dtype=np.float64)
+            if order is not None:
+                column = column[order]
+            rows = np.flatnonzero(~np.isnan(column) & has_date)
+            return rows, column[rows]
+
+        # Pass 1: observation counts and the float32 precision check, so
+        # pass 2 can fill the final arrays without keeping float64 copies
+        counts = np.zeros(len(symbols), dtype=np.int64)
+        fits_float32 = value_dtype is None
+        for j, symbol in enumerate(symbols):
+            rows, column = observed(symbol)
+            counts[j] = len(rows)
+            if fits_float32:
+                with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+                    error = np.abs(column.astype(np.float32) - column) / np.abs(column)
+                fits_float32 = not np.any(error[column != 0] > VALUE_RTOL)
+        if value_dtype is None:
+            value_dtype = np.float32 if fits_float32 else np.float64
+
+        indptr = np.zeros(len(symbols) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(counts)
+        values = np.empty(indptr[-1], dtype=value_dtype)
+        days = np.empty(indptr[-1], dtype=np.int32)
+        for j, symbol in enumerate(symbols):
+            rows, column = observed(symbol)
+            values[indptr[j]:indptr[j + 1]] = column
+            days[indptr[j]:indptr[j + 1]] = day_offsets[rows]
+        return cls(symbols, np.datetime64(epoch, 'D'), days, values, indptr)
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.days.nbytes + self.indptr.nbytes
+
+    def column(self, j):
+        """(float64 values, int32 days) of index j, in date order"""
+        rows = slice(self.indptr[j], self.indptr[j + 1])
+        return self.values[rows].astype(np.float64), self.days[rows]
+
+    def to_dates(self, days):
+        """Day offsets -> datetime64[ns]"""
+        return (self.epoch + days.astype('timedelta64[D]')).astype('datetime64[ns]')
+
+    def codes(self):
+        """Symbol code per observation (smallest integer dtype that fits)"""
+        dtype = np.int16 if len(self.symbols) < 2 ** 15 else np.int32
+        return np.repeat(np.arange(len(self.symbols), dtype=dtype), np.diff(self.indptr))
+
+    def to_long(self):
+        """
+        Long view: SYMBOL (categorical), DAY (int32 offset from epoch), VALUE.
+
+        The compact counterpart of melting the wide frame (no object-dtype
+        strings, no float64 copies).
+        """
+        return pd.DataFrame({
+            'SYMBOL': pd.Categorical.from_codes(self.codes(), categories=self.symbols),
+            'DAY': self.days,
+            'VALUE': self.values,
+        })
+
+
+def rank_panel(panel, cagr_kernel, rank_kernel, by_date=False, out=None):
+    """
+    Rolling CAGR followed by its rolling percentile rank, index by index.
+
+    Each index is widened to float64 only while its kernels run, so the
+    largest temporary is one index's history.
+
+    Args:
+        panel: CompactPanel
+        cagr_kernel, rank_kernel: Per-symbol kernels (see window_kernels in
+            calculate_corrected_method.py)
+        by_date: The kernels take the symbol's dates as a second argument
+        out: Array for the ranks (default: new array of the values' dtype);
+            may be panel.values itself to rank in place
+
+    Returns:
+        Array of ranks aligned with panel.values (NaN where undefined)
+    """
+    if out is None:
+        out = np.empty(len(panel), dtype=panel.values.dtype)
+    for j in range(len(panel.symbols)):
+        values, days = panel.column(j)
+        if by_date:
+            dates = panel.to_dates(days)
+            out[panel.indptr[j]:panel.indptr[j + 1]] = rank_kernel(cagr_kernel(values, dates), dates)
+        else:
+            out[panel.indptr[j]:panel.indptr[j + 1]] = rank_kernel(cagr_kernel(values))
+    return out
+
+
+def panel_month_means(panel, ranks):
+    """
+    Monthly average rank per index, in the layout of monthly_mean_frame().
+
+    Sums and counts are accumulated in float64 per (month, index) with
+    np.bincount, straight from the per-observation arrays.
+
+    Returns:
+        DataFrame indexed by (year, month), newest month first, one column
+        per index that has at least one rank
+    """
+    n_days = int(panel.days.max()) + 1 if len(panel) else 0
+    day_months = (panel.to_dates(np.arange(n_days)).astype('datetime64[M]').astype(np.int64))
+    first_month = int(day_months[0]) if n_days else 0
+    day_months = (day_months - first_month).astype(np.int32)
+    n_months = int(day_months[-1]) + 1 if n_days else 0
+
+    means = np.full((n_months, len(panel.symbols)), np.nan)
+    for j in range(len(panel.symbols)):
+        rows = slice(panel.indptr[j], panel.indptr[j + 1])
+        column = ranks[rows].astype(np.float64)
+        valid = ~np.isnan(column)
+        months = day_months[panel.days[rows][valid]]
+        counts = np.bincount(months, minlength=n_months)
+        sums = np.bincount(months, weights=column[valid], minlength=n_months)
+        with np.errstate(invalid='ignore'):
+            means[:, j] = sums / counts
+
+    month_numbers = np.arange(first_month, first_month + n_months)
+    index = pd.MultiIndex.from_arrays(
+        [(month_numbers // 12 + 1970).astype(np.int32), (month_numbers % 12 + 1).astype(np.int32)],
+        names=['year', 'month']
+    )
+    df_month_mean = pd.DataFrame(means, index=index, columns=pd.Index(panel.symbols, name='SYMBOL'))
+    df_month_mean = df_month_mean.dropna(how='all').dropna(axis=1, how='all')
+    df_month_mean = df_month_mean.sort_index(axis=1)
+    return df_month_mean.sort_index(ascending=False)
+
+
+def compact_error(df, date_column='DATE', window=1825):
+    """
+    Run the float64 and compact paths of calculate_final_summary_v2 on the
+    same data and compare their monthly means.
+
+    Returns:
+        Dict with the max abs error over all months, over the latest month
+        (the published values) and whether both stay within TOLERANCE
+    """
+    import contextlib
+    import io
+
+    from calculate_corrected_method import calculate_final_summary_v2
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        reference, reference_months = calculate_final_summary_v2(
+            df, date_column, return_history=True, window=window
+        )
+        compact, compact_months = calculate_final_summary_v2(
+            df, date_column, return_history=True, window=window, compact=True
+        )
+
+    if not reference_months.index.equals(compact_months.index) or \
+            not reference_months.columns.equals(compact_months.columns):
+        raise ValueError("Compact and float64 paths produced different months or indices")
+    history_error = np.nanmax(np.abs(compact_months.to_numpy() - reference_months.to_numpy()))
+    latest = compact['final_pct_value'].reindex(reference.index)
+    latest_error = np.nanmax(np.abs(latest.to_numpy() - reference['final_pct_value'].to_numpy()))
+    return {
+        'max_abs_error': float(history_error),
+        'latest_max_abs_error': float(latest_error),
+        'within_tolerance': bool(history_error <= TOLERANCE),
+    }
+
+
+def main():
+    from price_store import RAW_CSV, load_prices
+
+    print("="*80)
+    print("COMPACT PANEL CHECK (float32 / int32 vs float64 reference)")
+    print("="*80)
+    print()
+
+    csv_file = Path(RAW_CSV)
+    if not csv_file.exists():
+        print(f"Error: {csv_file} not found!")
+        return
+
+    df = load_prices(csv_file)
+    dense_bytes = (len(df.columns) - 1) * len(df) * 8
+    panel = CompactPanel.from_frame(df)
+    print(f"✓ {len(panel):,} observations of {len(panel.symbols)} indices ({panel.values.dtype})")
+    print(f"   Dense float64 matrix: {dense_bytes / 2**20:8.1f} MB")
+    print(f"   Compact panel:        {panel.nbytes / 2**20:8.1f} MB")
+    del panel
+
+    result = compact_error(df)
+
+    print(f"\nMax abs error (all months):   {result['max_abs_error']:.2e}")
+    print(f"Max abs error (latest month): {result['latest_max_abs_error']:.2e}")
+    mark = '✓' if result['within_tolerance'] else '⚠'
+    print(f"{mark} Tolerance {TOLERANCE:g}: {'OK' if result['within_tolerance'] else 'EXCEEDED'}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
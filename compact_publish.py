@@ -0,0 +1,150 @@
+"""
+COMPACT FRONTEND DATA
+
+indices_with_short_names.json is a list of objects written with indent=2, so
+every index repeats its keys, its category string and (usually) its name
+twice. This module writes the same entries as one columnar JSON file:
+
+    {
+      "version":    1,
+      "count":      114,
+      "scale":      10000,
+      "categories": ["Broad Market", "Sectoral", ...],
+      "category":   [0, 0, 1, ...],              # index into "categories"
+      "displayName": ["Nifty 50", ...],
+      "fullNamePrefix": "tri - ",
+      "fullName":   [null, "NIFTY50 TR", ...],   # null = prefix + displayName
+      "percentile": [9871, 9702, ...],           # round(value * scale)
+      "horizons":   {"1Y": [8123, null, ...], ...},  # only when present
+      "crossSection": {"all": [...], "category": [...]}  # only when present
+    }
+
+Percentiles are stored as integers (value * 10000), so the decoded value is
+within 0.00005 of the original, well below the two decimals the heatmap
+shows. Row order is the order of the input entries. decode_compact() (and
+loadData() in index.html) turn the file back into the list of objects.
+
+The page reads the compact file first, so a script that rewrote only the
+regular JSON would leave the heatmap showing old values. Every script that
+publishes entries writes through save_frontend_data(), which writes both.
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+FRONTEND_FILE = Path('data/indices_with_short_names.json')
+COMPACT_FILE = Path('data/indices_compact.json')
+FORMAT_VERSION = 1
+SCALE = 10000
+
+# Optional {key: percentile} fields, stored as one column per key
+NESTED_FIELDS = ('horizons', 'crossSection')
+
+
+def _quantize(value):
+    return None if value is None else int(round(value * SCALE))
+
+
+def _full_name_prefix(entries):
+    """Most common prefix that turns displayName into fullName ('' or 'tri - ')"""
+    prefixes = Counter(
+        item['fullName'][:-len(item['displayName'])] if item['displayName'] else item['fullName']
+        for item in entries
+        if item['fullName'].endswith(item['displayName'])
+    )
+    return prefixes.most_common(1)[0][0] if prefixes else ''
+
+
+def encode_compact(entries):
+    """
+    Columnar form of the frontend entries.
+
+    Args:
+        entries: List of {'fullName', 'displayName', 'percentile', 'category'
+            [, 'horizons', 'crossSection']} dicts, as written to indices_with_short_names.json
+
+    Returns:
+        Dict in the format described in the module docstring
+    """
+    categories = list(dict.fromkeys(item['category'] for item in entries))
+    category_codes = {category: code for code, category in enumerate(categories)}
+    prefix = _full_name_prefix(entries)
+
+    compact = {
+        'version': FORMAT_VERSION,
+        'count': len(entries),
+        'scale': SCALE,
+        'categories': categories,
+        'category': [category_codes[item['category']] for item in entries],
+        'displayName': [item['displayName'] for item in entries],
+        'fullNamePrefix': prefix,
+        'fullName': [
+            None if item['fullName'] == prefix + item['displayName'] else item['fullName']
+            for item in entries
+        ],
+        'percentile': [_quantize(item['percentile']) for item in entries],
+    }
+
+    for field in NESTED_FIELDS:
+        keys = list(dict.fromkeys(key for item in entries for key in item.get(field, {})))
+        if keys:
+            compact[field] = {
+                key: [_quantize(item.get(field, {}).get(key)) for item in entries]
+                for key in keys
+            }
+    return compact
+
+
+def decode_compact(compact):
+    """Entries back from encode_compact() output (percentiles to 4 decimals)"""
+    if compact.get('version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact format version: {compact.get('version')!r}")
+    scale = compact['scale']
+    prefix = compact['fullNamePrefix']
+
+    entries = []
+    for i in range(compact['count']):
+        display_name = compact['displayName'][i]
+        full_name = compact['fullName'][i]
+        item = {
+            'fullName': prefix + display_name if full_name is None else full_name,
+            'displayName': display_name,
+            'percentile': compact['percentile'][i] / scale,
+            'category': compact['categories'][compact['category'][i]],
+        }
+        for field in NESTED_FIELDS:
+            values = {
+                key: column[i] / scale for key, column in compact.get(field, {}).items()
+                if column[i] is not None
+            }
+            if values:
+                item[field] = values
+        entries.append(item)
+    return entries
+
+
+def save_compact(entries, compact_file=COMPACT_FILE):
+    """Write the compact file (no whitespace) next to the regular JSON"""
+    compact_file = Path(compact_file)
+    with open(compact_file, 'w', encoding='utf-8') as f:
+        json.dump(encode_compact(entries), f, separators=(',', ':'), ensure_ascii=False)
+    return compact_file
+
+
+def save_frontend_data(entries, frontend_file=FRONTEND_FILE, compact_file=COMPACT_FILE):
+    """
+    Publish heatmap entries: indices_with_short_names.json and its compact copy.
+
+    Args:
+        entries: List of frontend entries (see encode_compact)
+        frontend_file: Path of the regular JSON (indent=2)
+        compact_file: Path of the compact JSON
+
+    Returns:
+        (frontend_file, compact_file)
+    """
+    frontend_file = Path(frontend_file)
+    with open(frontend_file, 'w') as f:
+        json.dump(entries, f, indent=2)
+    return frontend_file, save_compact(entries, compact_file)
@@ -7,6 +7,9 @@ import pandas as pd
 import numpy as np
 import json
 
+from calculation_cache import latest_summary
+from price_store import load_prices
+
 print("=" * 80)
 print("EXCEL vs NEW CALCULATION METHOD COMPARISON")
 print("=" * 80)
@@ -38,90 +41,12 @@ print(f"   Excel lookup created for {len(excel_lookup)} indices")
 print("\n2. Running NEW calculation method...")
 
 # Read raw data
-df = pd.read_csv('data/Latest_Indices_rawdata_14112025.csv')
-df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%y')
+df = load_prices('data/Latest_Indices_rawdata_14112025.csv')
 print(f"   Raw data loaded: {len(df)} rows, {len(df.columns)} columns")
 
-def calculate_new_method(df_with_daily_values, date_column='DATE'):
-    """NEW calculation method with all improvements"""
-    
-    df_melted = df_with_daily_values.melt(
-        id_vars=[date_column], 
-        var_name='SYMBOL', 
-        value_name='VALUE'
-    )
-    df_melted = df_melted.dropna()
-    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
-    df_melted = df_melted.dropna()
-    
-    # Sort by DATE and SYMBOL
-    df_melted = df_melted.sort_values([date_column, 'SYMBOL']).reset_index(drop=True)
-    
-    # Calculate 5-Year Rolling CAGR
-    pr_cagr = 1825
-    
-    def calculate_cagr(x):
-        if len(x) < pr_cagr:
-            return np.nan
-        first_val = x.iloc[0]
-        last_val = x.iloc[-1]
-        if first_val <= 0 or last_val <= 0:
-            return np.nan
-        return (last_val / first_val) ** (1/5) - 1
-    
-    df_melted['Rolling_CAGR'] = (
-        df_melted.groupby('SYMBOL')['VALUE']
-        .rolling(window=pr_cagr, min_periods=pr_cagr)
-        .apply(calculate_cagr, raw=False)
-        .reset_index(level=0, drop=True)
-    )
-    
-    # Calculate Percentile Rank
-    pr_rank = 1825
-    
-    def percentile_rank(x):
-        if len(x) < pr_rank:
-            return np.nan
-        x_clean = pd.Series(x).dropna()
-        if len(x_clean) == 0:
-            return np.nan
-        return x_clean.rank(pct=True).iloc[-1]
-    
-    df_melted['Percentile_Rank'] = (
-        df_melted.groupby('SYMBOL')['Rolling_CAGR']
-        .rolling(window=pr_rank, min_periods=pr_rank)
-        .apply(percentile_rank, raw=False)
-        .reset_index(level=0, drop=True)
-    )
-    
-    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
-    
-    df_processed = df_melted.pivot_table(
-        values='Percentile_Rank', 
-        index=date_column, 
-        columns='SYMBOL'
-    )
-    
-    df_processed['year'] = df_processed.index.year
-    df_processed['month'] = df_processed.index.month
-    df_month_mean = df_processed.groupby(['year', 'month']).mean(numeric_only=True)
-    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
-    
-    df_final_summary = df_month_mean.reset_index()
-    df_final_summary = df_final_summary.iloc[0:1, :].transpose()
-    df_final_summary.columns = ["final_pct_value"]
-    df_final_summary.drop(["year", "month"], inplace=True)
-    
-    df_final_summary['final_pct_value'] = pd.to_numeric(
-        df_final_summary['final_pct_value'], 
-        errors='coerce'
-    )
-    df_final_summary = df_final_summary.dropna()
-    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
-    
-    return df_final_summary
-
-df_new = calculate_new_method(df)
+# 5-Year Rolling CAGR and Percentile Rank (full 1825-day windows), shared
+# with the other comparison scripts through data/calculation_cache/
+df_new = latest_summary(df, 'new')
 print(f"   ✓ NEW calculation completed: {len(df_new)} indices")
 
 # ============================================================================
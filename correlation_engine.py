@@ -0,0 +1,204 @@
+"""
+INDEX RETURN CORRELATIONS FOR THE BASKET VIEW
+
+Precomputes the full N x N correlation matrix of daily index returns for
+several lookbacks (1Y / 3Y / 5Y calendar years up to the latest date) so the
+frontend only has to slice it for the selected basket.
+
+Correlations are pairwise-complete (each pair uses the days on which both
+indices have a return, like DataFrame.corr()), computed for all pairs at once
+with masked matrix products instead of a Python loop over pairs.
+
+Artifacts (next to indices_with_short_names.json):
+    data/index_correlations.bin    float32, little-endian, lookbacks x N x N
+    data/index_correlations.json   manifest: symbols, lookbacks, shape, as-of
+                                   date and an alias -> row lookup
+"""
+
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from name_registry import NameRegistry, load_registry
+from price_store import load_price_matrix
+
+LOOKBACKS = {'1Y': 1, '3Y': 3, '5Y': 5}
+MIN_PERIODS = 20
+CORRELATION_FILE = Path('data/index_correlations.bin')
+MANIFEST_FILE = Path('data/index_correlations.json')
+
+
+def normalize_alias(name):
+    """Lower-case alphanumerics only (the frontend applies the same rule)"""
+    return re.sub(r'[^a-z0-9]', '', str(name).lower())
+
+
+def daily_returns(values):
+    """
+    Simple daily returns per column, skipping missing prices.
+
+    Args:
+        values: 2-D float array (dates x indices), NaN where no price
+
+    Returns:
+        Float array of the same shape; each observed price after the first
+        gets its return versus the previous observed price, everything else NaN
+    """
+    returns = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        rows = np.flatnonzero(~np.isnan(values[:, j]))
+        if len(rows) > 1:
+            prices = values[rows, j]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[rows[1:], j] = prices[1:] / prices[:-1] - 1
+    # Zero / bad prices give no usable return
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def pairwise_correlation(returns, min_periods=MIN_PERIODS):
+    """
+    Pairwise-complete Pearson correlation of all columns at once.
+
+    With M the observed mask and X the returns (0 where missing), every
+    per-pair sum is one matrix product: counts M'M, sums X'M, squares (X*X)'M
+    and cross products X'X.
+
+    Args:
+        returns: 2-D float array (dates x indices), NaN where missing
+        min_periods: Minimum overlapping observations per pair (default: 20)
+
+    Returns:
+        N x N float64 correlation matrix, NaN where the overlap is too short
+        or a series is constant over it
+    """
+    mask = ~np.isnan(returns)
+    m = mask.astype(np.float64)
+    x = np.where(mask, returns, 0.0)
+
+    # Centre each column first so the sums below do not cancel badly
+    counts = m.sum(axis=0)
+    x -= np.divide(x.sum(axis=0), counts, out=np.zeros(len(counts)), where=counts > 0)
+    x *= m
+
+    n = m.T @ m
+    sum_x = x.T @ m
+    sum_xx = (x * x).T @ m
+    sum_xy = x.T @ x
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / n
+        var_x = sum_xx - sum_x * sum_x / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+
+    corr[(n < max(min_periods, 2)) | ~np.isfinite(corr)] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    observed = np.diag(n) >= max(min_periods, 2)
+    corr[np.diag_indices_from(corr)] = np.where(observed, 1.0, np.nan)
+    return corr
+
+
+def correlation_matrices(dates, values, lookbacks=None, min_periods=MIN_PERIODS):
+    """
+    Correlation matrices for each lookback ending at the latest date.
+
+    Args:
+        dates: DatetimeIndex of the rows of ``values``
+        values: 2-D float price array (dates x indices)
+        lookbacks: Mapping of name -> calendar years (default: 1Y, 3Y, 5Y)
+        min_periods: Minimum overlapping returns per pair
+
+    Returns:
+        float32 array of shape (len(lookbacks), N, N)
+    """
+    if lookbacks is None:
+        lookbacks = LOOKBACKS
+
+    order = np.argsort(dates.to_numpy(), kind='mergesort')
+    dates = dates[order]
+    returns = daily_returns(np.asarray(values)[order])
+
+    matrices = np.empty((len(lookbacks), values.shape[1], values.shape[1]), dtype=np.float32)
+    latest = dates.max()
+    for k, years in enumerate(lookbacks.values()):
+        start = dates.searchsorted(latest - pd.DateOffset(years=years), side='right')
+        matrices[k] = pairwise_correlation(returns[start:], min_periods)
+    return matrices
+
+
+def build_aliases(symbols, registry=None):
+    """Normalized alias -> column number, from the CSV names and every registry name"""
+    aliases = {}
+    for j, symbol in enumerate(symbols):
+        aliases.setdefault(normalize_alias(symbol), j)
+    for j, symbol in enumerate(symbols):
+        record = registry.get(symbol) if registry is not None else None
+        for name in NameRegistry.names(record) if record else []:
+            aliases.setdefault(normalize_alias(name), j)
+    return aliases
+
+
+def save_correlations(matrices, symbols, lookbacks, as_of, aliases,
+                      correlation_file=CORRELATION_FILE, manifest_file=MANIFEST_FILE):
+    """Write the float32 matrix file and its JSON manifest"""
+    matrices.astype('<f4').tofile(correlation_file)
+    manifest = {
+        'file': Path(correlation_file).name,
+        'dtype': 'float32',
+        'shape': list(matrices.shape),
+        'lookbacks': list(lookbacks),
+        'as_of': pd.Timestamp(as_of).strftime('%Y-%m-%d'),
+        'symbols': list(symbols),
+        'aliases': aliases,
+    }
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def load_correlations(manifest_file=MANIFEST_FILE):
+    """
+    Read the artifact back.
+
+    Returns:
+        Tuple of (manifest dict, float32 array lookbacks x N x N)
+    """
+    manifest_file = Path(manifest_file)
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    matrices = np.fromfile(manifest_file.parent / manifest['file'], dtype='<f4')
+    return manifest, matrices.reshape(manifest['shape'])
+
+
+def main():
+    print("="*80)
+    print("INDEX RETURN CORRELATIONS (1Y / 3Y / 5Y)")
+    print("="*80)
+    print()
+
+    csv_file = Path('data/Latest_Indices_rawdata_14112025.csv')
+    if not csv_file.exists():
+        print(f"Error: {csv_file} not found!")
+        return
+
+    print(f"Loading data from: {csv_file}")
+    dates, symbols, values = load_price_matrix(csv_file)
+    print(f"Data loaded: {len(dates)} rows, {len(symbols)} index columns")
+
+    matrices = correlation_matrices(dates, values)
+    for name, matrix in zip(LOOKBACKS, matrices):
+        off_diagonal = matrix[~np.eye(len(symbols), dtype=bool)]
+        print(f"   {name}: {np.count_nonzero(~np.isnan(off_diagonal)) // 2} pairs, "
+              f"mean correlation {np.nanmean(off_diagonal):.3f}")
+
+    aliases = build_aliases(symbols, load_registry())
+
+    save_correlations(matrices, symbols, LOOKBACKS, dates.max(), aliases)
+    print(f"\n✓ Matrices saved to: {CORRELATION_FILE} ({matrices.nbytes / 1024:.0f} KB)")
+    print(f"✓ Manifest saved to: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
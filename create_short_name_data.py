@@ -2,6 +2,8 @@ import pandas as pd
 import json
 import re
 
+from compact_publish import save_frontend_data
+
 # Read the Excel file for categories
 df = pd.read_excel('data/NIFTY_Index_Short_Names.xlsx')
 
@@ -94,9 +96,8 @@ if unmatched_details:
         print(f"  - {item['name']}")
         print(f"    Normalized: {item['normalized']}")
 
-# Save the new data structure
-with open('data/indices_with_short_names.json', 'w') as f:
-    json.dump(new_data, f, indent=2)
+# Save the new data structure (and the compact copy the page loads first)
+save_frontend_data(new_data)
 
 print(f"\nSaved {len(new_data)} indices to data/indices_with_short_names.json")
 
@@ -7,13 +7,27 @@ import pandas as pd
 import numpy as np
 import json
 
+from calculation_cache import daily_cagr, daily_ranks
+from name_registry import load_registry
+from price_store import load_prices
+
+# Rows per window, as in the NEW method and the Excel summary it is compared with
+WINDOW = 1825
+# Shown next to it for reference only (never compared with Excel)
+CALENDAR_WINDOW = '5Y'
+
 print("=" * 80)
 print("DETAILED CALCULATION FOR SAMPLE INDICES")
 print("=" * 80)
 
 # Read data
-df_raw = pd.read_csv('data/Latest_Indices_rawdata_14112025.csv')
-df_raw['DATE'] = pd.to_datetime(df_raw['DATE'], format='%d/%m/%y')
+df_raw = load_prices('data/Latest_Indices_rawdata_14112025.csv')
+
+# Daily CAGRs / ranks of every index, computed once and cached in
+# data/calculation_cache/ (shared with the other comparisons)
+df_cagr = daily_cagr(df_raw, 'new', window=WINDOW)
+df_ranks = daily_ranks(df_raw, 'new', window=WINDOW)
+df_calendar_ranks = daily_ranks(df_raw, 'new', window=CALENDAR_WINDOW)
 
 # Read Excel values
 excel_df = pd.read_excel('data/251229_Final_summary.xlsx')
@@ -33,14 +47,8 @@ sample_indices = [
     'NIFTY 500'
 ]
 
-# Mapping to Excel names (which have "tri - " prefix)
-csv_to_excel = {
-    'NIFTY IT': 'tri - Nifty IT',
-    'NIFTY BANK': 'tri - Nifty Bank',
-    'NIFTY AUTO': 'tri - NIFTY AUTO',
-    'NIFTY PSU BANK': 'tri - NIFTY PSU BANK',
-    'NIFTY 500': 'tri - NIFTY 500'
-}
+# Excel names (which have "tri - " prefix) come from data/index_aliases.json
+registry = load_registry()
 
 print("\nSample indices selected for detailed analysis:")
 for idx in sample_indices:
@@ -81,52 +89,53 @@ for symbol in sample_indices:
     # Calculate 5-year rolling CAGR for most recent date
     print(f"\n2. CALCULATE 5-YEAR ROLLING CAGR (Most recent):")
     
-    if len(index_data) >= 1825:
+    if len(index_data) >= WINDOW:
         latest_value = index_data.iloc[-1]['VALUE']
-        value_5y_ago = index_data.iloc[-1825]['VALUE']
+        value_5y_ago = index_data.iloc[-WINDOW]['VALUE']
         latest_date = index_data.iloc[-1]['DATE']
-        date_5y_ago = index_data.iloc[-1825]['DATE']
+        date_5y_ago = index_data.iloc[-WINDOW]['DATE']
         
         cagr = (latest_value / value_5y_ago) ** (1/5) - 1
         
         print(f"   Latest date: {latest_date.date()}")
         print(f"   Latest value: {latest_value:.2f}")
-        print(f"   Date 1825 days ago: {date_5y_ago.date()}")
-        print(f"   Value 1825 days ago: {value_5y_ago:.2f}")
+        print(f"   Date {WINDOW} days ago: {date_5y_ago.date()}")
+        print(f"   Value {WINDOW} days ago: {value_5y_ago:.2f}")
         print(f"   Formula: ({latest_value:.2f} / {value_5y_ago:.2f})^(1/5) - 1")
         print(f"   CAGR = {cagr:.6f} = {cagr*100:.2f}%")
         
         # Calculate all rolling CAGRs for past 5 years
-        print(f"\n3. CALCULATE ALL ROLLING CAGRs (Past 1825 days):")
+        print(f"\n3. CALCULATE ALL ROLLING CAGRs (Past {WINDOW} days):")
         
-        all_cagrs = []
-        for i in range(1825, len(index_data)):
-            curr_val = index_data.iloc[i]['VALUE']
-            past_val = index_data.iloc[i-1825]['VALUE']
-            if past_val > 0 and curr_val > 0:
-                cagr_i = (curr_val / past_val) ** (1/5) - 1
-                all_cagrs.append(cagr_i)
+        all_cagrs = df_cagr.reindex(columns=[symbol])[symbol].reindex(index_data['DATE']).to_numpy()
+        cagrs_in_window = all_cagrs[-WINDOW:]
+        valid_cagrs = all_cagrs[~np.isnan(all_cagrs)]
         
-        print(f"   Total CAGR values calculated: {len(all_cagrs)}")
-        print(f"   CAGR range: {min(all_cagrs):.6f} to {max(all_cagrs):.6f}")
-        print(f"   Mean CAGR: {np.mean(all_cagrs):.6f}")
-        print(f"   Median CAGR: {np.median(all_cagrs):.6f}")
+        print(f"   Total CAGR values calculated: {len(valid_cagrs)}")
+        print(f"   CAGR range: {valid_cagrs.min():.6f} to {valid_cagrs.max():.6f}")
+        print(f"   Mean CAGR: {np.mean(valid_cagrs):.6f}")
+        print(f"   Median CAGR: {np.median(valid_cagrs):.6f}")
         
         # Calculate percentile rank
         print(f"\n4. CALCULATE PERCENTILE RANK:")
         
         latest_cagr = all_cagrs[-1]
-        cagrs_series = pd.Series(all_cagrs)
-        percentile_rank = cagrs_series.rank(pct=True).iloc[-1]
+        percentile_rank = df_ranks.reindex(columns=[symbol])[symbol].reindex(index_data['DATE']).iloc[-1]
+        calendar_rank = df_calendar_ranks.reindex(columns=[symbol])[symbol].reindex(index_data['DATE']).iloc[-1]
+        cagrs_series = pd.Series(cagrs_in_window).dropna()
         
         print(f"   Latest CAGR: {latest_cagr:.6f}")
-        print(f"   Rank among {len(all_cagrs)} values: {cagrs_series.rank().iloc[-1]:.0f}")
+        print(f"   Rank among {len(cagrs_series)} values: {cagrs_series.rank().iloc[-1]:.0f}")
+        if np.isnan(percentile_rank):
+            print(f"   ⚠️  No percentile rank: fewer than {WINDOW} CAGR values so far")
+            continue
         print(f"   Percentile Rank: {percentile_rank:.6f}")
         print(f"   Interpretation: Current CAGR is better than {percentile_rank*100:.2f}% of past 5 years")
+        print(f"   (Reference only, calendar {CALENDAR_WINDOW} window: {calendar_rank:.6f})")
         
         # Compare with Excel
         print(f"\n5. COMPARISON WITH EXCEL:")
-        excel_name = csv_to_excel.get(symbol, symbol)
+        excel_name = registry.field(symbol, 'excel', symbol)
         excel_value = excel_lookup.get(excel_name, None)
         if excel_value is not None:
             print(f"   Excel value: {excel_value:.6f}")
@@ -147,9 +156,9 @@ for symbol in sample_indices:
             print(f"   ⚠️  Not found in Excel (searched for: {excel_name})")
         
     else:
-        print(f"   ⚠️  Insufficient data: Only {len(index_data)} days (need 1825)")
+        print(f"   ⚠️  Insufficient data: Only {len(index_data)} days (need {WINDOW})")
         print(f"   Cannot calculate 5-year rolling CAGR")
-        excel_name = csv_to_excel.get(symbol, symbol)
+        excel_name = registry.field(symbol, 'excel', symbol)
         excel_value = excel_lookup.get(excel_name, None)
         if excel_value is not None:
             print(f"\n   Excel shows value: {excel_value:.6f}")
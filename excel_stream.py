@@ -0,0 +1,147 @@
+"""
+STREAMING READER FOR SUMMARY WORKBOOKS
+
+The publish scripts read summary workbooks (SYMBOL / final_pct_value, with
+optional 'Broad Market Indices' / 'Sectoral Indices' / ... section rows) with
+pd.read_excel() and then walked the DataFrame with iterrows() to find the
+section rows. This module walks the sheet once with openpyxl's read-only
+mode and yields (category, symbol, value) tuples without building a
+DataFrame:
+
+    category  current section ('Broad Market', ...) or None before any section
+    symbol    first column, stripped
+    value     second column as float, or None if empty / not a number
+
+The parsed rows are cached per workbook:
+
+    data/excel_cache/<workbook name>.json   rows + source size / mtime / sha256
+
+A matching size + mtime is trusted directly, otherwise the workbook's sha256
+decides (same rule as price_store.py).
+"""
+
+import json
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+from price_store import file_sha256
+
+SUMMARY_FILE = Path('data/251229_Final_summary.xlsx')
+CACHE_DIR = Path('data/excel_cache')
+
+# Section rows inside a summary sheet -> category name
+CATEGORY_HEADERS = {
+    'Broad Market Indices': 'Broad Market',
+    'Sectoral Indices': 'Sectoral',
+    'Strategy Indices': 'Strategy',
+    'Thematic Indices': 'Thematic',
+}
+
+
+def _as_float(value):
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def iter_summary_rows(workbook_file=SUMMARY_FILE, sheet=None):
+    """
+    Stream (category, symbol, value) tuples straight from a workbook.
+
+    Column-header rows (a text second column, e.g. 'SYMBOL' /
+    'final_pct_value') and section rows are consumed, not yielded.
+
+    Args:
+        workbook_file: .xlsx file with the symbol in column A, value in column B
+        sheet: Sheet name (default: the active sheet)
+    """
+    workbook = load_workbook(workbook_file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        category = None
+        for row in worksheet.iter_rows(max_col=2, values_only=True):
+            if not row or row[0] is None:
+                continue
+            symbol = str(row[0]).strip()
+            if not symbol:
+                continue
+            if symbol in CATEGORY_HEADERS:
+                category = CATEGORY_HEADERS[symbol]
+                continue
+
+            raw = row[1] if len(row) > 1 else None
+            value = _as_float(raw)
+            if value is None and isinstance(raw, str) and raw.strip():
+                continue  # column-header row
+            yield category, symbol, value
+    finally:
+        workbook.close()
+
+
+def _cache_file(workbook_file, sheet, cache_dir):
+    name = Path(workbook_file).name if not sheet else f"{Path(workbook_file).name}.{sheet}"
+    return Path(cache_dir) / f"{name}.json"
+
+
+def load_summary_rows(workbook_file=SUMMARY_FILE, sheet=None, cache_dir=CACHE_DIR):
+    """
+    Parsed (category, symbol, value) rows, from the cache when it is current.
+
+    Returns:
+        List of (category, symbol, value) tuples in sheet order
+    """
+    workbook_file = Path(workbook_file)
+    cache_file = _cache_file(workbook_file, sheet, cache_dir)
+    stat = workbook_file.stat()
+    source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['source'] == source:
+            return [tuple(row) for row in cached['rows']]
+        if cached['source']['size'] == source['size'] and cached['sha256'] == file_sha256(workbook_file):
+            # Same content, only touched: remember the new mtime
+            cached['source'] = source
+            _write_cache(cache_file, cached)
+            return [tuple(row) for row in cached['rows']]
+
+    rows = list(iter_summary_rows(workbook_file, sheet))
+    _write_cache(cache_file, {
+        'source': source,
+        'sha256': file_sha256(workbook_file),
+        'rows': [list(row) for row in rows],
+    })
+    return rows
+
+
+def _write_cache(cache_file, cached):
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix('.json.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cached, f, ensure_ascii=False)
+    tmp_file.replace(cache_file)
+
+
+def summary_values(workbook_file=SUMMARY_FILE, sheet=None, cache_dir=CACHE_DIR):
+    """{symbol: value} for every row that has a numeric value"""
+    return {
+        symbol: value
+        for _, symbol, value in load_summary_rows(workbook_file, sheet, cache_dir)
+        if value is not None
+    }
+
+
+def summary_categories(workbook_file=SUMMARY_FILE, sheet=None, cache_dir=CACHE_DIR):
+    """{symbol: category} for every row inside a section"""
+    return {
+        symbol: category
+        for category, symbol, _ in load_summary_rows(workbook_file, sheet, cache_dir)
+        if category is not None
+    }
@@ -7,6 +7,10 @@ import pandas as pd
 import numpy as np
 import json
 
+from name_registry import load_registry
+from calculation_cache import latest_summary
+from price_store import load_prices
+
 print("=" * 80)
 print("EXCEL (CORRECT) vs NEW CALCULATION - PROPER COMPARISON")
 print("=" * 80)
@@ -18,77 +22,14 @@ print(f"\n1. Excel loaded: {len(excel_df)} indices")
 
 # Load NEW calculation results
 print("\n2. Running NEW calculation...")
-df_raw = pd.read_csv('data/Latest_Indices_rawdata_14112025.csv')
-df_raw['DATE'] = pd.to_datetime(df_raw['DATE'], format='%d/%m/%y')
-
-def calculate_new_method(df_with_daily_values, date_column='DATE'):
-    df_melted = df_with_daily_values.melt(
-        id_vars=[date_column], var_name='SYMBOL', value_name='VALUE'
-    )
-    df_melted = df_melted.dropna()
-    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
-    df_melted = df_melted.dropna()
-    df_melted = df_melted.sort_values([date_column, 'SYMBOL']).reset_index(drop=True)
-    
-    pr_cagr = 1825
-    def calculate_cagr(x):
-        if len(x) < pr_cagr:
-            return np.nan
-        first_val = x.iloc[0]
-        last_val = x.iloc[-1]
-        if first_val <= 0 or last_val <= 0:
-            return np.nan
-        return (last_val / first_val) ** (1/5) - 1
-    
-    df_melted['Rolling_CAGR'] = (
-        df_melted.groupby('SYMBOL')['VALUE']
-        .rolling(window=pr_cagr, min_periods=pr_cagr)
-        .apply(calculate_cagr, raw=False)
-        .reset_index(level=0, drop=True)
-    )
-    
-    pr_rank = 1825
-    def percentile_rank(x):
-        if len(x) < pr_rank:
-            return np.nan
-        x_clean = pd.Series(x).dropna()
-        if len(x_clean) == 0:
-            return np.nan
-        return x_clean.rank(pct=True).iloc[-1]
-    
-    df_melted['Percentile_Rank'] = (
-        df_melted.groupby('SYMBOL')['Rolling_CAGR']
-        .rolling(window=pr_rank, min_periods=pr_rank)
-        .apply(percentile_rank, raw=False)
-        .reset_index(level=0, drop=True)
-    )
-    
-    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
-    df_processed = df_melted.pivot_table(
-        values='Percentile_Rank', index=date_column, columns='SYMBOL'
-    )
-    df_processed['year'] = df_processed.index.year
-    df_processed['month'] = df_processed.index.month
-    df_month_mean = df_processed.groupby(['year', 'month']).mean(numeric_only=True)
-    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
-    df_final_summary = df_month_mean.reset_index()
-    df_final_summary = df_final_summary.iloc[0:1, :].transpose()
-    df_final_summary.columns = ["final_pct_value"]
-    df_final_summary.drop(["year", "month"], inplace=True)
-    df_final_summary['final_pct_value'] = pd.to_numeric(
-        df_final_summary['final_pct_value'], errors='coerce'
-    )
-    df_final_summary = df_final_summary.dropna()
-    return df_final_summary
+df_raw = load_prices('data/Latest_Indices_rawdata_14112025.csv')
 
-df_new = calculate_new_method(df_raw)
+# Same cached result as compare_excel_vs_new.py (data/calculation_cache/)
+df_new = latest_summary(df_raw, 'new')
 print(f"   NEW calculation: {len(df_new)} indices")
 
-# Get our name mapping from create_proper_mapping.py
-# This maps Excel abbreviated names to CSV column names
-import sys
-sys.path.append('.')
-exec(open('create_proper_mapping.py').read().split('# Process summary data')[0])
+# Excel abbreviated names -> CSV column names via data/index_aliases.json
+registry = load_registry()
 
 # Now compare
 print("\n" + "=" * 80)
@@ -101,17 +42,11 @@ for idx, row in excel_df.iterrows():
     excel_symbol = str(row['SYMBOL']).strip()
     excel_value = float(row['final_pct_value'])
     
-    # Try to find corresponding NEW value using name cleaning
-    cleaned = clean_name(excel_symbol)
-    
-    # Check if this cleaned name exists in NEW calculation
+    # Find the CSV column this Excel name refers to
+    matched_symbol = registry.field(excel_symbol, 'csv')
     found_new_value = None
-    for new_symbol in df_new.index:
-        if cleaned.upper() in new_symbol.upper() or new_symbol.upper() in cleaned.upper():
-            if len(new_symbol) > 10 and len(cleaned) > 10:  # Avoid short false matches
-                found_new_value = df_new.loc[new_symbol, 'final_pct_value']
-                matched_symbol = new_symbol
-                break
+    if matched_symbol in df_new.index:
+        found_new_value = df_new.loc[matched_symbol, 'final_pct_value']
     
     if found_new_value is not None:
         diff = excel_value - found_new_value
@@ -0,0 +1,276 @@
+"""
+INCREMENTAL DAILY UPDATE FOR THE PERCENTILE SUMMARY
+
+Keeps the rolling state of calculate_final_summary_v2 on disk so that a new
+day of prices only costs one CAGR + one rank update per index instead of a
+full recompute from the first day of the raw CSV.
+
+Persisted per symbol:
+- the trailing 1824 values (CAGR window)
+- the trailing 1825 CAGRs and their sorted buffer (rank window)
+- the running sum/count of this month's percentile ranks
+- the means of months that closed since the last run, waiting to be appended
+  to the monthly history artifact (monthly_history.py)
+
+The summary produced from the state is the same as calculate_final_summary_v2
+on the full file. Delete the state file to force a full rebuild (e.g. after
+historical prices were revised).
+"""
+
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calculate_corrected_method import monthly_mean_frame
+from monthly_history import HISTORY_FILE, append_months, load_history, save_history
+from price_store import load_prices
+from rolling_engine import (
+    IncrementalRank,
+    matrix_to_frame,
+    rolling_cagr,
+    rolling_percentile_rank,
+    value_matrix,
+)
+
+STATE_FILE = Path('data/rolling_state.pkl')
+STATE_VERSION = 2
+
+
+def _add_to_month(state, ranks):
+    """Add one day of ranks to the running monthly sums (Kahan, like pandas' mean)"""
+    totals = state['month_totals']
+    for symbol, rank in ranks.items():
+        total, compensation, count = totals.get(symbol, (0.0, 0.0, 0))
+        y = rank - compensation
+        t = total + y
+        totals[symbol] = (t, t - total - y, count + 1)
+
+
+def _month_means(state):
+    return {
+        symbol: total / count
+        for symbol, (total, _, count) in sorted(state['month_totals'].items())
+        if count > 0
+    }
+
+
+def _start_month(state, date):
+    """Roll the monthly accumulator over when the first rank of a new month arrives"""
+    month = (date.year, date.month)
+    if state['month'] != month:
+        if state['month'] is not None:
+            state['closed_months'].append((state['month'], _month_means(state)))
+        state['month'] = month
+        state['month_totals'] = {}
+
+
+def build_state(df, date_column='DATE', cagr_window=1825, rank_window=1825, years=5):
+    """
+    Build the rolling state from the full price history.
+
+    Args:
+        df: DataFrame with date column and index value columns (one row per date)
+        date_column: Name of the date column
+        cagr_window: Observations in the CAGR window (default: 1825)
+        rank_window: Observations in the ranking window (default: 1825)
+        years: Years the CAGR window represents (default: 5)
+
+    Returns:
+        State dict ready for update_state / summary_from_state
+    """
+    df = df.sort_values(date_column, kind='mergesort')
+    dates, symbols, values = value_matrix(df, date_column)
+    observed = ~np.isnan(values)
+
+    state = {
+        'version': STATE_VERSION,
+        'params': {'cagr_window': cagr_window, 'rank_window': rank_window, 'years': years},
+        'last_date': dates.max(),
+        'month': None,
+        'month_totals': {},
+        'closed_months': [],
+        'symbols': {},
+    }
+
+    ranks = np.full(values.shape, np.nan)
+    for j, symbol in enumerate(symbols):
+        rows = np.flatnonzero(observed[:, j])
+        if len(rows) == 0:
+            continue
+        column = values[rows, j]
+        cagrs = rolling_cagr(column, cagr_window, years)
+        ranks[rows, j] = rolling_percentile_rank(cagrs, rank_window)
+        state['symbols'][symbol] = IncrementalRank.from_history(
+            column, cagrs, cagr_window, rank_window, years
+        )
+
+    # Seed the partial monthly mean with the latest month that has ranks
+    ranked_rows = np.flatnonzero(~np.isnan(ranks).all(axis=1))
+    if len(ranked_rows) > 0:
+        latest = dates[ranked_rows].max()
+
+        # Every earlier month is closed and goes to the monthly history
+        df_processed = matrix_to_frame(ranks, dates, symbols, date_column)
+        df_month_mean = monthly_mean_frame(df_processed).sort_index()
+        state['closed_months'] = [
+            (month, row.dropna().to_dict()) for month, row in df_month_mean.iloc[:-1].iterrows()
+        ]
+
+        _start_month(state, latest)
+        in_month = (dates.year == latest.year) & (dates.month == latest.month)
+        for i in np.flatnonzero(in_month):
+            _add_to_month(state, {
+                symbols[j]: ranks[i, j] for j in np.flatnonzero(~np.isnan(ranks[i]))
+            })
+
+    return state
+
+
+def update_state(state, date, row):
+    """
+    Apply one new day of prices to the state.
+
+    Args:
+        state: State dict from build_state / load_state
+        date: Date of the new row (must be after the last processed date)
+        row: Mapping of symbol -> value (NaN / non-numeric values are skipped)
+
+    Returns:
+        Dict of symbol -> percentile rank for the symbols ranked on this date
+    """
+    date = pd.Timestamp(date)
+    if date <= state['last_date']:
+        raise ValueError(
+            f"{date.date()} is not after the last processed date {state['last_date'].date()}"
+        )
+
+    params = state['params']
+    row = pd.to_numeric(pd.Series(row, dtype=object), errors='coerce')
+    ranks = {}
+    for symbol, value in row.dropna().items():
+        tracker = state['symbols'].get(symbol)
+        if tracker is None:
+            tracker = state['symbols'][symbol] = IncrementalRank(**params)
+        _, rank = tracker.push(float(value))
+        if rank == rank:
+            ranks[symbol] = rank
+
+    if ranks:
+        _start_month(state, date)
+        _add_to_month(state, ranks)
+    state['last_date'] = date
+    return ranks
+
+
+def summary_from_state(state):
+    """
+    Latest-month summary, same shape as calculate_final_summary_v2's result.
+
+    Returns:
+        DataFrame with 'final_pct_value' per symbol, sorted ascending
+    """
+    df_final_summary = pd.DataFrame({
+        'final_pct_value': pd.Series(_month_means(state), dtype='float64')
+    })
+    df_final_summary.index.name = 'SYMBOL'
+    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
+    return df_final_summary
+
+
+def load_state(state_file=STATE_FILE):
+    """Load a saved state, or None if missing / written by another version"""
+    state_file = Path(state_file)
+    if not state_file.exists():
+        return None
+    with open(state_file, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state, state_file=STATE_FILE):
+    """Write the state atomically (temp file + rename)"""
+    state_file = Path(state_file)
+    tmp_file = state_file.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_file.replace(state_file)
+
+
+def update_from_dataframe(df, state=None, date_column='DATE', **params):
+    """
+    Bring a state up to date with a price DataFrame.
+
+    Rows newer than the state's last date are applied one by one; without a
+    usable state (missing or different window parameters) it is rebuilt.
+
+    Returns:
+        Tuple of (state, number of new rows applied, rebuilt flag)
+    """
+    defaults = {'cagr_window': 1825, 'rank_window': 1825, 'years': 5}
+    defaults.update(params)
+
+    if state is None or state['params'] != defaults:
+        return build_state(df, date_column, **defaults), len(df), True
+
+    new_rows = df[df[date_column] > state['last_date']].sort_values(date_column, kind='mergesort')
+    for _, row in new_rows.iterrows():
+        update_state(state, row[date_column], row.drop(date_column))
+    return state, len(new_rows), False
+
+
+def main():
+    print("="*80)
+    print("INCREMENTAL UPDATE: Rolling 5-Year Percentile Ranking")
+    print("="*80)
+    print()
+
+    csv_file = Path('data/Latest_Indices_rawdata_14112025.csv')
+    if not csv_file.exists():
+        print(f"Error: {csv_file} not found!")
+        return
+
+    print(f"Loading data from: {csv_file}")
+    df = load_prices(csv_file)
+
+    state = load_state()
+    if state is None:
+        print("No saved state - building from full history...")
+    else:
+        print(f"Saved state up to: {state['last_date'].date()}")
+
+    state, n_rows, rebuilt = update_from_dataframe(df, state)
+    if rebuilt:
+        print(f"✓ State built from {n_rows} rows")
+    else:
+        print(f"✓ Applied {n_rows} new row(s)")
+
+    # Months that closed since the last run go to the history artifact;
+    # a rebuilt state carries the complete history and replaces the file
+    history = None if rebuilt else load_history()
+    closed_months = state['closed_months']
+    if closed_months or history is None:
+        history = append_months(history, closed_months)
+        save_history(history)
+        print(f"✓ Monthly history: +{len(closed_months)} month(s), "
+              f"{len(history['months'])} total -> {HISTORY_FILE}")
+    state['closed_months'] = []
+
+    save_state(state)
+    print(f"✓ State saved to: {STATE_FILE}")
+
+    df_final_summary = summary_from_state(state)
+    if state['month'] is not None:
+        year, month = state['month']
+        print(f"   Latest month: {year}-{month:02d}")
+
+    output_file = 'data/CORRECTED_METHOD1_summary.xlsx'
+    df_final_summary.to_excel(output_file)
+    print(f"✓ Results saved to: {output_file} ({len(df_final_summary)} indices)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+RUN INSTRUMENTATION
+
+Lightweight per-step measurements for the calculation scripts, so a slower
+nightly run shows which step got slower without attaching a profiler:
+
+    report = RunReport('calculate_final_summary_v2')
+    with report.stage('cagr') as stage:
+        cagr = ...
+        stage['rows'] = len(cagr)
+    report.save('data/CORRECTED_METHOD1_run_report.json')
+
+Each stage records wall time, CPU time (this process only, worker processes
+are not included), an optional row count and the change in memory:
+
+    memory='rss'          resident set size before/after (cheap; default)
+    memory='tracemalloc'  Python-level allocations during the stage, incl.
+                          NumPy buffers (exact, but slows the run down)
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (None if it cannot be read)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / MB
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / MB if sys.platform == 'darwin' else peak / 1024
+
+
+def _json_default(value):
+    """NumPy scalars -> Python numbers, anything else -> str"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class RunReport:
+    """
+    Collects stage measurements for one run.
+
+    Args:
+        name: Name of the run (e.g. the function or script)
+        memory: 'rss' (default), 'tracemalloc' or None
+        verbose: Print a one-line summary after each stage
+    """
+
+    def __init__(self, name, memory='rss', verbose=False):
+        if memory not in ('rss', 'tracemalloc', None):
+            raise ValueError(f"memory must be 'rss', 'tracemalloc' or None, not {memory!r}")
+        self.name = name
+        self.memory = memory
+        self.verbose = verbose
+        self.stages = []
+        self.info = {}
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Measure the enclosed block.
+
+        Yields the stage record; set record['rows'] (or any other key) inside
+        the block to add details.
+        """
+        record = {'name': name, 'rows': rows}
+        started_tracing = False
+        if self.memory == 'tracemalloc':
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        elif self.memory == 'rss':
+            rss_before = current_rss_mb()
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall
+            record['cpu_seconds'] = time.process_time() - cpu
+            if self.memory == 'tracemalloc':
+                traced_after, traced_peak = tracemalloc.get_traced_memory()
+                record['alloc_delta_mb'] = (traced_after - traced_before) / MB
+                record['alloc_peak_mb'] = (traced_peak - traced_before) / MB
+                if started_tracing:
+                    tracemalloc.stop()
+            elif self.memory == 'rss':
+                rss_after = current_rss_mb()
+                record['rss_mb'] = rss_after
+                record['rss_delta_mb'] = (
+                    rss_after - rss_before if rss_after is not None and rss_before is not None else None
+                )
+            self.stages.append(record)
+            if self.verbose:
+                print(f"   {self.format_stage(record)}")
+
+    @staticmethod
+    def format_stage(record):
+        """'1.234s wall / 1.200s CPU, +12.3 MB' for one stage record"""
+        text = f"{record['wall_seconds']:.3f}s wall / {record['cpu_seconds']:.3f}s CPU"
+        delta = record.get('rss_delta_mb', record.get('alloc_delta_mb'))
+        if delta is not None:
+            text += f", {delta:+.1f} MB"
+        return text
+
+    def to_dict(self):
+        import numpy as np
+        import pandas as pd
+
+        return {
+            'name': self.name,
+            'started': self.started.isoformat(timespec='seconds'),
+            'wall_seconds': time.perf_counter() - self._start,
+            'cpu_seconds': time.process_time() - self._start_cpu,
+            'peak_rss_mb': peak_rss_mb(),
+            'memory_mode': self.memory,
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'info': self.info,
+            'stages': self.stages,
+        }
+
+    def save(self, report_file):
+        """Write the report as JSON"""
+        report_file = Path(report_file)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, default=_json_default)
+        return report_file
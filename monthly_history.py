@@ -0,0 +1,125 @@
+"""
+MONTHLY PERCENTILE HISTORY ARTIFACT
+
+calculate_final_summary_v2 averages the daily percentile ranks per month for
+the whole history but only the latest month used to be kept. This module
+stores every *closed* month (months x indices) in one compact JSON file that
+the frontend heatmap can load directly to show sector rotation over time:
+
+    {
+      "months":  ["2010-08", "2010-09", ...],
+      "symbols": ["NIFTY 50", ...],
+      "values":  {"NIFTY 50": [0.4123, null, ...], ...}
+    }
+
+Each symbol's list is aligned with "months" (null = no rank that month).
+Values are rounded to 4 decimals. A month counts as closed once prices from a
+later month exist; the month still in progress stays in the regular summary.
+"""
+
+import json
+import math
+from pathlib import Path
+
+import pandas as pd
+
+HISTORY_FILE = Path('data/monthly_percentile_history.json')
+DECIMALS = 4
+
+
+def _month_key(year, month):
+    return f"{int(year)}-{int(month):02d}"
+
+
+def empty_history():
+    return {'months': [], 'symbols': [], 'values': {}}
+
+
+def append_months(history, months):
+    """
+    Append closed months to a history dict (in place).
+
+    Months that are already in the history are skipped, so replaying the same
+    update after an interrupted run is harmless.
+
+    Args:
+        history: History dict (see module docstring), or None for a new one
+        months: Iterable of ((year, month), {symbol: mean percentile}) in date order
+
+    Returns:
+        The updated history dict
+    """
+    if history is None:
+        history = empty_history()
+    values = history['values']
+
+    for (year, month), means in months:
+        key = _month_key(year, month)
+        if history['months'] and key <= history['months'][-1]:
+            continue
+        n_before = len(history['months'])
+        history['months'].append(key)
+
+        for symbol, mean in means.items():
+            if symbol not in values:
+                history['symbols'].append(symbol)
+                values[symbol] = [None] * n_before
+            if mean is not None and not math.isnan(mean):
+                mean = round(float(mean), DECIMALS)
+            else:
+                mean = None
+            values[symbol].append(mean)
+
+        # Symbols without a rank this month
+        for symbol in history['symbols']:
+            if len(values[symbol]) == n_before:
+                values[symbol].append(None)
+
+    return history
+
+
+def history_from_month_mean(df_month_mean):
+    """
+    Build the history from a full monthly-mean table.
+
+    Args:
+        df_month_mean: DataFrame indexed by (year, month) with one column per index,
+            as produced in calculate_final_summary_v2 (any row order)
+
+    Returns:
+        History dict holding every month except the latest (still open) one
+    """
+    df_month_mean = df_month_mean.sort_index().iloc[:-1]
+    df_month_mean = df_month_mean.dropna(axis=1, how='all')
+    return append_months(None, (
+        (month, row.to_dict()) for month, row in df_month_mean.iterrows()
+    ))
+
+
+def history_to_frame(history):
+    """History dict as a DataFrame (months x symbols, NaN where missing)"""
+    df = pd.DataFrame(
+        {symbol: history['values'][symbol] for symbol in history['symbols']},
+        index=pd.Index(history['months'], name='MONTH'),
+        dtype='float64'
+    )
+    df.columns.name = 'SYMBOL'
+    return df
+
+
+def load_history(history_file=HISTORY_FILE):
+    """Load the history file, or None if it does not exist yet"""
+    history_file = Path(history_file)
+    if not history_file.exists():
+        return None
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_history(history, history_file=HISTORY_FILE):
+    """Write the history compactly and atomically (temp file + rename)"""
+    history_file = Path(history_file)
+    tmp_file = history_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(history, f, separators=(',', ':'), ensure_ascii=False)
+    tmp_file.replace(history_file)
@@ -0,0 +1,208 @@
+"""
+FUZZY INDEX NAME MATCHER
+
+Fallback for names the registry (name_registry.py) does not know yet, e.g. a
+new NSE index whose CSV column is spelled 'Nifty500 Qlty50' while the
+frontend file says 'Nifty500 Quality 50'.
+
+Every name is split into tokens (camelCase and letter/digit boundaries count
+as separators) and common NSE abbreviations are expanded ('SMLCAP' ->
+'smallcap', 'Qlty' -> 'quality', 'Momentm' -> 'momentum'). The expanded text
+is indexed by character trigram and by token in inverted indexes (numpy
+posting arrays), so a query touches only the posting lists of its own
+trigrams instead of comparing against every known name. The score mixes
+trigram overlap (typos, squashed words) with token overlap (so 'Smallcap 50'
+and 'Smallcap 250' stay apart). Word order does not matter.
+
+Only abbreviations of three or more letters that mean one thing are
+expanded: 'q', 'sc', 'tr', 'ind' or 'log' could stand for different words
+in different names, and a wrong expansion would produce a confident wrong
+match. NameMatcher.best() only accepts a clear winner and can hand the
+near-ties back to the caller for reporting.
+"""
+
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# NSE short forms -> words, applied per whole token after lower-casing.
+# Keys are at least MIN_ABBREVIATION letters long (checked below)
+MIN_ABBREVIATION = 3
+ABBREVIATIONS = {
+    'smlcap': 'smallcap', 'sml': 'smallcap',
+    'midsml': 'midsmallcap',
+    'm150': 'midcap 150', 'niftym': 'midcap',
+    'qlty': 'quality', 'qualty': 'quality',
+    'momentm': 'momentum', 'momntm': 'momentum', 'mom': 'momentum',
+    'eql': 'equal',
+    'wgt': 'weight',
+    'lowvol': 'low volatility', 'vol': 'volatility',
+    'div': 'dividend', 'opps': 'opportunities', 'opp': 'opportunities',
+    'fin': 'financial', 'finsrv': 'financial services', 'finser': 'financial services',
+    'serv': 'services', 'srv': 'services', 'svc': 'services',
+    'pvt': 'private', 'mfg': 'manufacturing', 'manuf': 'manufacturing',
+    'cons': 'consumer', 'consr': 'consumer', 'consump': 'consumption',
+    'durbl': 'durables', 'noncyc': 'non cyclical',
+    'infra': 'infrastructure', 'infralog': 'infrastructure logistics',
+    'trans': 'transportation', 'logis': 'logistics',
+    'hlth': 'healthcare', 'health': 'healthcare', 'telcm': 'telecom',
+    'mkt': 'market', 'liq': 'liquid', 'enh': 'enhanced',
+    'secldr': 'sector leaders', 'sect': 'sector', 'grow': 'growth',
+    'cln': 'clean',
+    'aql': 'alpha quality low volatility', 'aqlv': 'alpha quality value low volatility',
+    'mqvlv': 'momentum quality value low volatility',
+    'alphalowvol': 'alpha low volatility', 'largemid': 'large midcap',
+    'mid': 'midcap', 'multi': 'multicap', 'bnk': 'bank', 'ser': 'services',
+    'service': 'services', 'ldr': 'leaders', 'corp': 'corporate',
+}
+assert all(len(key) >= MIN_ABBREVIATION for key in ABBREVIATIONS)
+
+# Tokens that appear in nearly every name and carry no information
+STOPWORDS = {'tri', 'nifty', 'index', 'indices', 'the', 'and', 'of'}
+
+
+def tokenize(name):
+    """'Nifty200Momentm30' -> ['200', 'momentum', '30']"""
+    name = str(name).strip()
+    if name.lower().startswith('tri - '):
+        name = name[6:]
+    name = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', name.replace('&', ' and '))
+    name = re.sub(r'(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])', ' ', name)
+    tokens = []
+    for token in re.findall(r'[a-z0-9]+', name.lower()):
+        tokens.extend(ABBREVIATIONS.get(token, token).split())
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def trigrams(text):
+    """Character trigrams of ' text ' (the padding marks word edges)"""
+    text = f" {text} "
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class NameMatcher:
+    """Trigram / token inverted index over (key, name) pairs"""
+
+    def __init__(self):
+        self.keys = []            # entry number -> key it resolves to
+        self.names = []           # entry number -> original name
+        self.gram_postings = defaultdict(list)    # trigram -> [(entry, count)]
+        self.token_postings = defaultdict(list)   # token -> [entry]
+        self._gram_sizes = []
+        self._token_sizes = []
+        self._arrays = None
+
+    @classmethod
+    def from_registry(cls, registry):
+        """Index every name of every record in a NameRegistry under its ID"""
+        matcher = cls()
+        for index_id, record in registry.records.items():
+            for name in registry.names(record):
+                matcher.add(index_id, name)
+        return matcher
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, key, name):
+        """Make `name` resolve to `key`"""
+        tokens = set(tokenize(name))
+        grams = trigrams(' '.join(sorted(tokens)))
+        entry = len(self.names)
+        self.keys.append(key)
+        self.names.append(name)
+        self._gram_sizes.append(sum(grams.values()))
+        self._token_sizes.append(len(tokens))
+        for gram, count in grams.items():
+            self.gram_postings[gram].append((entry, count))
+        for token in tokens:
+            self.token_postings[token].append(entry)
+        self._arrays = None
+
+    def _build_arrays(self):
+        """Freeze the posting lists into numpy arrays (redone after add())"""
+        gram_arrays = {
+            gram: (np.array([e for e, _ in posting], dtype=np.int32),
+                   np.array([c for _, c in posting], dtype=np.int32))
+            for gram, posting in self.gram_postings.items()
+        }
+        token_arrays = {
+            token: np.array(posting, dtype=np.int32)
+            for token, posting in self.token_postings.items()
+        }
+        self._arrays = (gram_arrays, token_arrays,
+                        np.array(self._gram_sizes, dtype=np.float64),
+                        np.array(self._token_sizes, dtype=np.float64))
+        return self._arrays
+
+    def match(self, name, limit=5, min_score=0.0):
+        """
+        Scored candidates for a name, best first.
+
+        Args:
+            name: Name to look up
+            limit: Maximum number of candidates (one per key)
+            min_score: Drop candidates scoring below this (0..1)
+
+        Returns:
+            List of (key, score, matched_name) tuples
+        """
+        gram_arrays, token_arrays, gram_sizes, token_sizes = self._arrays or self._build_arrays()
+        tokens = set(tokenize(name))
+        grams = trigrams(' '.join(sorted(tokens)))
+
+        # Each entry appears at most once per posting list, so plain fancy
+        # indexing accumulates correctly
+        shared_grams = np.zeros(len(self.names))
+        for gram, count in grams.items():
+            posting = gram_arrays.get(gram)
+            if posting is not None:
+                entries, counts = posting
+                shared_grams[entries] += np.minimum(counts, count)
+        shared_tokens = np.zeros(len(self.names))
+        for token in tokens:
+            entries = token_arrays.get(token)
+            if entries is not None:
+                shared_tokens[entries] += 1
+
+        candidates = np.flatnonzero(shared_grams)
+        gram_score = 2 * shared_grams[candidates] / (sum(grams.values()) + gram_sizes[candidates])
+        token_score = 2 * shared_tokens[candidates] / np.maximum(len(tokens) + token_sizes[candidates], 1)
+        scores = (gram_score + token_score) / 2
+
+        results = []
+        seen = set()
+        for i in np.argsort(-scores, kind='stable'):
+            if scores[i] < min_score or len(results) == limit:
+                break
+            entry = candidates[i]
+            key = self.keys[entry]
+            if key not in seen:
+                seen.add(key)
+                results.append((key, float(scores[i]), self.names[entry]))
+        return results
+
+    def best(self, name, min_score=0.75, margin=0.10, rejected=None):
+        """
+        Single confident match, or None.
+
+        The top candidate must reach `min_score` and beat the runner-up by
+        `margin`, so a name that fits two indices about equally well is left
+        for a person to add to the registry.
+
+        Args:
+            name: Name to look up
+            min_score: Lowest acceptable score (0..1)
+            margin: Lead the top candidate needs over the runner-up
+            rejected: Optional list; a name that reached min_score but lost
+                on margin is appended as (name, candidates) for reporting
+        """
+        candidates = self.match(name, limit=2)
+        if not candidates or candidates[0][1] < min_score:
+            return None
+        if len(candidates) > 1 and candidates[0][1] - candidates[1][1] < margin:
+            if rejected is not None:
+                rejected.append((name, candidates))
+            return None
+        return candidates[0][0]
@@ -0,0 +1,111 @@
+"""
+INDEX NAME REGISTRY
+
+One place for every name an index goes by. data/index_aliases.json holds one
+record per index:
+
+    id        canonical ID (the raw CSV column name, or the Excel name for
+              indices that are not in the CSV)
+    csv       column name in the raw price CSV (null if not there)
+    excel     'tri - ...' name used in 251229_Final_summary.xlsx (or null)
+    short     short code from NIFTY_Index_Short_Names.xlsx (or null)
+    display   name shown on the webpage
+    category  Broad Market / Sectoral / Strategy / Thematic (or null)
+    aliases   any other spellings seen in older files
+
+All of these are normalized (case, 'tri - ' prefix, punctuation, '&' = 'and')
+into one hash index, so any of them resolves to the canonical ID in O(1).
+An alias that would point at two different indices is an error at load time
+instead of a silent mismatch.
+"""
+
+import json
+import re
+from pathlib import Path
+
+REGISTRY_FILE = Path('data/index_aliases.json')
+NAME_FIELDS = ('id', 'csv', 'excel', 'short', 'display')
+
+_registries = {}
+
+
+def normalize(name):
+    """Matching key for a name: 'tri - NIFTY Oil & Gas' -> 'niftyoilandgas'"""
+    name = str(name).strip()
+    if name.lower().startswith('tri - '):
+        name = name[6:]
+    return re.sub(r'[^a-z0-9]', '', name.lower().replace('&', ' and '))
+
+
+class NameRegistry:
+    """Alias -> index record lookup built from data/index_aliases.json"""
+
+    def __init__(self, records):
+        self.records = {}
+        self.index = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        """Register one record (dict with the fields listed in the module docstring)"""
+        index_id = record['id']
+        if index_id in self.records:
+            raise ValueError(f"Duplicate index id '{index_id}'")
+        self.records[index_id] = record
+
+        for name in self.names(record):
+            key = normalize(name)
+            if not key:
+                continue
+            owner = self.index.setdefault(key, index_id)
+            if owner != index_id:
+                raise ValueError(f"Alias '{name}' matches both '{owner}' and '{index_id}'")
+
+    @staticmethod
+    def names(record):
+        """Every known name of a record"""
+        names = [record.get(field) for field in NAME_FIELDS]
+        names.extend(record.get('aliases', []))
+        return [name for name in names if name]
+
+    @classmethod
+    def from_file(cls, registry_file=REGISTRY_FILE):
+        with open(registry_file, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)['indices'])
+
+    def __contains__(self, name):
+        return normalize(name) in self.index
+
+    def __len__(self):
+        return len(self.records)
+
+    def resolve(self, name):
+        """Canonical ID for any known name, or None"""
+        return self.index.get(normalize(name))
+
+    def get(self, name):
+        """Full record for any known name, or None"""
+        index_id = self.index.get(normalize(name))
+        return None if index_id is None else self.records[index_id]
+
+    def field(self, name, field, default=None):
+        """One field ('csv', 'excel', 'short', 'display', 'category') for any known name"""
+        record = self.get(name)
+        if record is None or record.get(field) is None:
+            return default
+        return record[field]
+
+
+def load_registry(registry_file=REGISTRY_FILE):
+    """
+    Shared registry instance, loaded once per file.
+
+    The file is re-read only if its mtime changed since the last load.
+    """
+    registry_file = Path(registry_file)
+    mtime = registry_file.stat().st_mtime_ns
+    cached = _registries.get(registry_file)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, NameRegistry.from_file(registry_file))
+        _registries[registry_file] = cached
+    return cached[1]
@@ -0,0 +1,443 @@
+"""
+INCREMENTAL PUBLISH PIPELINE
+
+Runs the whole raw-CSV -> heatmap chain as a small DAG of stages that wrap
+the existing functions:
+
+    prices ─┬─ cagr ─┬─ rank ─┬─ monthly ── summary ─┬─ publish
+            │        │        └─ periods             │
+            │        └─ cross_section ───────────────┤
+            │   groups ─┘                            │
+            ├─ horizons ─────────────────────────────┘
+            └─ correlations ── correlation_files
+
+Every stage's output is stored in data/pipeline_cache/ under a key that
+hashes the stage's parameters, the contents of the files it reads, the
+source of the stage function and of the engine modules it uses, and the
+keys of the stages it depends on. A stage only runs when that key changed
+(or one of the files it writes is missing), and an upstream stage is only
+loaded or computed if something downstream actually needs it.
+
+Only `groups`, `correlation_files` and `publish` read data/index_aliases.json.
+`groups` is cheap and always runs; the stages after it are keyed on its
+result (the category of each index) rather than on the file. So after a
+fix to the aliases, `groups`, `correlation_files` and `publish` run, and
+`cross_section` reruns only if the fix changed an index's category group.
+The rolling engine is not touched. Editing rolling_engine.py reruns the
+stages that use it.
+
+Usage:
+    python pipeline.py                  # bring everything up to date
+    python pipeline.py publish          # just what publish needs
+    python pipeline.py --force rank     # rerun a stage even if cached
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calculate_corrected_method import (
+    CATEGORY_GROUPS_FILE,
+    CROSS_SECTION_FILE,
+    PERIOD_SUMMARY_FILE,
+    PERIODS,
+    calculate_multi_horizon_summary,
+    cross_sectional_summary,
+    load_category_groups,
+    latest_month_summary,
+    monthly_mean_frame,
+    period_mean_frame,
+    save_period_summaries,
+)
+from correlation_engine import build_aliases, correlation_matrices, save_correlations, LOOKBACKS
+from compact_publish import COMPACT_FILE, save_frontend_data
+from excel_stream import summary_categories
+from monthly_history import HISTORY_FILE, history_from_month_mean, save_history
+from name_registry import REGISTRY_FILE, load_registry
+from price_store import DATE_COLUMN, RAW_CSV, file_sha256, load_price_matrix
+from rolling_engine import PrefixSums, apply_columns, matrix_to_frame, rolling_cagr, rolling_percentile_rank
+from update_frontend_final import build_frontend_data, cross_section_from_frame, horizons_from_frame
+
+PIPELINE_CACHE_DIR = Path('data/pipeline_cache')
+SUMMARY_FILE = Path('data/CORRECTED_METHOD1_summary.xlsx')
+HORIZON_FILE = Path('data/MULTI_HORIZON_summary.xlsx')
+CATEGORY_FILE = Path('data/251229_Final_summary.xlsx')
+FRONTEND_FILE = Path('data/indices_with_short_names.json')
+CORRELATION_FILES = (Path('data/index_correlations.bin'), Path('data/index_correlations.json'))
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    Args:
+        name: Stage name (also the cache file prefix)
+        func: Called as func(*dependency outputs, **params)
+        deps: Names of the stages whose outputs func takes, in order
+        params: Keyword arguments for func; part of the cache key
+        files: Input files read by func; their contents are part of the key
+        outputs: Files written by func; the stage reruns if one is missing
+        cache: Store the output (False for stages that are cheap to redo)
+        version: Bump to invalidate old outputs for reasons the key cannot
+            see (func's source and ``modules`` are already part of it)
+        modules: Names of the modules whose code func relies on; their
+            source files are part of the key, so an engine edit reruns it
+        key_by_output: Key downstream stages on a hash of this stage's
+            output instead of its inputs (for cheap stages with cache=False,
+            so an input change that leaves the output alone is not passed on)
+    """
+
+    def __init__(self, name, func, deps=(), params=None, files=(), outputs=(),
+                 cache=True, version=1, modules=(), key_by_output=False):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.files = tuple(Path(f) for f in files)
+        self.outputs = tuple(Path(f) for f in outputs)
+        self.cache = cache
+        self.version = version
+        self.modules = tuple(modules)
+        self.key_by_output = key_by_output
+
+
+class Pipeline:
+    """Runs stages in dependency order, reusing cached outputs"""
+
+    def __init__(self, stages, cache_dir=PIPELINE_CACHE_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = Path(cache_dir)
+        self.report = []
+        self._keys = {}
+        self._results = {}
+        self._digests = None
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+    # ---- cache keys -------------------------------------------------------
+
+    def _file_digest(self, path):
+        """sha256 of a file, memoized on (size, mtime) in the cache directory"""
+        if self._digests is None:
+            digest_file = self.cache_dir / 'file_digests.json'
+            self._digests = {}
+            if digest_file.exists():
+                with open(digest_file, 'r') as f:
+                    self._digests = json.load(f)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        source = [stat.st_size, stat.st_mtime_ns]
+        entry = self._digests.get(str(path))
+        if entry is None or entry['source'] != source:
+            entry = {'source': source, 'sha256': file_sha256(path)}
+            self._digests[str(path)] = entry
+        return entry['sha256']
+
+    def _save_digests(self):
+        if self._digests is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_dir / 'file_digests.json', 'w') as f:
+                json.dump(self._digests, f, indent=2)
+
+    def _code_digest(self, stage):
+        """sha256 of the stage function's source and of its modules' files"""
+        func = stage.func
+        while isinstance(func, partial):
+            func = func.func
+        digest = hashlib.sha256(inspect.getsource(func).encode('utf-8'))
+        for module in sorted(stage.modules):
+            digest.update(module.encode('utf-8'))
+            digest.update(self._file_digest(Path(importlib.import_module(module).__file__)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def key(self, name):
+        """Cache key of a stage (hash of params, input files, code and upstream keys)"""
+        if name not in self._keys:
+            stage = self.stages[name]
+            if stage.key_by_output:
+                blob = pickle.dumps(self.get(name), protocol=pickle.HIGHEST_PROTOCOL)
+                self._keys[name] = hashlib.sha256(name.encode('utf-8') + blob).hexdigest()
+                return self._keys[name]
+            payload = {
+                'stage': name,
+                'version': stage.version,
+                'params': stage.params,
+                'files': {str(f): self._file_digest(f) for f in stage.files},
+                'code': self._code_digest(stage),
+                'deps': [self.key(dep) for dep in stage.deps],
+            }
+            blob = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+            self._keys[name] = hashlib.sha256(blob).hexdigest()
+        return self._keys[name]
+
+    def _cache_file(self, name):
+        return self.cache_dir / f"{name}-{self.key(name)[:16]}.pkl"
+
+    # ---- running ----------------------------------------------------------
+
+    def get(self, name, force=()):
+        """Output of a stage: from memory, from the cache, or by running it"""
+        if name in self._results:
+            return self._results[name]
+
+        stage = self.stages[name]
+        outputs_present = all(path.exists() for path in stage.outputs)
+
+        # Uncached stages never look up their key: a key_by_output stage's
+        # key is computed from the value this runs
+        if stage.cache and name not in force and outputs_present and self._cache_file(name).exists():
+            start = time.perf_counter()
+            with open(self._cache_file(name), 'rb') as f:
+                value = pickle.load(f)
+            self.report.append((name, 'cached', time.perf_counter() - start))
+        else:
+            inputs = [self.get(dep, force) for dep in stage.deps]
+            start = time.perf_counter()
+            value = stage.func(*inputs, **stage.params)
+            self.report.append((name, 'ran', time.perf_counter() - start))
+            if stage.cache:
+                self._store(name, value)
+
+        self._results[name] = value
+        return value
+
+    def _store(self, name, value):
+        """Write a stage output and drop that stage's older cache files"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self._cache_file(name)
+        tmp_file = cache_file.with_suffix('.pkl.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_file.replace(cache_file)
+        for old in self.cache_dir.glob(f"{name}-*.pkl"):
+            if old != cache_file:
+                old.unlink()
+
+    def run(self, targets=None, force=()):
+        """
+        Bring the target stages up to date.
+
+        Args:
+            targets: Stage names (default: every stage nothing depends on)
+            force: Stage names to rerun even if their output is cached
+
+        Returns:
+            {target: output}
+        """
+        if targets is None:
+            needed = {dep for stage in self.stages.values() for dep in stage.deps}
+            targets = [name for name in self.stages if name not in needed]
+        unknown = [name for name in list(targets) + list(force) if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+
+        try:
+            return {name: self.get(name, set(force)) for name in targets}
+        finally:
+            self._save_digests()
+
+
+# ---- stage functions ------------------------------------------------------
+
+def _observed(prices):
+    return ~np.isnan(prices[2])
+
+
+def stage_prices(csv_file, sort_dates):
+    """
+    (dates, symbols, float64 matrix) from the columnar price cache.
+
+    The rolling kernels walk rows in order, so with sort_dates the rows are
+    stable-sorted by date first (as calculate_final_summary_v2 does); a file
+    that is already in date order is passed through without a copy.
+    """
+    dates, symbols, values = load_price_matrix(csv_file)
+    if sort_dates and not dates.is_monotonic_increasing:
+        order = np.argsort(dates.to_numpy(), kind='mergesort')
+        dates, values = dates[order], np.asfortranarray(values[order])
+    return dates, symbols, values
+
+
+def stage_cagr(prices, window, years, workers):
+    return apply_columns(
+        prices[2], partial(rolling_cagr, window=window, years=years),
+        mask=_observed(prices), workers=workers
+    )
+
+
+def stage_rank(cagr, prices, window, workers):
+    return apply_columns(
+        cagr, partial(rolling_percentile_rank, window=window),
+        mask=_observed(prices), workers=workers
+    )
+
+
+def stage_monthly(ranks, prices):
+    dates, symbols, _ = prices
+    return monthly_mean_frame(matrix_to_frame(ranks, dates, symbols, DATE_COLUMN))
+
+
+def stage_periods(ranks, prices, periods, period_file):
+    """Weekly / fortnightly / month-to-date means of the cached daily ranks"""
+    dates, symbols, _ = prices
+    df_processed = matrix_to_frame(ranks, dates, symbols, DATE_COLUMN)
+    prefix_sums = PrefixSums(df_processed.to_numpy(dtype=np.float64))
+    period_means = {
+        name: period_mean_frame(df_processed, spec, prefix_sums) for name, spec in periods.items()
+    }
+    save_period_summaries(period_means, period_file)
+    return {name: frame.index[-1] for name, frame in period_means.items()}
+
+
+def stage_summary(df_month_mean, summary_file, history_file):
+    """Latest-month summary; also writes the summary workbook and monthly history"""
+    df_final_summary = latest_month_summary(df_month_mean)
+    df_final_summary.to_excel(summary_file)
+    save_history(history_from_month_mean(df_month_mean.sort_index()), history_file)
+    return df_final_summary
+
+
+def stage_horizons(prices, horizon_file):
+    dates, symbols, values = prices
+    df = pd.DataFrame(values, columns=symbols, copy=False)
+    df.insert(0, DATE_COLUMN, dates)
+    df_horizon_summary = calculate_multi_horizon_summary(df, date_column=DATE_COLUMN)
+    df_horizon_summary.to_excel(horizon_file)
+    return df_horizon_summary
+
+
+def stage_groups(groups_file, registry_file):
+    """Category group of each CSV column (None without a groups file)"""
+    if not Path(groups_file).exists():
+        return None
+    return load_category_groups(groups_file, load_registry(registry_file))
+
+
+def stage_cross_section(cagr, prices, groups, cross_section_file):
+    """Rank the cached CAGR matrix across indices (all / category peers)"""
+    dates, symbols, _ = prices
+    df_cross_section = cross_sectional_summary(cagr, dates, symbols, groups, DATE_COLUMN)
+    df_cross_section.to_excel(cross_section_file)
+    return df_cross_section
+
+
+def stage_correlations(prices):
+    """(matrices, symbols, as-of date); the alias lookup is left to correlation_files"""
+    dates, symbols, values = prices
+    return correlation_matrices(dates, values), symbols, dates.max()
+
+
+def stage_correlation_files(correlations, registry_file):
+    """Write index_correlations.bin + the manifest with its display-name aliases"""
+    matrices, symbols, as_of = correlations
+    aliases = build_aliases(symbols, load_registry(registry_file))
+    save_correlations(matrices, symbols, LOOKBACKS, as_of, aliases)
+    return matrices.shape
+
+
+def stage_publish(df_final_summary, df_horizon_summary, df_cross_section, registry_file, category_file,
+                  frontend_file, compact_file):
+    """Write indices_with_short_names.json + the compact copy (same as update_frontend_final.py)"""
+    corrected = {name: float(value) for name, value in df_final_summary['final_pct_value'].items()}
+    categories = summary_categories(category_file) if Path(category_file).exists() else {}
+    horizons = horizons_from_frame(df_horizon_summary)
+    cross_section = cross_section_from_frame(df_cross_section)
+    updated_data, unmatched = build_frontend_data(
+        corrected, categories, horizons, load_registry(registry_file), cross_section
+    )
+    save_frontend_data(updated_data, frontend_file, compact_file)
+    return {'published': len(updated_data), 'unmatched': [csv for csv, _, _ in unmatched]}
+
+
+def build_pipeline(csv_file=RAW_CSV, workers=None, cache_dir=PIPELINE_CACHE_DIR):
+    """The standard raw CSV -> heatmap pipeline"""
+    return Pipeline([
+        Stage('prices', stage_prices, params={'csv_file': str(csv_file), 'sort_dates': True},
+              files=[csv_file], cache=False, modules=['price_store']),
+        # workers does not change results, so it is bound outside the key
+        Stage('cagr', partial(stage_cagr, workers=workers), deps=['prices'],
+              params={'window': 1825, 'years': 5}, modules=['rolling_engine']),
+        Stage('rank', partial(stage_rank, workers=workers), deps=['cagr', 'prices'],
+              params={'window': 1825}, modules=['rolling_engine']),
+        Stage('monthly', stage_monthly, deps=['rank', 'prices'],
+              modules=['calculate_corrected_method', 'rolling_engine']),
+        Stage('summary', stage_summary, deps=['monthly'],
+              params={'summary_file': str(SUMMARY_FILE), 'history_file': str(HISTORY_FILE)},
+              outputs=[SUMMARY_FILE, HISTORY_FILE],
+              modules=['calculate_corrected_method', 'monthly_history']),
+        Stage('periods', stage_periods, deps=['rank', 'prices'],
+              params={'periods': PERIODS, 'period_file': str(PERIOD_SUMMARY_FILE)},
+              outputs=[PERIOD_SUMMARY_FILE], modules=['calculate_corrected_method', 'rolling_engine']),
+        Stage('horizons', stage_horizons, deps=['prices'],
+              params={'horizon_file': str(HORIZON_FILE)}, outputs=[HORIZON_FILE],
+              modules=['calculate_corrected_method', 'rolling_engine']),
+        # Keyed on the mapping it returns, so an alias edit that leaves every
+        # index in its group does not rerun cross_section
+        Stage('groups', stage_groups,
+              params={'groups_file': str(CATEGORY_GROUPS_FILE), 'registry_file': str(REGISTRY_FILE)},
+              files=[CATEGORY_GROUPS_FILE, REGISTRY_FILE], cache=False, key_by_output=True,
+              modules=['calculate_corrected_method', 'name_registry']),
+        Stage('cross_section', stage_cross_section, deps=['cagr', 'prices', 'groups'],
+              params={'cross_section_file': str(CROSS_SECTION_FILE)}, outputs=[CROSS_SECTION_FILE],
+              modules=['calculate_corrected_method', 'rolling_engine']),
+        Stage('correlations', stage_correlations, deps=['prices'], modules=['correlation_engine']),
+        Stage('correlation_files', stage_correlation_files, deps=['correlations'],
+              params={'registry_file': str(REGISTRY_FILE)}, files=[REGISTRY_FILE],
+              outputs=CORRELATION_FILES, modules=['correlation_engine', 'name_registry']),
+        Stage('publish', stage_publish, deps=['summary', 'horizons', 'cross_section'],
+              params={'registry_file': str(REGISTRY_FILE), 'category_file': str(CATEGORY_FILE),
+                      'frontend_file': str(FRONTEND_FILE), 'compact_file': str(COMPACT_FILE)},
+              files=[REGISTRY_FILE, CATEGORY_FILE], outputs=[FRONTEND_FILE, COMPACT_FILE],
+              modules=['update_frontend_final', 'compact_publish', 'excel_stream', 'name_registry']),
+    ], cache_dir=cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental raw CSV -> heatmap pipeline")
+    parser.add_argument('targets', nargs='*', help="stages to bring up to date (default: all)")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help="rerun these stages even if cached")
+    parser.add_argument('--csv', default=str(RAW_CSV), help="raw price CSV")
+    args = parser.parse_args()
+
+    print("="*80)
+    print("PUBLISH PIPELINE")
+    print("="*80)
+    print()
+
+    csv_file = Path(args.csv)
+    if not csv_file.exists():
+        print(f"Error: {csv_file} not found!")
+        return
+
+    pipeline = build_pipeline(csv_file, workers=os.cpu_count())
+    results = pipeline.run(args.targets or None, force=args.force)
+
+    for name, status, seconds in pipeline.report:
+        mark = '✓' if status == 'ran' else '·'
+        print(f"{mark} {name:<17} {status:<7} {seconds:8.3f}s")
+
+    publish = results.get('publish')
+    if publish:
+        print(f"\n✓ Published {publish['published']} indices to: {FRONTEND_FILE}")
+        if publish['unmatched']:
+            print(f"⚠ {len(publish['unmatched'])} indices without a category: "
+                  f"{', '.join(publish['unmatched'][:5])}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+COLUMNAR ON-DISK CACHE FOR THE RAW INDEX PRICE CSV
+
+Every calculation script used to call pd.read_csv() on the raw price file and
+re-parse the DATE column. This module parses the CSV once and keeps a binary
+copy next to it:
+
+    data/price_cache/<csv name>/
+        values.npy   float64 matrix (rows x symbols, column-major)
+        dates.npy    datetime64 row dates
+        meta.json    symbol list + source size / mtime / sha256
+
+Later loads memory-map the .npy files instead of parsing text. The cache is
+rebuilt when the CSV changes: a matching size + mtime is trusted directly,
+otherwise the file's sha256 decides. A rebuild writes new files and renames
+them into place, so processes that still map the old ones are unaffected.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAW_CSV = Path('data/Latest_Indices_rawdata_14112025.csv')
+CACHE_DIR = Path('data/price_cache')
+DATE_COLUMN = 'DATE'
+DATE_FORMAT = '%d/%m/%y'
+
+
+def file_sha256(path):
+    """sha256 hex digest of a file, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_array(path, array):
+    """
+    np.save to a temporary file, then rename over ``path``.
+
+    Other processes may have the old file memory-mapped; truncating it in
+    place would crash them (SIGBUS), while a rename leaves their mapping on
+    the old inode.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def _store_dir(csv_file, cache_dir):
+    return Path(cache_dir) / Path(csv_file).stem
+
+
+def _source_info(csv_file):
+    stat = Path(csv_file).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _is_current(store_dir, csv_file):
+    """Check the cached copy still matches the CSV (refreshing mtime if only that changed)"""
+    meta_file = store_dir / 'meta.json'
+    if not meta_file.exists():
+        return False
+    with open(meta_file, 'r') as f:
+        meta = json.load(f)
+
+    source = _source_info(csv_file)
+    if meta['source'] == source:
+        return True
+    if meta['source']['size'] != source['size']:
+        return False
+    if meta['sha256'] != file_sha256(csv_file):
+        return False
+
+    # Same content, only touched: remember the new mtime
+    meta['source'] = source
+    with open(meta_file, 'w') as f:
+        json.dump(meta, f, indent=2)
+    return True
+
+
+def build_store(csv_file=RAW_CSV, cache_dir=CACHE_DIR, date_format=DATE_FORMAT):
+    """
+    Parse the CSV and write the binary store.
+
+    Args:
+        csv_file: Raw price CSV (DATE column + one column per index)
+        cache_dir: Directory holding the per-file stores
+        date_format: Format of the DATE column (default: dd/mm/yy)
+
+    Returns:
+        Path of the store directory
+    """
+    source = _source_info(csv_file)
+    df = pd.read_csv(csv_file)
+    dates = pd.to_datetime(df[DATE_COLUMN], format=date_format).to_numpy()
+    symbols = [col for col in df.columns if col != DATE_COLUMN]
+
+    values = np.empty((len(df), len(symbols)), dtype=np.float64, order='F')
+    for j, symbol in enumerate(symbols):
+        values[:, j] = pd.to_numeric(df[symbol], errors='coerce')
+
+    store_dir = _store_dir(csv_file, cache_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    _save_array(store_dir / 'values.npy', values)
+    _save_array(store_dir / 'dates.npy', dates)
+
+    meta = {
+        'source': source,
+        'sha256': file_sha256(csv_file),
+        'date_format': date_format,
+        'symbols': symbols,
+    }
+    # meta.json is written last, so a half-written store is never trusted
+    tmp_file = store_dir / 'meta.json.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(meta, f, indent=2)
+    tmp_file.replace(store_dir / 'meta.json')
+    return store_dir
+
+
+def load_price_matrix(csv_file=RAW_CSV, cache_dir=CACHE_DIR):
+    """
+    Memory-mapped price matrix, building the store first if needed.
+
+    Returns:
+        Tuple of (DatetimeIndex, list of symbols, float64 array rows x symbols).
+        The array is a copy-on-write memmap: edits never reach the cache.
+    """
+    store_dir = _store_dir(csv_file, cache_dir)
+    if not _is_current(store_dir, csv_file):
+        build_store(csv_file, cache_dir)
+
+    with open(store_dir / 'meta.json', 'r') as f:
+        meta = json.load(f)
+    values = np.load(store_dir / 'values.npy', mmap_mode='c')
+    dates = pd.DatetimeIndex(np.load(store_dir / 'dates.npy'))
+    return dates, meta['symbols'], values
+
+
+def load_prices(csv_file=RAW_CSV, cache_dir=CACHE_DIR):
+    """
+    Raw prices as a DataFrame, like pd.read_csv() + pd.to_datetime(DATE).
+
+    The index columns are backed by the memory-mapped matrix (no text parse,
+    no copy). Non-numeric cells are NaN.
+
+    Returns:
+        DataFrame with a DATE column followed by one float column per index
+    """
+    dates, symbols, values = load_price_matrix(csv_file, cache_dir)
+    df = pd.DataFrame(values, columns=symbols, copy=False)
+    df.insert(0, DATE_COLUMN, dates)
+    return df
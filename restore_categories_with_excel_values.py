@@ -2,10 +2,12 @@
 Keep the GOOD categories from before, but use EXCEL values
 """
 
-import pandas as pd
 import json
 from pathlib import Path
 
+from compact_publish import save_frontend_data
+from excel_stream import summary_values
+
 print("="*80)
 print("KEEPING PREVIOUS CATEGORIES + USING EXCEL VALUES")
 print("="*80)
@@ -13,24 +15,7 @@ print()
 
 # Load Excel values
 excel_file = Path('data/251229_Final_summary.xlsx')
-df_excel = pd.read_excel(excel_file, skiprows=1)
-
-excel_values = {}
-
-# Get first value from columns
-first_name = df_excel.columns[0]
-first_value = df_excel.columns[1] if len(df_excel.columns) > 1 else None
-
-if first_name and first_value is not None:
-    excel_values[first_name] = float(first_value)
-
-# Get rest from rows
-for _, row in df_excel.iterrows():
-    name = str(row.iloc[0]).strip() if pd.notna(row.iloc[0]) else ''
-    value = row.iloc[1] if len(row) > 1 and pd.notna(row.iloc[1]) else None
-    
-    if name and value is not None:
-        excel_values[name] = float(value)
+excel_values = summary_values(excel_file)  # streamed, cached by workbook hash
 
 print(f"✓ Loaded {len(excel_values)} values from Excel")
 
@@ -94,10 +79,8 @@ if unmatched:
     for name in unmatched[:5]:
         print(f"   - {name}")
 
-# Save
-output_file = Path('data/indices_with_short_names.json')
-with open(output_file, 'w') as f:
-    json.dump(updated_data, f, indent=2)
+# Save (and the compact copy the page loads first)
+save_frontend_data(updated_data)
 
 print(f"\n✓ Saved {len(updated_data)} indices")
 
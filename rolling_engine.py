@@ -0,0 +1,797 @@
+"""
+VECTORIZED ROLLING ENGINE FOR CAGR / PERCENTILE CALCULATIONS
+
+Replaces the per-window ``rolling(...).apply(python_function)`` calls used by
+the calculation scripts with whole-array NumPy kernels.
+
+Every kernel works on ONE symbol's values in date order (the rows that
+symbol has in the melted frame) and returns an array of the same length.
+
+The wide-format helpers run those kernels column by column straight on the
+raw DataFrame's 2-D float array, so the melt -> groupby -> pivot_table round
+trip (millions of long rows) is never materialized.
+
+Windows are either a number of observations (1825, the historical "5 years")
+or a calendar offset ('5Y', '60M', '26W', '1825D'). The CSV only has trading
+days, so 1825 observations span roughly 7 calendar years; the ``*_by_date``
+kernels take the symbol's dates as well and find each window's start with a
+binary search over them.
+"""
+
+import re
+
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Observations per "year", as in the 1825-day (5 x 365) windows
+DAYS_PER_YEAR = 365
+
+# Calendar window units -> DateOffset keyword
+WINDOW_UNITS = {'D': 'days', 'W': 'weeks', 'M': 'months', 'Y': 'years'}
+
+# Horizon name -> window length in observations (CAGR and rank windows)
+HORIZONS = {
+    '1Y': 1 * DAYS_PER_YEAR,
+    '3Y': 3 * DAYS_PER_YEAR,
+    '5Y': 5 * DAYS_PER_YEAR,
+    '10Y': 10 * DAYS_PER_YEAR,
+}
+
+
+def rolling_cagr(values, window=1825, years=5, strict=True):
+    """
+    Rolling CAGR over a fixed number of observations.
+
+    Equivalent to::
+
+        s.rolling(window, min_periods=window).apply(calc_cagr, raw=False)
+
+    where ``calc_cagr`` returns ``(last / first) ** (1 / years) - 1`` and NaN
+    when either end of the window is non-positive.
+
+    Args:
+        values: 1-D array of index values for a single symbol (no NaNs)
+        window: Number of observations in the CAGR window (default: 1825)
+        years: Number of years the window represents (default: 5)
+        strict: Also reject a non-positive LAST value (default: True).
+            The old method only checked the first value.
+
+    Returns:
+        float64 array, NaN for the first ``window - 1`` positions
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) < window:
+        return out
+
+    first = values[:len(values) - window + 1]
+    last = values[window - 1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # float_power runs the scalar pow() loop, same as the Python-level
+        # ``**`` in calc_cagr, so results are bit-identical (the SIMD loop
+        # behind ``**`` on arrays can differ by 1 ulp)
+        cagr = np.float_power(last / first, 1 / years) - 1
+
+    invalid = (first <= 0) | (last <= 0) if strict else first <= 0
+    cagr[invalid] = np.nan
+    out[window - 1:] = cagr
+    return out
+
+
+def rolling_percentile_rank(values, window=1825, min_periods=None):
+    """
+    Percentile rank of each value against the trailing window it closes.
+
+    Equivalent to::
+
+        s.rolling(window, min_periods=min_periods).apply(
+            lambda x: pd.Series(x).dropna().rank(pct=True).iloc[-1], raw=False)
+
+    The window's non-NaN values are kept in a sorted buffer; each step is one
+    bisect insert, one bisect evict and two bisect lookups, instead of
+    re-sorting the whole window. Ties get pandas' 'average' rank, and a NaN
+    in the current position always gives NaN.
+
+    Args:
+        values: 1-D array for a single symbol, NaNs allowed
+        window: Number of observations in the ranking window (default: 1825)
+        min_periods: Minimum non-NaN values needed in the window
+            (default: ``window``, i.e. a full window with no NaNs)
+
+    Returns:
+        float64 array of percentile ranks in (0, 1], NaN where undefined
+    """
+    if min_periods is None:
+        min_periods = window
+
+    data = np.asarray(values, dtype=np.float64).tolist()
+    ranks = [np.nan] * len(data)
+    buffer = []  # sorted non-NaN values currently inside the window
+
+    for i, value in enumerate(data):
+        if i >= window:
+            old = data[i - window]
+            if old == old:
+                del buffer[bisect_left(buffer, old)]
+        if value != value:  # NaN never gets a rank
+            continue
+        insort(buffer, value)
+        if len(buffer) >= min_periods:
+            less = bisect_left(buffer, value)
+            equal = bisect_right(buffer, value) - less
+            ranks[i] = (less + (equal + 1) / 2) / len(buffer)
+
+    return np.array(ranks, dtype=np.float64)
+
+
+def parse_window(window):
+    """
+    Window spec -> observation count or calendar offset.
+
+    Args:
+        window: int (observations), a string like '5Y', '60M', '26W', '1825D',
+            or a pd.DateOffset (returned as is)
+
+    Returns:
+        int, or pd.DateOffset for calendar windows
+    """
+    if isinstance(window, (int, np.integer)):
+        return int(window)
+    if isinstance(window, pd.DateOffset):
+        return window
+    match = re.fullmatch(r'\s*(\d+)\s*([DWMY])\s*', str(window).upper())
+    if not match:
+        raise ValueError(f"Window must be an int or like '5Y', '60M', '26W', '1825D', not {window!r}")
+    count, unit = int(match.group(1)), match.group(2)
+    return pd.DateOffset(**{WINDOW_UNITS[unit]: count})
+
+
+def window_years(window):
+    """Nominal length of a window in years ('5Y' -> 5, '60M' -> 5, 1825 -> 5)"""
+    window = parse_window(window)
+    if isinstance(window, int):
+        return window / DAYS_PER_YEAR
+    kwds = window.kwds
+    return (kwds.get('years', 0) + kwds.get('months', 0) / 12
+            + (kwds.get('weeks', 0) * 7 + kwds.get('days', 0)) / DAYS_PER_YEAR)
+
+
+def window_starts(dates, window):
+    """
+    First row inside each row's calendar window ``(date - window, date]``.
+
+    One vectorized binary search over the sorted dates; row ``start - 1``
+    is then the last observation on or before ``date - window`` (-1 if the
+    history does not reach back that far).
+
+    Args:
+        dates: Sorted datetime64 array of one symbol's observation dates
+        window: Calendar window ('5Y', ...) or DateOffset
+
+    Returns:
+        int64 array of row positions, aligned with ``dates``
+    """
+    dates = pd.DatetimeIndex(dates)
+    cutoff = dates - parse_window(window)
+    return np.searchsorted(dates.asi8, cutoff.asi8, side='right')
+
+
+def rolling_cagr_by_date(values, dates, window='5Y', years=None, strict=True):
+    """
+    Rolling CAGR over a calendar window.
+
+    The start value is the last observation on or before ``date - window``
+    (the as-of value, so a holiday on the exact anniversary still works), and
+    the CAGR is NaN until the history reaches back that far.
+
+    Args:
+        values: 1-D array of index values for a single symbol (no NaNs)
+        dates: Sorted dates aligned with ``values``
+        window: Calendar window (default: '5Y')
+        years: Years the window represents (default: the window's nominal length)
+        strict: Also reject a non-positive LAST value (default: True)
+
+    Returns:
+        float64 array aligned with ``values``
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if years is None:
+        years = window_years(window)
+    out = np.full(len(values), np.nan)
+    if len(values) == 0:
+        return out
+
+    first_rows = window_starts(dates, window) - 1
+    has_start = first_rows >= 0
+    first = values[first_rows[has_start]]
+    last = values[has_start]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.float_power(last / first, 1 / years) - 1
+
+    invalid = (first <= 0) | (last <= 0) if strict else first <= 0
+    cagr[invalid] = np.nan
+    out[has_start] = cagr
+    return out
+
+
+def rolling_percentile_rank_by_date(values, dates, window='5Y', min_periods=None):
+    """
+    Percentile rank of each value against the trailing calendar window.
+
+    The window of row ``i`` is ``(date_i - window, date_i]``. Its start comes
+    from ``window_starts`` (binary search) and only moves forward, so every
+    value is inserted and evicted exactly once: O(1) amortized pointer moves
+    per step on top of the sorted-buffer bisects of ``rolling_percentile_rank``.
+
+    Args:
+        values: 1-D array for a single symbol, NaNs allowed
+        dates: Sorted dates aligned with ``values``
+        window: Calendar window (default: '5Y')
+        min_periods: Minimum non-NaN values in the window (default: None,
+            i.e. the window must contain no NaNs)
+
+    Returns:
+        float64 array of percentile ranks in (0, 1], NaN where undefined.
+        A rank also needs the symbol's history to reach back to the window
+        start, like the full-window rule of the observation-count kernel.
+    """
+    data = np.asarray(values, dtype=np.float64).tolist()
+    starts = window_starts(dates, window).tolist()
+    ranks = [np.nan] * len(data)
+    buffer = []  # sorted non-NaN values currently inside the window
+    nan_count = 0
+    left = 0
+
+    for i, value in enumerate(data):
+        while left < starts[i]:
+            old = data[left]
+            if old == old:
+                del buffer[bisect_left(buffer, old)]
+            else:
+                nan_count -= 1
+            left += 1
+        if value != value:  # NaN never gets a rank
+            nan_count += 1
+            continue
+        insort(buffer, value)
+        if starts[i] == 0:
+            continue  # history does not cover the whole window yet
+        if (nan_count > 0) if min_periods is None else (len(buffer) < min_periods):
+            continue
+        less = bisect_left(buffer, value)
+        equal = bisect_right(buffer, value) - less
+        ranks[i] = (less + (equal + 1) / 2) / len(buffer)
+
+    return np.array(ranks, dtype=np.float64)
+
+
+class IncrementalRank:
+    """
+    Streaming rolling CAGR + percentile rank for a single symbol.
+
+    Holds only the trailing state the batch kernels need: the last
+    ``cagr_window - 1`` values, the last ``rank_window`` CAGRs and the sorted
+    buffer of the non-NaN ones. ``push`` then gives the same CAGR and rank
+    as ``rolling_cagr`` / ``rolling_percentile_rank`` would for the new
+    observation, at O(log window) cost.
+    """
+
+    def __init__(self, cagr_window=1825, rank_window=1825, years=5):
+        self.cagr_window = cagr_window
+        self.rank_window = rank_window
+        self.years = years
+        self.values = deque(maxlen=cagr_window - 1)
+        self.cagrs = deque(maxlen=rank_window)
+        self.buffer = []  # sorted non-NaN CAGRs in self.cagrs
+        self.nan_count = 0
+
+    @classmethod
+    def from_history(cls, values, cagrs=None, cagr_window=1825, rank_window=1825, years=5):
+        """
+        Seed the state from a symbol's full history (NaNs already dropped).
+
+        Args:
+            values: 1-D array of the symbol's observed values in date order
+            cagrs: Precomputed ``rolling_cagr(values, ...)``, if available
+            cagr_window, rank_window, years: Same as the batch kernels
+
+        Returns:
+            IncrementalRank positioned after the last observation
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if cagrs is None:
+            cagrs = rolling_cagr(values, cagr_window, years)
+
+        state = cls(cagr_window, rank_window, years)
+        state.values.extend(values[max(len(values) - state.values.maxlen, 0):].tolist())
+        state.cagrs.extend(cagrs[max(len(cagrs) - rank_window, 0):].tolist())
+        state.buffer = sorted(c for c in state.cagrs if c == c)
+        state.nan_count = len(state.cagrs) - len(state.buffer)
+        return state
+
+    def push(self, value):
+        """
+        Add the next observation.
+
+        Args:
+            value: The symbol's value for the new date (not NaN)
+
+        Returns:
+            Tuple of (cagr, percentile_rank); either may be NaN
+        """
+        cagr = np.nan
+        if len(self.values) == self.values.maxlen:
+            first = self.values[0]
+            if first > 0 and value > 0:
+                cagr = (value / first) ** (1 / self.years) - 1
+        self.values.append(value)
+
+        if len(self.cagrs) == self.rank_window:
+            old = self.cagrs[0]
+            if old == old:
+                del self.buffer[bisect_left(self.buffer, old)]
+            else:
+                self.nan_count -= 1
+        self.cagrs.append(cagr)
+
+        if cagr != cagr:
+            self.nan_count += 1
+            return cagr, np.nan
+
+        insort(self.buffer, cagr)
+        if len(self.buffer) < self.rank_window:
+            return cagr, np.nan
+        less = bisect_left(self.buffer, cagr)
+        equal = bisect_right(self.buffer, cagr) - less
+        return cagr, (less + (equal + 1) / 2) / len(self.buffer)
+
+
+def apply_by_symbol(symbols, values, func):
+    """
+    Apply a per-symbol array kernel to a long-format column.
+
+    Rows are grouped by symbol and passed to ``func`` in their existing
+    order, the same way ``groupby('SYMBOL')[col].rolling(...)`` sees them.
+
+    Args:
+        symbols: Series of symbol names (one per row)
+        values: Series of values aligned with ``symbols``
+        func: Callable taking a 1-D float array and returning one of equal length
+
+    Returns:
+        float64 array aligned with the input rows
+    """
+    data = values.to_numpy(dtype=np.float64)
+    out = np.full(len(data), np.nan)
+    for positions in symbols.groupby(symbols, sort=False).indices.values():
+        out[positions] = func(data[positions])
+    return out
+
+
+def value_matrix(df, date_column='DATE'):
+    """
+    Split a wide DataFrame into dates, symbols and a 2-D float matrix.
+
+    Non-numeric cells become NaN (same as ``pd.to_numeric(errors='coerce')``
+    after melting) and rows without a date are blanked out, so the non-NaN
+    cells are exactly the rows the melted frame would keep.
+
+    Args:
+        df: DataFrame with a date column and one column per index
+        date_column: Name of the date column
+
+    Returns:
+        Tuple of (DatetimeIndex, list of symbols, float64 array rows x symbols)
+    """
+    dates = pd.DatetimeIndex(df[date_column])
+    symbols = [col for col in df.columns if col != date_column]
+
+    # Fortran order keeps each symbol's column contiguous for the kernels
+    values = np.empty((len(df), len(symbols)), dtype=np.float64, order='F')
+    for j, symbol in enumerate(symbols):
+        values[:, j] = pd.to_numeric(df[symbol], errors='coerce')
+    values[dates.isna(), :] = np.nan
+
+    return dates, symbols, values
+
+
+def _apply_to_columns(values, func, mask, out, columns, dates=None):
+    """Compress, transform and scatter back the given columns"""
+    for j in columns:
+        rows = np.flatnonzero(mask[:, j])
+        if dates is None:
+            column = func(values[rows, j])
+        else:
+            column = func(values[rows, j], dates[rows])
+        out[:, j] = np.nan
+        out[rows, j] = column
+
+
+def _column_worker(names, shape, func, columns, dates=None):
+    """Process-pool entry point: run ``func`` on a shard of columns in shared memory"""
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    arrays = [
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, order='F')
+        for block, dtype in zip(blocks, (np.float64, np.bool_, np.float64))
+    ]
+    try:
+        _apply_to_columns(arrays[0], func, arrays[1], arrays[2], columns, dates)
+    finally:
+        del arrays[:]
+        for block in blocks:
+            block.close()
+
+
+def _apply_columns_parallel(values, func, mask, out, workers, dates=None):
+    """
+    Shard the columns over a process pool.
+
+    The value, mask and result matrices live in shared memory, so workers
+    only receive block names and column numbers - no pickled DataFrames
+    (the 1-D date array, when given, is small enough to send as is).
+    """
+    shape = values.shape
+    blocks = []
+    arrays = []
+    try:
+        for source, dtype in ((values, np.float64), (mask, np.bool_), (None, np.float64)):
+            block = shared_memory.SharedMemory(
+                create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            )
+            blocks.append(block)
+            array = np.ndarray(shape, dtype=dtype, buffer=block.buf, order='F')
+            if source is not None:
+                array[...] = source
+            arrays.append(array)
+
+        # Interleaved shards spread long and short histories across workers
+        n_shards = min(shape[1], workers * 4)
+        shards = [list(range(k, shape[1], n_shards)) for k in range(n_shards)]
+        names = [block.name for block in blocks]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_column_worker, names, shape, func, shard, dates) for shard in shards]
+            for future in futures:
+                future.result()
+
+        out[...] = arrays[2]
+    finally:
+        del arrays[:]
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def apply_columns(values, func, mask=None, out=None, workers=None, dates=None):
+    """
+    Run a per-symbol kernel down every column of a value matrix.
+
+    Each column is compressed to its observed rows (``mask``), passed to
+    ``func`` and scattered back, which is what groupby-rolling on the melted
+    frame does one symbol at a time.
+
+    Args:
+        values: 2-D float array, rows in date order, one column per symbol
+        func: Callable taking a 1-D float array and returning one of equal length
+            (must be picklable - e.g. a functools.partial - when ``workers`` > 1)
+        mask: Boolean array marking observed cells (default: ``~isnan(values)``)
+        out: Optional output array; may be ``values`` itself to work in place
+        workers: Number of worker processes (default: run serially)
+        dates: Row dates; when given, ``func`` is called as
+            ``func(column, column_dates)`` (for the ``*_by_date`` kernels)
+
+    Returns:
+        2-D float64 array, NaN outside ``mask``
+    """
+    if mask is None:
+        mask = ~np.isnan(values)
+    if out is None:
+        out = np.empty(values.shape, dtype=np.float64, order='F')
+    if dates is not None:
+        dates = np.asarray(dates, dtype='datetime64[ns]')
+
+    if workers is not None and workers > 1 and values.shape[1] > 1:
+        _apply_columns_parallel(values, func, mask, out, workers, dates)
+    else:
+        _apply_to_columns(values, func, mask, out, range(values.shape[1]), dates)
+
+    return out
+
+
+def matrix_to_frame(matrix, dates, symbols, date_column='DATE'):
+    """
+    Wrap a result matrix the way ``pivot_table`` would have returned it.
+
+    Dates and symbols with no values are dropped, duplicate dates are
+    averaged, and both axes are sorted.
+
+    Args:
+        matrix: 2-D float array, rows aligned with ``dates``
+        dates: DatetimeIndex for the rows
+        symbols: Column labels
+        date_column: Name for the index
+
+    Returns:
+        DataFrame indexed by date with one column per symbol
+    """
+    frame = pd.DataFrame(
+        matrix,
+        index=pd.Index(dates, name=date_column),
+        columns=pd.Index(symbols, name='SYMBOL'),
+        copy=False
+    )
+    frame = frame.dropna(how='all').dropna(axis=1, how='all')
+    if not frame.index.is_unique:
+        frame = frame.groupby(level=0).mean()
+    return frame.sort_index().sort_index(axis=1)
+
+
+def cross_sectional_rank(matrix, groups=None):
+    """
+    Percentile rank of every cell against the other symbols on the same date.
+
+    The self-history kernels above rank a symbol against its own past; this
+    ranks each row of a dates x symbols matrix (e.g. the CAGR matrix) along
+    axis 1 in one vectorized ``DataFrame.rank(axis=1, pct=True)`` call per
+    group, with no per-symbol loop. Ties get the 'average' rank and NaNs are
+    left out.
+
+    Args:
+        matrix: 2-D float array, one row per date, one column per symbol
+        groups: Optional group label per column (e.g. category); each group
+            is ranked on its own, columns with a None/NaN label get NaN
+
+    Returns:
+        float64 array shaped like ``matrix`` with ranks in (0, 1]
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if groups is None:
+        return pd.DataFrame(matrix, copy=False).rank(axis=1, pct=True).to_numpy()
+
+    labels = pd.Series(list(groups), dtype=object)
+    out = np.full(matrix.shape, np.nan)
+    for columns in labels.groupby(labels, sort=False).indices.values():
+        out[:, columns] = pd.DataFrame(matrix[:, columns]).rank(axis=1, pct=True).to_numpy()
+    return out
+
+
+def period_ids(dates, freq='M'):
+    """
+    Integer id of the calendar period each date falls in.
+
+    Ids are consecutive for consecutive periods, so sorted dates give sorted
+    ids and period boundaries are where the id changes.
+
+    Args:
+        dates: datetime64 array / DatetimeIndex
+        freq: 'D' (day), 'W' (week starting Monday), 'M' (month),
+            'Q' (quarter) or 'Y' (year)
+
+    Returns:
+        int64 array aligned with ``dates``
+    """
+    dates = np.asarray(dates, dtype='datetime64[ns]')
+    if freq == 'D':
+        return dates.astype('datetime64[D]').astype(np.int64)
+    if freq == 'W':
+        # 1970-01-01 was a Thursday: shift so weeks start on Monday
+        return (dates.astype('datetime64[D]').astype(np.int64) + 3) // 7
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    if freq == 'M':
+        return months
+    if freq == 'Q':
+        return months // 3
+    if freq == 'Y':
+        return months // 12
+    raise ValueError(f"freq must be 'D', 'W', 'M', 'Q' or 'Y', not {freq!r}")
+
+
+def bucket_starts(ids):
+    """Row offsets where a new bucket starts in sorted ``ids`` (first is 0)"""
+    ids = np.asarray(ids)
+    if len(ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+
+
+def period_bounds(dates, periods):
+    """
+    Row ranges of the periods covering sorted ``dates``.
+
+    Args:
+        dates: Sorted datetime64 array / DatetimeIndex
+        periods: A pandas offset alias or DateOffset ('W-FRI', '2W-FRI',
+            'SMS', 'MS', 'QS', ...; bins as in DataFrame.resample) or
+            explicit period start dates (each period runs to the next
+            boundary, the last one to the final date; earlier rows are left
+            out)
+
+    Returns:
+        Tuple of (labels DatetimeIndex, starts, ends) for the periods that
+        contain at least one row; rows ``starts[i]:ends[i]`` are period i.
+        Labels are always the first calendar day of the period (for
+        'W-FRI' the Saturday after the previous Friday, not pandas' default
+        end label), like the explicit boundaries
+    """
+    dates = pd.DatetimeIndex(dates)
+    if isinstance(periods, (str, pd.DateOffset)):
+        # Resampling the row numbers gives pandas' bins for any alias
+        # without touching the (dates x symbols) matrix
+        bins = pd.Series(np.arange(len(dates)), index=dates).resample(periods, label='left')
+        first, last = bins.min(), bins.max()
+        present = first.notna().to_numpy()
+        labels = first.index[present]
+        if bins.closed == 'right':
+            # Right-closed bins (week / month ends) start the day after the
+            # left edge
+            labels = labels + pd.Timedelta(days=1)
+        starts = first.to_numpy()[present].astype(np.int64)
+        ends = last.to_numpy()[present].astype(np.int64) + 1
+        return labels, starts, ends
+
+    labels = pd.DatetimeIndex(periods)
+    if not labels.is_monotonic_increasing or labels.has_duplicates:
+        raise ValueError("period boundaries must be sorted and unique")
+    starts = dates.searchsorted(labels, side='left')
+    ends = np.r_[starts[1:], len(dates)]
+    present = ends > starts
+    return labels[present], starts[present].astype(np.int64), ends[present].astype(np.int64)
+
+
+class PrefixSums:
+    """
+    Column-wise cumulative sums and non-NaN counts of a (dates x symbols)
+    matrix, for bucket means over any set of row ranges.
+
+    The prefix arrays are built once in a single pass; the mean of rows
+    ``start:end`` is then ``(sums[end] - sums[start]) / (counts[end] -
+    counts[start])`` for every column at once, so several granularities
+    (weeks, months, quarters, ...) cost one fancy-index each.
+
+    Precision: a difference of two running totals carries the rounding of
+    the whole prefix (about ``rows * eps * max |total|``; ~1e-12 for 40 years
+    of daily ranks in [0, 1]) instead of only the bucket's own values, so
+    results match a grouped mean to ~1e-12, not bit for bit.
+    """
+
+    def __init__(self, matrix):
+        matrix = np.asarray(matrix, dtype=np.float64)
+        n_rows, n_cols = matrix.shape
+        # Column-major like the rank matrix, filled one column at a time so
+        # the only temporaries are one column long
+        self.sums = np.zeros((n_rows + 1, n_cols), order='F')
+        self.counts = np.zeros((n_rows + 1, n_cols), dtype=np.int32, order='F')
+        for j in range(n_cols):
+            column = matrix[:, j]
+            valid = ~np.isnan(column)
+            np.cumsum(np.where(valid, column, 0.0), out=self.sums[1:, j])
+            np.cumsum(valid, out=self.counts[1:, j])
+
+    def means(self, starts, ends=None):
+        """
+        Mean of every column over each row range.
+
+        Args:
+            starts: First row of each bucket (sorted)
+            ends: End row (exclusive) of each bucket (default: the next
+                bucket's start, the last one running to the final row)
+
+        Returns:
+            float64 array (buckets x columns), NaN where a bucket has no values
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        if ends is None:
+            ends = np.r_[starts[1:], len(self.sums) - 1]
+        ends = np.asarray(ends, dtype=np.int64)
+        counts = self.counts[ends] - self.counts[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (self.sums[ends] - self.sums[starts]) / counts
+        means[counts == 0] = np.nan
+        return means
+
+
+def cagr_percentile_rank(values, cagr_window=1825, rank_window=1825, years=5):
+    """Rolling CAGR followed by its rolling percentile rank, for one symbol"""
+    return rolling_percentile_rank(rolling_cagr(values, cagr_window, years), rank_window)
+
+
+def percentile_rank_frame(df, date_column='DATE', cagr_window=1825, rank_window=1825, years=5,
+                          workers=None):
+    """
+    Daily rolling-CAGR percentile ranks for every index, in wide format.
+
+    Same result as the melt -> rolling CAGR -> rolling rank -> pivot_table
+    steps of ``calculate_final_summary_v2``, computed column-wise.
+
+    Args:
+        df: DataFrame with date column and index value columns
+        date_column: Name of the date column
+        cagr_window: Observations in the CAGR window (default: 1825)
+        rank_window: Observations in the ranking window (default: 1825)
+        years: Years the CAGR window represents (default: 5)
+        workers: Number of worker processes (default: run serially)
+
+    Returns:
+        DataFrame of percentile ranks (dates x symbols)
+    """
+    df = df.sort_values(date_column, kind='mergesort')
+    dates, symbols, values = value_matrix(df, date_column)
+    observed = ~np.isnan(values)
+
+    ranks = apply_columns(
+        values,
+        partial(cagr_percentile_rank, cagr_window=cagr_window, rank_window=rank_window, years=years),
+        mask=observed,
+        out=values,
+        workers=workers
+    )
+    return matrix_to_frame(ranks, dates, symbols, date_column)
+
+
+def horizon_rank_matrices(values, horizons=None, mask=None):
+    """
+    Percentile-rank matrices for several CAGR horizons in one sweep.
+
+    Each column is compressed once and every horizon's CAGR + rank kernels
+    run on that same array, instead of one full pipeline run per horizon.
+
+    Args:
+        values: 2-D float array, rows in date order, one column per symbol
+        horizons: Mapping of name -> window in observations (default: HORIZONS)
+        mask: Boolean array marking observed cells (default: ``~isnan(values)``)
+
+    Returns:
+        Dict of horizon name -> 2-D float64 rank array shaped like ``values``
+    """
+    if horizons is None:
+        horizons = HORIZONS
+    if mask is None:
+        mask = ~np.isnan(values)
+
+    out = {
+        name: np.full(values.shape, np.nan, order='F')
+        for name in horizons
+    }
+    for j in range(values.shape[1]):
+        rows = np.flatnonzero(mask[:, j])
+        column = values[rows, j]
+        for name, window in horizons.items():
+            cagrs = rolling_cagr(column, window, window / DAYS_PER_YEAR)
+            out[name][rows, j] = rolling_percentile_rank(cagrs, window)
+    return out
+
+
+def multi_horizon_rank_frame(df, date_column='DATE', horizons=None):
+    """
+    Daily percentile ranks for several horizons as one wide DataFrame.
+
+    Args:
+        df: DataFrame with date column and index value columns
+        date_column: Name of the date column
+        horizons: Mapping of name -> window in observations (default: HORIZONS)
+
+    Returns:
+        DataFrame indexed by date with (HORIZON, SYMBOL) MultiIndex columns
+    """
+    if horizons is None:
+        horizons = HORIZONS
+
+    df = df.sort_values(date_column, kind='mergesort')
+    dates, symbols, values = value_matrix(df, date_column)
+    matrices = horizon_rank_matrices(values, horizons)
+    return pd.concat(
+        {
+            name: matrix_to_frame(matrix, dates, symbols, date_column)
+            for name, matrix in matrices.items()
+        },
+        axis=1,
+        names=['HORIZON', 'SYMBOL']
+    )
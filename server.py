@@ -1,24 +1,646 @@
 """
-Simple HTTP server to serve the indices heatmap webpage
+HTTP server to serve the indices heatmap webpage
+
+Requests are handled by a bounded thread pool with HTTP/1.1 keep-alive, so a
+slow client only ties up one worker instead of the whole server. A worker
+handles one request at a time; between requests a keep-alive connection is
+parked in a selector (not on a worker) until its next request arrives, so
+idle connections never hold up new ones. When workers and queue are full,
+new connections get an immediate 503. SIGTERM / Ctrl+C stop accepting new
+connections, close idle ones and let in-flight requests finish.
+
+Static files are served from an in-memory cache (re-read only when their
+mtime changes, least recently used files dropped beyond MAX_CACHE_BYTES)
+with strong ETags, 304 Not Modified for conditional GETs (If-None-Match, or
+If-Modified-Since without it) and precompressed gzip / brotli variants
+picked from Accept-Encoding.
+
+JSON API (served from a pre-sorted in-memory copy of
+data/indices_with_short_names.json, rebuilt when the file changes):
+    /api/indices?category=Sectoral&sort=desc&top=10
+    /api/index/<full or display name>
 """
+import email.utils
+import gzip
+import hashlib
 import http.server
-import socketserver
+import json
 import os
+import re
+import selectors
+import signal
+import socket
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from stat import S_ISREG
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
 
 PORT = 8000
+MAX_WORKERS = 32          # concurrent requests being handled
+MAX_PENDING = 256         # accepted connections waiting for a worker
+MAX_IDLE = 1024           # parked keep-alive connections (oldest closed first)
+KEEPALIVE_TIMEOUT = 15    # seconds an idle keep-alive connection is kept open
+REQUEST_TIMEOUT = 15      # seconds to receive a request once it has started
+MAX_CACHED_FILE = 16 * 1024 * 1024   # larger files are streamed from disk
+MAX_CACHE_BYTES = 64 * 1024 * 1024   # all cached variants together (LRU beyond)
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+INDICES_FILE = 'data/indices_with_short_names.json'
+
+
+class CachedAsset:
+    """One file's bytes, validators and compressed variants"""
+
+    def __init__(self, path, stat, content_type):
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.key = (stat.st_mtime_ns, stat.st_size)
+        self.mtime = stat.st_mtime
+        self.content_type = content_type
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        digest = hashlib.sha256(body).hexdigest()[:20]
+
+        # Strong ETags must differ per representation
+        self.variants = {'identity': (body, f'"{digest}"')}
+        if len(body) >= MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = (compressed, f'"{digest}-gz"')
+            if brotli is not None:
+                compressed = brotli.compress(body)
+                if len(compressed) < len(body):
+                    self.variants['br'] = (compressed, f'"{digest}-br"')
+
+    @property
+    def compressible(self):
+        return len(self.variants) > 1
+
+    @property
+    def size(self):
+        return sum(len(body) for body, _ in self.variants.values())
+
+
+class AssetCache:
+    """
+    Thread-safe path -> CachedAsset map, refreshed when a file's mtime / size
+    changes. Holds at most ``max_bytes`` of file data; the least recently
+    served files are dropped first.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.assets = OrderedDict()
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, content_type):
+        """Cached asset for ``path``, or None if it is not a cacheable regular file"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not S_ISREG(stat.st_mode) or stat.st_size > MAX_CACHED_FILE:
+            return None
+
+        with self.lock:
+            asset = self.assets.get(path)
+            if asset is not None and asset.key == (stat.st_mtime_ns, stat.st_size):
+                self.assets.move_to_end(path)
+                return asset
+        # Read and compressed outside the lock; a concurrent miss on the
+        # same file just does the work twice
+        asset = CachedAsset(path, stat, content_type)
+        with self.lock:
+            old = self.assets.pop(path, None)
+            if old is not None:
+                self.total -= old.size
+            self.assets[path] = asset
+            self.total += asset.size
+            while self.total > self.max_bytes and len(self.assets) > 1:
+                _, evicted = self.assets.popitem(last=False)
+                self.total -= evicted.size
+        return asset
+
+
+def normalize_name(name):
+    """Lower-case alphanumerics only, so 'NIFTY IT' and 'nifty-it' match"""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+class IndexCatalog:
+    """
+    Pre-sorted views of indices_with_short_names.json for the API routes.
+
+    Holds every index in file order, ascending and descending by percentile,
+    per category as well as overall, plus a name lookup. The whole catalog is
+    rebuilt (and swapped in atomically) only when the file's mtime changes.
+    """
+
+    def __init__(self, path=INDICES_FILE):
+        self.path = path
+        self.key = None
+        self.views = {}
+        self.by_name = {}
+        self.categories = []
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        stat = os.stat(self.path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key == self.key:
+            return
+        with self.lock:
+            if key == self.key:
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+
+            groups = {None: items}
+            for item in items:
+                groups.setdefault(item['category'], []).append(item)
+
+            views = {}
+            for category, group in groups.items():
+                ascending = sorted(group, key=lambda item: item['percentile'])
+                views[category] = {
+                    'none': group,
+                    'asc': ascending,
+                    'desc': sorted(group, key=lambda item: item['percentile'], reverse=True),
+                }
+
+            by_name = {}
+            for item in items:
+                for name in (item['fullName'], item['displayName']):
+                    by_name.setdefault(normalize_name(name), item)
+
+            self.views, self.by_name = views, by_name
+            self.categories = [category for category in groups if category is not None]
+            self.key = key
+
+    def indices(self, category=None, sort='none', top=None):
+        """List of index dicts; raises KeyError for an unknown category or sort"""
+        self.refresh()
+        view = self.views[category][sort]
+        return view if top is None else view[:top]
+
+    def lookup(self, name):
+        """Index dict by full or display name, or None"""
+        self.refresh()
+        return self.by_name.get(normalize_name(name))
+
+
+def preferred_encoding(accept_encoding, available):
+    """Best of ``available`` encodings for an Accept-Encoding header ('identity' if none)"""
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            weights[coding.lower()] = q
+
+    best, best_q = 'identity', 0.0
+    for coding in ('br', 'gzip'):
+        q = weights.get(coding, weights.get('*', 0.0))
+        if coding in available and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def not_modified_since(if_modified_since, mtime):
+    """If-Modified-Since check, as SimpleHTTPRequestHandler.send_head does it"""
+    try:
+        since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if since.tzinfo is not timezone.utc:
+        return False
+    return datetime.fromtimestamp(mtime, timezone.utc).replace(microsecond=0) <= since
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)"""
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+class IdleConnections:
+    """
+    Keep-alive connections waiting for their next request.
+
+    One thread watches the parked sockets with a selector and hands a
+    connection back to the server as soon as its socket is readable; a
+    connection idle for longer than ``timeout`` is closed.
+    """
+
+    def __init__(self, resume, timeout=KEEPALIVE_TIMEOUT, max_idle=MAX_IDLE):
+        self.resume = resume
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.selector = selectors.DefaultSelector()
+        self.parked = {}        # handler -> deadline, oldest first
+        self.incoming = []
+        self.lock = threading.Lock()
+        self.closed = False
+        # Writing to the socket pair wakes select() up for new connections
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ)
+        self.thread = threading.Thread(target=self._run, name='http-idle', daemon=True)
+        self.thread.start()
+
+    def park(self, handler):
+        with self.lock:
+            if self.closed:
+                handler.close()
+                return
+            self.incoming.append(handler)
+        self._wake()
+
+    def close(self):
+        """Stop watching and close every parked connection"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self._wake()
+        self.thread.join()
+
+    def _wake(self):
+        try:
+            self.wakeup_writer.send(b'\0')
+        except OSError:
+            pass
+
+    def _unpark(self, handler):
+        del self.parked[handler]
+        self.selector.unregister(handler.connection)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                closed = self.closed
+                incoming, self.incoming = self.incoming, []
+            if closed:
+                break
+            now = time.monotonic()
+            for handler in incoming:
+                self.parked[handler] = now + self.timeout
+                self.selector.register(handler.connection, selectors.EVENT_READ, handler)
+            while len(self.parked) > self.max_idle:
+                handler = next(iter(self.parked))
+                self._unpark(handler)
+                handler.close()
+
+            wait = min(self.parked.values(), default=now + 1.0) - now
+            for key, _ in self.selector.select(timeout=max(wait, 0.0)):
+                if key.data is None:
+                    try:
+                        self.wakeup_reader.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._unpark(key.data)
+                self.resume(key.data)
+
+            now = time.monotonic()
+            expired = [handler for handler, deadline in self.parked.items() if deadline <= now]
+            for handler in expired:
+                self._unpark(handler)
+                handler.close()
+
+        for handler in list(self.parked) + incoming:
+            handler.close()
+        self.parked.clear()
+        self.selector.close()
+        self.wakeup_reader.close()
+        self.wakeup_writer.close()
+
+
+class PooledHTTPServer(http.server.ThreadingHTTPServer):
+    """
+    HTTP server whose requests run on a fixed-size worker pool.
+
+    Each pool task handles a single request; keep-alive connections go to
+    IdleConnections in between and come back when the next request arrives.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, max_workers=MAX_WORKERS,
+                 max_pending=MAX_PENDING, keepalive_timeout=KEEPALIVE_TIMEOUT, max_idle=MAX_IDLE):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http')
+        # New connections waiting for or holding a worker; beyond that they
+        # are turned away with a 503 instead of blocking the accept loop
+        self.slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.idle = IdleConnections(self._resume, keepalive_timeout, max_idle)
+        self.shutting_down = False
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            self._reject(request)
+            return
+        try:
+            self.executor.submit(self._start_connection, request, client_address)
+        except RuntimeError:
+            # Pool already shut down
+            self.slots.release()
+            self.shutdown_request(request)
+
+    def _reject(self, request):
+        """Answer 503 without waiting on a slow client, then close"""
+        try:
+            request.settimeout(1)
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\n'
+                b'Content-Length: 0\r\nConnection: close\r\n\r\n'
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _start_connection(self, request, client_address):
+        try:
+            # The handler serves the connection's first request on construction
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        finally:
+            self.slots.release()
+        self._after_request(handler)
+
+    def _resume(self, handler):
+        """Next request on a parked connection (called by IdleConnections)"""
+        try:
+            self.executor.submit(self._continue_connection, handler)
+        except RuntimeError:
+            handler.close()
+
+    def _continue_connection(self, handler):
+        try:
+            handler.handle()
+            handler.finish()
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+            handler.close()
+            return
+        self._after_request(handler)
+
+    def _after_request(self, handler):
+        if handler.close_connection or self.shutting_down:
+            handler.close()
+        elif handler.has_buffered_request():
+            # Pipelined request already read into the buffer
+            self._resume(handler)
+        else:
+            self.idle.park(handler)
+
+    def handle_error(self, request, client_address):
+        # Clients dropping the connection mid-response are routine, not errors
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def shutdown(self):
+        self.shutting_down = True
+        self.idle.close()
+        super().shutdown()
+
+    def server_close(self):
+        super().server_close()
+        self.idle.close()
+        self.executor.shutdown(wait=True)
+
 
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = REQUEST_TIMEOUT
+    asset_cache = AssetCache()
+    catalog = IndexCatalog()
+
+    def handle(self):
+        # One request per call: PooledHTTPServer parks the connection between
+        # requests instead of this worker blocking on the next one
+        self.close_connection = True
+        self.handle_one_request()
+
+    def finish(self):
+        # Only flush here; the connection stays open until close()
+        if not self.wfile.closed:
+            try:
+                self.wfile.flush()
+            except OSError:
+                pass
+
+    def close(self):
+        """Close the connection (after its last request or when idle too long)"""
+        try:
+            super().finish()
+        except OSError:
+            pass
+        self.server.shutdown_request(self.request)
+
+    def has_buffered_request(self):
+        """True if the next request's bytes are already read (pipelining)"""
+        try:
+            self.connection.setblocking(False)
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            try:
+                self.connection.settimeout(self.timeout)
+            except OSError:
+                pass
+
+    def do_GET(self):
+        if self.path.startswith('/api/'):
+            self.handle_api()
+        elif not self.send_cached(head_only=False):
+            super().do_GET()
+
+    def handle_api(self, head_only=False):
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        if url.path == '/api/indices':
+            category = query.get('category') or None
+            sort = query.get('sort', 'none')
+            top = query.get('top')
+            if top is not None:
+                try:
+                    top = int(top)
+                except ValueError:
+                    top = -1
+                if top < 0:
+                    return self.send_json(400, {'error': 'top must be a non-negative integer'}, head_only)
+            if sort not in ('none', 'asc', 'desc'):
+                return self.send_json(400, {'error': "sort must be 'asc', 'desc' or 'none'"}, head_only)
+            if not self.refresh_catalog(head_only):
+                return
+            if category is not None and category not in self.catalog.views:
+                return self.send_json(400, {
+                    'error': f"Unknown category '{category}'",
+                    'categories': self.catalog.categories,
+                }, head_only)
+            items = self.catalog.indices(category, sort, top)
+            return self.send_json(200, {'count': len(items), 'indices': items}, head_only)
+
+        if url.path.startswith('/api/index/'):
+            name = unquote(url.path[len('/api/index/'):])
+            if not self.refresh_catalog(head_only):
+                return
+            item = self.catalog.lookup(name)
+            if item is None:
+                return self.send_json(404, {'error': f"Index '{name}' not found"}, head_only)
+            return self.send_json(200, item, head_only)
+
+        self.send_json(404, {'error': f'Unknown API route {url.path}'}, head_only)
+
+    def refresh_catalog(self, head_only=False):
+        """Reload the index data if it changed; sends a 503 and returns False if it cannot be read"""
+        try:
+            self.catalog.refresh()
+        except (OSError, ValueError) as e:
+            self.send_json(503, {'error': f'Index data unavailable: {e}'}, head_only)
+            return False
+        return True
+
+    def send_json(self, status, payload, head_only=False):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+        encoding = 'identity'
+        if len(body) >= MIN_COMPRESS_SIZE:
+            encoding = preferred_encoding(self.headers.get('Accept-Encoding'), ('gzip',))
+
+        if status == 200:
+            if encoding == 'gzip':
+                etag = etag[:-1] + '-gz"'
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return
+
+        if encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if status == 200:
+            self.send_header('ETag', etag)
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path.startswith('/api/'):
+            self.handle_api(head_only=True)
+        elif not self.send_cached(head_only=True):
+            super().do_HEAD()
+
+    def send_cached(self, head_only):
+        """Serve a regular file from the asset cache; False to fall back to the default handler"""
+        path = self.translate_path(self.path)
+        if self.path.split('?', 1)[0].endswith('/') and os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        asset = self.asset_cache.get(path, self.guess_type(path))
+        if asset is None:
+            return False
+
+        encoding = preferred_encoding(self.headers.get('Accept-Encoding'), asset.variants)
+        body, etag = asset.variants[encoding]
+
+        # If-Modified-Since only counts when there is no If-None-Match (RFC 9110)
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            not_modified = etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = self.headers.get('If-Modified-Since')
+            not_modified = if_modified_since is not None and not_modified_since(if_modified_since, asset.mtime)
+        if not_modified:
+            self.send_response(304)
+            self.send_asset_headers(asset, encoding, etag)
+            self.end_headers()
+            return True
+
+        self.send_response(200)
+        self.send_asset_headers(asset, encoding, etag)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(body)
+        return True
+
+    def send_asset_headers(self, asset, encoding, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', asset.last_modified)
+        # Always revalidate: cheap 304s, and new data shows up immediately
+        self.send_header('Cache-Control', 'no-cache')
+        if asset.compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
+        if self.server.shutting_down and not self.close_connection:
+            self.send_header('Connection', 'close')
         super().end_headers()
 
-os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-    print(f"✅ Server running at http://localhost:{PORT}")
-    print(f"📊 Open http://localhost:{PORT}/index.html in your browser")
-    print("Press Ctrl+C to stop the server")
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\n🛑 Server stopped")
+def main():
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    with PooledHTTPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever() to return, so it cannot
+            # run on the thread that is inside serve_forever()
+            threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+
+        print(f"✅ Server running at http://localhost:{PORT}")
+        print(f"📊 Open http://localhost:{PORT}/index.html in your browser")
+        print(f"   {MAX_WORKERS} workers, keep-alive {KEEPALIVE_TIMEOUT}s")
+        print("Press Ctrl+C to stop the server")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print("\n🛑 Stopping: finishing in-flight requests...")
+    print("🛑 Server stopped")
+
+
+if __name__ == "__main__":
+    main()
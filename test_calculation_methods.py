@@ -7,14 +7,16 @@ import pandas as pd
 import numpy as np
 import json
 
+from calculation_cache import latest_summary
+from price_store import load_prices
+
 print("=" * 80)
 print("CALCULATION COMPARISON TEST")
 print("=" * 80)
 
 # Read the raw data
 print("\nReading raw data...")
-df = pd.read_csv('data/Latest_Indices_rawdata_14112025.csv')
-df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%y')
+df = load_prices('data/Latest_Indices_rawdata_14112025.csv')
 print(f"Data loaded: {len(df)} rows, {len(df.columns)} columns")
 print(f"Date range: {df['DATE'].min()} to {df['DATE'].max()}")
 
@@ -22,67 +24,9 @@ print(f"Date range: {df['DATE'].min()} to {df['DATE'].max()}")
 # OLD METHOD (Current)
 # ============================================================================
 def calculate_old_method(df_with_daily_values, date_column='DATE'):
-    """OLD calculation method"""
-    
-    df_melted = df_with_daily_values.melt(
-        id_vars=[date_column], 
-        var_name='SYMBOL', 
-        value_name='VALUE'
-    )
-    df_melted = df_melted.dropna()
-    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
-    df_melted = df_melted.dropna()
-    
-    # OLD: Calculate 5-Year Rolling CAGR without proper sorting
-    pr_cagr = 1825
-    df_melted['Rolling_CAGR'] = (
-        df_melted.groupby(['SYMBOL'])['VALUE']
-        .rolling(pr_cagr)
-        .apply(lambda x: (x.iloc[-1]/x.iloc[0])**(1/5) - 1 if len(x) >= pr_cagr and x.iloc[0] > 0 else np.nan, raw=False)
-        .round(5)
-        .reset_index(0, drop=True)
-    )
-    
-    # OLD: Calculate Percentile Rank
-    pr_rank = 5 * 365
-    def percentile_rank(x):
-        if len(x) > 0:
-            return pd.Series(x).rank(pct=True).iloc[-1]
-        return np.nan
-    
-    df_melted['Percentile_Rank'] = (
-        df_melted.groupby(['SYMBOL'])['Rolling_CAGR']
-        .rolling(pr_rank, min_periods=1)
-        .apply(percentile_rank, raw=False)
-        .round(5)
-        .reset_index(0, drop=True)
-    )
-    
-    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
-    
-    df_processed = df_melted.pivot_table(
-        values='Percentile_Rank', 
-        index=date_column, 
-        columns='SYMBOL'
-    )
-    
-    df_processed['year'] = df_processed.index.year
-    df_processed['month'] = df_processed.index.month
-    df_month_mean = df_processed.groupby(['year', 'month']).mean()
-    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
-    
-    df_final_summary = df_month_mean.reset_index()
-    df_final_summary = df_final_summary.iloc[0:1, :].transpose()
-    df_final_summary.columns = ["final_pct_value"]
-    df_final_summary.drop(["year", "month"], inplace=True)
-    
-    df_final_summary['final_pct_value'] = pd.to_numeric(
-        df_final_summary['final_pct_value'], 
-        errors='coerce'
-    )
-    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
-    
-    return df_final_summary
+    """OLD calculation method (same as calculate_summary.calculate_final_summary)"""
+    # Cached in data/calculation_cache/ (see calculation_cache.py)
+    return latest_summary(df_with_daily_values, 'old', date_column=date_column)
 
 
 # ============================================================================
@@ -91,83 +35,9 @@ def calculate_old_method(df_with_daily_values, date_column='DATE'):
 def calculate_new_method(df_with_daily_values, date_column='DATE'):
     """NEW calculation method with fixes"""
     
-    df_melted = df_with_daily_values.melt(
-        id_vars=[date_column], 
-        var_name='SYMBOL', 
-        value_name='VALUE'
-    )
-    df_melted = df_melted.dropna()
-    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
-    df_melted = df_melted.dropna()
-    
-    # NEW: Sort by SYMBOL and DATE to ensure proper rolling window
-    df_melted = df_melted.sort_values([date_column, 'SYMBOL']).reset_index(drop=True)
-    
-    # NEW: Calculate 5-Year Rolling CAGR with stricter requirements
-    pr_cagr = 1825
-    
-    def calculate_cagr(x):
-        """Calculate CAGR safely"""
-        if len(x) < pr_cagr:
-            return np.nan
-        first_val = x.iloc[0]
-        last_val = x.iloc[-1]
-        if first_val <= 0 or last_val <= 0:
-            return np.nan
-        return (last_val / first_val) ** (1/5) - 1
-    
-    df_melted['Rolling_CAGR'] = (
-        df_melted.groupby('SYMBOL')['VALUE']
-        .rolling(window=pr_cagr, min_periods=pr_cagr)
-        .apply(calculate_cagr, raw=False)
-        .reset_index(level=0, drop=True)
-    )
-    
-    # NEW: Calculate Percentile Rank with full window requirement
-    pr_rank = 1825
-    
-    def percentile_rank(x):
-        """Calculate percentile rank of the most recent value"""
-        if len(x) < pr_rank:
-            return np.nan
-        x_clean = pd.Series(x).dropna()
-        if len(x_clean) == 0:
-            return np.nan
-        return x_clean.rank(pct=True).iloc[-1]
-    
-    df_melted['Percentile_Rank'] = (
-        df_melted.groupby('SYMBOL')['Rolling_CAGR']
-        .rolling(window=pr_rank, min_periods=pr_rank)
-        .apply(percentile_rank, raw=False)
-        .reset_index(level=0, drop=True)
-    )
-    
-    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
-    
-    df_processed = df_melted.pivot_table(
-        values='Percentile_Rank', 
-        index=date_column, 
-        columns='SYMBOL'
-    )
-    
-    df_processed['year'] = df_processed.index.year
-    df_processed['month'] = df_processed.index.month
-    df_month_mean = df_processed.groupby(['year', 'month']).mean(numeric_only=True)
-    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
-    
-    df_final_summary = df_month_mean.reset_index()
-    df_final_summary = df_final_summary.iloc[0:1, :].transpose()
-    df_final_summary.columns = ["final_pct_value"]
-    df_final_summary.drop(["year", "month"], inplace=True)
-    
-    df_final_summary['final_pct_value'] = pd.to_numeric(
-        df_final_summary['final_pct_value'], 
-        errors='coerce'
-    )
-    df_final_summary = df_final_summary.dropna()
-    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
-    
-    return df_final_summary
+    # NEW: Rolling CAGR and percentile rank with full 1825-day windows,
+    # sorted by date per symbol; shared with the other comparison scripts
+    return latest_summary(df_with_daily_values, 'new', date_column=date_column)
 
 
 # ============================================================================
@@ -269,5 +139,5 @@ RECOMMENDATION:
 """)
 
 print("=" * 80)
-print("Test complete. No files were modified.")
+print("Test complete. No output files were modified (results cached in data/calculation_cache/).")
 print("=" * 80)
@@ -0,0 +1,55 @@
+"""
+Shared fixtures: synthetic random-walk price panels shaped like the raw CSV
+(DATE column + one column per index, dd/mm/yy dates, late listings as NaN).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The engine modules are flat scripts in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from price_store import DATE_FORMAT  # noqa: E402
+
+
+def make_prices(rows=4200, symbols=4, seed=0, start='2005-01-03'):
+    """
+    Random-walk panel; index j is listed 250 * j rows after the first date.
+
+    Args:
+        rows: Trading days
+        symbols: Number of index columns
+        seed: RNG seed
+        start: First date (business days from there)
+
+    Returns:
+        DataFrame with a DATE column followed by one float column per index
+    """
+    rng = np.random.default_rng(seed)
+    values = 1000 * np.exp(np.cumsum(rng.normal(0.0004, 0.01, (rows, symbols)), axis=0))
+    for j in range(symbols):
+        values[:250 * j, j] = np.nan
+    df = pd.DataFrame(values, columns=[f'INDEX {j}' for j in range(symbols)])
+    df.insert(0, 'DATE', pd.bdate_range(start, periods=rows))
+    return df
+
+
+@pytest.fixture
+def prices():
+    return make_prices()
+
+
+@pytest.fixture
+def write_price_csv(tmp_path):
+    """Function writing a price frame as a raw CSV under tmp_path"""
+    def write(df, name='prices.csv'):
+        path = tmp_path / name
+        out = df.copy()
+        out['DATE'] = out['DATE'].dt.strftime(DATE_FORMAT)
+        out.to_csv(path, index=False)
+        return path
+    return write
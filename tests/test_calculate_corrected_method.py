@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculate_corrected_method import calculate_final_summary_v2, monthly_mean_frame, period_mean_frame
+from instrumentation import RunReport
+from conftest import make_prices
+
+
+def baseline_v2_summary(df, date_column='DATE'):
+    """calculate_final_summary_v2 before the shared engine (melt + groupby-rolling-apply)"""
+    df_melted = df.melt(id_vars=[date_column], var_name='SYMBOL', value_name='VALUE')
+    df_melted = df_melted.dropna()
+    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
+    df_melted = df_melted.dropna()
+    df_melted = df_melted.sort_values(['SYMBOL', date_column]).reset_index(drop=True)
+
+    pr_cagr = 1825
+
+    def calc_cagr(x):
+        if len(x) < pr_cagr:
+            return np.nan
+        first, last = x.iloc[0], x.iloc[-1]
+        if first <= 0 or last <= 0:
+            return np.nan
+        return (last / first) ** (1/5) - 1
+
+    df_melted['Rolling_CAGR'] = (
+        df_melted.groupby('SYMBOL')['VALUE']
+        .rolling(pr_cagr, min_periods=pr_cagr)
+        .apply(calc_cagr, raw=False)
+        .reset_index(level=0, drop=True)
+    )
+
+    pr_rank = 1825
+
+    def percentile_rank_rolling(x):
+        if len(x) < pr_rank:
+            return np.nan
+        x_clean = pd.Series(x).dropna()
+        if len(x_clean) == 0:
+            return np.nan
+        return x_clean.rank(pct=True).iloc[-1]
+
+    df_melted['Percentile_Rank'] = (
+        df_melted.groupby('SYMBOL')['Rolling_CAGR']
+        .rolling(pr_rank, min_periods=pr_rank)
+        .apply(percentile_rank_rolling, raw=False)
+        .reset_index(level=0, drop=True)
+    )
+    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
+
+    df_processed = df_melted.pivot_table(values='Percentile_Rank', index=date_column, columns='SYMBOL')
+    df_processed['year'] = df_processed.index.year
+    df_processed['month'] = df_processed.index.month
+    df_month_mean = df_processed.groupby(['year', 'month']).mean(numeric_only=True)
+    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
+
+    df_final_summary = df_month_mean.reset_index()
+    df_final_summary = df_final_summary.iloc[0:1, :].transpose()
+    df_final_summary.columns = ["final_pct_value"]
+    df_final_summary.drop(["year", "month"], inplace=True)
+    df_final_summary['final_pct_value'] = pd.to_numeric(df_final_summary['final_pct_value'], errors='coerce')
+    df_final_summary = df_final_summary.dropna()
+    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
+    return df_final_summary
+
+
+def summary_v2(df, workers=1, **kwargs):
+    return calculate_final_summary_v2(df, workers=workers, report=RunReport('test', memory=None), **kwargs)
+
+
+@pytest.fixture(scope='module')
+def small_panel():
+    return make_prices(rows=4200, symbols=3, seed=7)
+
+
+@pytest.fixture
+def daily_ranks():
+    """Daily rank-like matrix with gaps and a late-listed column"""
+    rng = np.random.default_rng(8)
+    dates = pd.bdate_range('2019-12-20', periods=260)
+    matrix = rng.random((260, 3))
+    matrix[rng.random((260, 3)) < 0.2] = np.nan
+    matrix[:30, 2] = np.nan
+    return pd.DataFrame(matrix, index=dates, columns=['A', 'B', 'C'])
+
+
+def test_v2_matches_baseline(small_panel):
+    expected = baseline_v2_summary(small_panel)
+    summary = summary_v2(small_panel)
+
+    assert list(summary.index) == list(expected.index)
+    np.testing.assert_allclose(
+        summary['final_pct_value'].to_numpy(), expected['final_pct_value'].to_numpy(dtype=float),
+        rtol=0, atol=1e-12
+    )
+
+
+def test_workers_do_not_change_result(small_panel):
+    pd.testing.assert_frame_equal(summary_v2(small_panel, workers=2), summary_v2(small_panel))
+
+
+def test_compact_is_within_tolerance(small_panel):
+    reference, reference_months = summary_v2(small_panel, return_history=True)
+    compact, compact_months = summary_v2(small_panel, return_history=True, compact=True)
+
+    assert list(compact.index) == list(reference.index)
+    assert compact_months.index.equals(reference_months.index)
+    # float32 values: the monthly means stay within ~1e-8 of float64
+    np.testing.assert_allclose(compact_months.to_numpy(), reference_months.to_numpy(), rtol=0, atol=1e-7)
+
+
+def test_monthly_means_match_groupby(daily_ranks):
+    expected = daily_ranks.groupby([daily_ranks.index.year, daily_ranks.index.month]).mean()
+    df_month_mean = monthly_mean_frame(daily_ranks)
+
+    assert list(df_month_mean.index) == list(expected.index[::-1])
+    np.testing.assert_allclose(df_month_mean.to_numpy(), expected.to_numpy()[::-1], rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('periods, days_before_label', [('W-FRI', 6), ('MS', 0), ('2W-FRI', 13)])
+def test_period_means_match_resample(daily_ranks, periods, days_before_label):
+    expected = daily_ranks.resample(periods).mean().dropna(how='all')
+    df_period_mean = period_mean_frame(daily_ranks, periods)
+
+    # Labels are the first calendar day of each period, not pandas' end label
+    assert list(df_period_mean.index) == list(expected.index - pd.Timedelta(days=days_before_label))
+    np.testing.assert_allclose(df_period_mean.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12)
+
+
+def test_explicit_period_starts(daily_ranks):
+    starts = pd.DatetimeIndex(['2020-01-01', '2020-03-15', '2020-06-01'])
+    df_period_mean = period_mean_frame(daily_ranks, starts)
+
+    assert list(df_period_mean.index) == list(starts)
+    expected = daily_ranks.loc['2020-03-15':'2020-05-31'].mean()
+    np.testing.assert_allclose(df_period_mean.iloc[1].to_numpy(), expected.to_numpy(), rtol=0, atol=1e-12)
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculate_corrected_method import calculate_final_summary_v2
+from calculation_cache import cached_entry, daily_ranks, latest_summary, prune_cache
+from instrumentation import RunReport
+from conftest import make_prices
+
+
+def baseline_old_summary(df_with_daily_values, date_column='DATE'):
+    """The old method as the comparison scripts carried it before the shared engine"""
+    df_melted = df_with_daily_values.melt(id_vars=[date_column], var_name='SYMBOL', value_name='VALUE')
+    df_melted = df_melted.dropna()
+    df_melted['VALUE'] = pd.to_numeric(df_melted['VALUE'], errors='coerce')
+    df_melted = df_melted.dropna()
+
+    pr_cagr = 1825
+    df_melted['Rolling_CAGR'] = (
+        df_melted.groupby(['SYMBOL'])['VALUE']
+        .rolling(pr_cagr)
+        .apply(lambda x: (x.iloc[-1]/x.iloc[0])**(1/5) - 1 if len(x) >= pr_cagr and x.iloc[0] > 0 else np.nan, raw=False)
+        .round(5)
+        .reset_index(0, drop=True)
+    )
+
+    def percentile_rank(x):
+        if len(x) > 0:
+            return pd.Series(x).rank(pct=True).iloc[-1]
+        return np.nan
+
+    df_melted['Percentile_Rank'] = (
+        df_melted.groupby(['SYMBOL'])['Rolling_CAGR']
+        .rolling(5 * 365, min_periods=1)
+        .apply(percentile_rank, raw=False)
+        .round(5)
+        .reset_index(0, drop=True)
+    )
+    df_melted = df_melted.dropna(subset=['Percentile_Rank'])
+
+    df_processed = df_melted.pivot_table(values='Percentile_Rank', index=date_column, columns='SYMBOL')
+    df_processed['year'] = df_processed.index.year
+    df_processed['month'] = df_processed.index.month
+    df_month_mean = df_processed.groupby(['year', 'month']).mean()
+    df_month_mean.sort_values(by=['year', 'month'], ascending=False, inplace=True)
+
+    df_final_summary = df_month_mean.reset_index()
+    df_final_summary = df_final_summary.iloc[0:1, :].transpose()
+    df_final_summary.columns = ["final_pct_value"]
+    df_final_summary.drop(["year", "month"], inplace=True)
+    df_final_summary['final_pct_value'] = pd.to_numeric(df_final_summary['final_pct_value'], errors='coerce')
+    df_final_summary.sort_values(by='final_pct_value', ascending=True, inplace=True)
+    return df_final_summary
+
+
+@pytest.fixture
+def delisted_prices():
+    """Panel where INDEX 1 stops trading before the latest month"""
+    df = make_prices(rows=4500, symbols=4, seed=3)
+    df.loc[df.index[-40:], 'INDEX 1'] = np.nan
+    return df
+
+
+def test_old_matches_baseline(tmp_path, delisted_prices):
+    expected = baseline_old_summary(delisted_prices)
+    summary = latest_summary(delisted_prices, 'old', cache_dir=tmp_path, workers=1)
+
+    assert len(summary) == len(expected) == 4
+    assert list(summary.index) == list(expected.index)
+    assert summary.loc['INDEX 1', 'final_pct_value'] != summary.loc['INDEX 1', 'final_pct_value']
+    np.testing.assert_allclose(
+        summary['final_pct_value'].to_numpy(dtype=float), expected['final_pct_value'].to_numpy(dtype=float),
+        rtol=0, atol=1e-12
+    )
+
+
+def test_new_drops_indices_without_latest_month(tmp_path, delisted_prices):
+    summary = latest_summary(delisted_prices, 'new', cache_dir=tmp_path, workers=1)
+    assert 'INDEX 1' not in summary.index
+    assert summary['final_pct_value'].notna().all()
+
+
+def test_dropna_does_not_split_entries(tmp_path, delisted_prices):
+    entry = cached_entry(delisted_prices, 'old', cache_dir=tmp_path, workers=1)
+    assert cached_entry(delisted_prices, 'old', cache_dir=tmp_path, workers=1, dropna=True) == entry
+    kept = latest_summary(delisted_prices, 'old', cache_dir=tmp_path, dropna=True)
+    assert 'INDEX 1' not in kept.index
+
+
+def test_new_matches_v2(tmp_path, prices):
+    expected = calculate_final_summary_v2(prices, workers=1, report=RunReport('test', memory=None))
+    summary = latest_summary(prices, 'new', cache_dir=tmp_path, workers=1)
+    pd.testing.assert_frame_equal(summary, expected, check_exact=False, rtol=1e-12)
+
+
+def test_warm_entry_is_reused(tmp_path, prices):
+    first = daily_ranks(prices, 'new', cache_dir=tmp_path, workers=1)
+    entries = sorted(tmp_path.iterdir())
+    second = daily_ranks(prices, 'new', cache_dir=tmp_path, workers=1)
+    assert sorted(tmp_path.iterdir()) == entries
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_prune_keeps_newest_entries(tmp_path, prices):
+    for k in range(4):
+        changed = prices.copy()
+        changed.loc[changed.index[-1], 'INDEX 0'] = 1000.0 + k
+        cached_entry(changed, 'new', cache_dir=tmp_path, workers=1)
+    assert len(list(tmp_path.iterdir())) == 2
+    assert prune_cache(tmp_path, keep=1) == 1
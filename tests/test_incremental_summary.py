@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from calculate_corrected_method import calculate_final_summary_v2
+from incremental_summary import build_state, summary_from_state, update_from_dataframe, update_state
+from instrumentation import RunReport
+
+
+SMALL = {'cagr_window': 40, 'rank_window': 30, 'years': 1}
+
+
+def test_full_build_matches_v2(prices):
+    expected = calculate_final_summary_v2(prices, workers=1, report=RunReport('test', memory=None))
+    pd.testing.assert_frame_equal(
+        summary_from_state(build_state(prices)), expected, check_exact=False, rtol=1e-12, check_names=False
+    )
+
+
+@pytest.mark.parametrize('params', [{}, SMALL])
+def test_update_matches_full_recompute(prices, params):
+    # The last 60 rows cross at least two month boundaries
+    state = build_state(prices.iloc[:-60], **params)
+    state, applied, rebuilt = update_from_dataframe(prices, state, **params)
+    assert (applied, rebuilt) == (60, False)
+
+    full = build_state(prices, **params)
+    pd.testing.assert_frame_equal(summary_from_state(state), summary_from_state(full), check_exact=False, rtol=1e-12)
+
+    closed = dict(state['closed_months'])
+    for month, means in full['closed_months'][-2:]:
+        assert closed[month].keys() == means.keys()
+        for symbol, mean in means.items():
+            assert closed[month][symbol] == pytest.approx(mean, rel=1e-12)
+
+
+def test_changed_params_rebuild(prices):
+    state = build_state(prices.iloc[:-5], **SMALL)
+    _, applied, rebuilt = update_from_dataframe(prices, state)
+    assert rebuilt and applied == len(prices)
+
+
+def test_update_rejects_old_dates(prices):
+    state = build_state(prices, **SMALL)
+    with pytest.raises(ValueError):
+        update_state(state, prices['DATE'].iloc[-1], {'INDEX 0': 1000.0})
@@ -0,0 +1,50 @@
+import pytest
+
+from name_matcher import ABBREVIATIONS, MIN_ABBREVIATION, NameMatcher, tokenize
+
+
+@pytest.fixture
+def matcher():
+    matcher = NameMatcher()
+    for name in ['Nifty Smallcap 50', 'Nifty Smallcap 250', 'Nifty500 Quality 50',
+                 'Nifty200 Momentum 30', 'Nifty India Manufacturing', 'Nifty Transportation & Logistics']:
+        matcher.add(name, name)
+    return matcher
+
+
+def test_long_abbreviations_expand():
+    assert tokenize('Nifty500 Qlty50') == ['500', 'quality', '50']
+    assert tokenize('NIFTY SMLCAP 250') == ['smallcap', '250']
+    assert tokenize('Nifty200Momentm30') == ['200', 'momentum', '30']
+
+
+def test_short_tokens_are_not_expanded():
+    assert all(len(key) >= MIN_ABBREVIATION for key in ABBREVIATIONS)
+    assert tokenize('Nifty 50 TR') == ['50', 'tr']
+    assert tokenize('Nifty Q 50') == ['q', '50']
+    assert tokenize('Nifty Ind Log') == ['ind', 'log']
+
+
+def test_fuzzy_matches(matcher):
+    assert matcher.best('Nifty500 Qlty50') == 'Nifty500 Quality 50'
+    assert matcher.best('NIFTY SMLCAP 250') == 'Nifty Smallcap 250'
+    assert matcher.best('Nifty200Momentm30') == 'Nifty200 Momentum 30'
+
+
+def test_short_token_does_not_match_confidently(matcher):
+    # 'q' used to expand to 'quality' and match Nifty500 Quality 50
+    assert matcher.best('Nifty500 Q 50') is None
+
+
+def test_near_ties_are_reported(matcher):
+    rejected = []
+    assert matcher.best('Nifty Smallcap', min_score=0.5, rejected=rejected) is None
+    assert [name for name, _ in rejected] == ['Nifty Smallcap']
+    candidates = {key for key, _, _ in rejected[0][1]}
+    assert candidates == {'Nifty Smallcap 50', 'Nifty Smallcap 250'}
+
+
+def test_clear_winner_is_not_reported(matcher):
+    rejected = []
+    assert matcher.best('Nifty Smallcap 250', rejected=rejected) == 'Nifty Smallcap 250'
+    assert rejected == []
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from calculate_corrected_method import calculate_final_summary_v2
+from instrumentation import RunReport
+from pipeline import Pipeline, Stage, build_pipeline
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # The stages write to data/... relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return tmp_path
+
+
+def run_summary(csv_file, cache_dir):
+    pipeline = build_pipeline(csv_file, workers=1, cache_dir=cache_dir)
+    return pipeline, pipeline.run(['summary'])['summary']
+
+
+def expected_summary(prices):
+    return calculate_final_summary_v2(prices, workers=1, report=RunReport('test', memory=None))
+
+
+def test_summary_matches_v2(workdir, prices, write_price_csv):
+    _, summary = run_summary(write_price_csv(prices), workdir / 'cache')
+    pd.testing.assert_frame_equal(summary, expected_summary(prices), check_exact=False, rtol=1e-12)
+
+
+def test_unsorted_csv_is_sorted_by_date(workdir, prices, write_price_csv):
+    shuffled = prices.sample(frac=1.0, random_state=1)
+    _, summary = run_summary(write_price_csv(shuffled, 'shuffled.csv'), workdir / 'cache')
+    pd.testing.assert_frame_equal(summary, expected_summary(prices), check_exact=False, rtol=1e-12)
+
+
+def test_reversed_csv_matches_sorted(workdir, prices, write_price_csv):
+    _, forward = run_summary(write_price_csv(prices), workdir / 'cache')
+    _, reverse = run_summary(write_price_csv(prices.iloc[::-1], 'reversed.csv'), workdir / 'cache')
+    pd.testing.assert_frame_equal(reverse, forward, check_exact=False, rtol=1e-12)
+
+
+def test_second_run_is_cached(workdir, prices, write_price_csv):
+    csv_file = write_price_csv(prices)
+    run_summary(csv_file, workdir / 'cache')
+    pipeline, _ = run_summary(csv_file, workdir / 'cache')
+    assert dict((name, status) for name, status, _ in pipeline.report) == {'summary': 'cached'}
+
+
+def test_sort_is_part_of_the_key(workdir, prices, write_price_csv):
+    csv_file = write_price_csv(prices)
+    pipeline = build_pipeline(csv_file, workers=1, cache_dir=workdir / 'cache')
+    key = pipeline.key('cagr')
+
+    unsorted = build_pipeline(csv_file, workers=1, cache_dir=workdir / 'cache')
+    unsorted.stages['prices'].params['sort_dates'] = False
+    assert unsorted.key('cagr') != key
+
+
+def test_params_change_downstream_keys_only(workdir, prices, write_price_csv):
+    csv_file = write_price_csv(prices)
+    pipeline = build_pipeline(csv_file, workers=1, cache_dir=workdir / 'cache')
+    keys = {name: pipeline.key(name) for name in ('prices', 'cagr', 'rank', 'summary')}
+
+    changed = build_pipeline(csv_file, workers=1, cache_dir=workdir / 'cache')
+    changed.stages['rank'].params['window'] = 1000
+    assert changed.key('prices') == keys['prices'] and changed.key('cagr') == keys['cagr']
+    assert changed.key('rank') != keys['rank'] and changed.key('summary') != keys['summary']
+
+
+def engine_stage():
+    return 1
+
+
+def test_module_edit_changes_key(tmp_path, monkeypatch):
+    module = tmp_path / 'scratch_engine.py'
+    module.write_text('WINDOW = 1825\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def key():
+        stage = Stage('engine', engine_stage, modules=['scratch_engine'])
+        return Pipeline([stage], cache_dir=tmp_path / 'cache').key('engine')
+
+    before = key()
+    assert key() == before
+    module.write_text('WINDOW = 1826\n')
+    assert key() != before
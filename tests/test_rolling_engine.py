@@ -0,0 +1,192 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling_engine import (
+    IncrementalRank,
+    PrefixSums,
+    apply_columns,
+    bucket_starts,
+    period_ids,
+    rolling_cagr,
+    rolling_cagr_by_date,
+    rolling_percentile_rank,
+    rolling_percentile_rank_by_date,
+    window_starts,
+)
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 1000 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, n)))
+
+
+def irregular_dates(n, seed=0):
+    """Sorted business days with random holidays dropped"""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2010-01-01', periods=int(n * 1.3))
+    keep = np.sort(rng.choice(len(days), n, replace=False))
+    return days[keep]
+
+
+# ---- references: the pandas code the kernels replaced -----------------------
+
+def pandas_cagr(values, window, years, strict=True):
+    def calc_cagr(x):
+        first, last = x.iloc[0], x.iloc[-1]
+        if first <= 0 or (strict and last <= 0):
+            return np.nan
+        return (last / first) ** (1 / years) - 1
+    return pd.Series(values).rolling(window, min_periods=window).apply(calc_cagr, raw=False).to_numpy()
+
+
+def pandas_rank(values, window, min_periods=None):
+    def rank_last(x):
+        if np.isnan(x.iloc[-1]):
+            return np.nan
+        return x.dropna().rank(pct=True).iloc[-1]
+    min_periods = window if min_periods is None else min_periods
+    return pd.Series(values).rolling(window, min_periods=min_periods).apply(rank_last, raw=False).to_numpy()
+
+
+def brute_cagr_by_date(values, dates, offset, years):
+    out = np.full(len(values), np.nan)
+    for i, date in enumerate(dates):
+        before = np.flatnonzero(dates <= date - offset)
+        if len(before) and values[before[-1]] > 0 and values[i] > 0:
+            out[i] = (values[i] / values[before[-1]]) ** (1 / years) - 1
+    return out
+
+
+def brute_rank_by_date(values, dates, offset, min_periods=None):
+    out = np.full(len(values), np.nan)
+    for i, date in enumerate(dates):
+        start = int(np.sum(dates <= date - offset))
+        window = pd.Series(values[start:i + 1])
+        if start == 0 or np.isnan(values[i]):
+            continue
+        if (window.isna().any()) if min_periods is None else (window.notna().sum() < min_periods):
+            continue
+        out[i] = window.dropna().rank(pct=True).iloc[-1]
+    return out
+
+
+# ---- observation-count kernels --------------------------------------------
+
+@pytest.mark.parametrize('window', [2, 60, 1825])
+def test_cagr_is_bit_identical_to_pandas(window):
+    values = random_walk(2400)
+    np.testing.assert_array_equal(rolling_cagr(values, window, 5), pandas_cagr(values, window, 5))
+
+
+@pytest.mark.parametrize('strict', [True, False])
+def test_cagr_non_positive_values(strict):
+    values = random_walk(300)
+    values[[20, 150, 151]] = [0.0, -5.0, 0.0]
+    np.testing.assert_array_equal(
+        rolling_cagr(values, 40, 5, strict=strict), pandas_cagr(values, 40, 5, strict=strict)
+    )
+
+
+def test_cagr_shorter_than_window():
+    assert np.isnan(rolling_cagr(random_walk(10), 20)).all()
+
+
+@pytest.mark.parametrize('min_periods', [None, 1, 15])
+def test_rank_matches_pandas_with_ties_and_nans(min_periods):
+    rng = np.random.default_rng(1)
+    # One decimal gives plenty of ties; NaNs as rolling_cagr leaves them
+    values = np.round(rng.normal(0, 1, 800), 1)
+    values[rng.choice(800, 60, replace=False)] = np.nan
+    values[:25] = np.nan
+    np.testing.assert_array_equal(
+        rolling_percentile_rank(values, 30, min_periods), pandas_rank(values, 30, min_periods)
+    )
+
+
+def test_rank_of_constant_series_is_midpoint():
+    ranks = rolling_percentile_rank(np.ones(50), 10)
+    assert np.isnan(ranks[:9]).all()
+    np.testing.assert_array_equal(ranks[9:], 0.55)
+
+
+# ---- calendar-window kernels ------------------------------------------------
+
+def test_window_starts():
+    dates = pd.DatetimeIndex(['2020-01-01', '2020-01-31', '2020-02-01', '2020-02-15', '2020-03-02'])
+    # (date - 1 month, date]: 2020-03-02 starts after 2020-02-01, 2020-02-15 at 2020-01-31
+    np.testing.assert_array_equal(window_starts(dates, '1M'), [0, 0, 1, 1, 3])
+
+
+@pytest.mark.parametrize('window, offset', [('3M', pd.DateOffset(months=3)), ('40D', pd.DateOffset(days=40))])
+def test_cagr_by_date_matches_brute_force(window, offset):
+    dates = irregular_dates(500)
+    values = random_walk(500, seed=2)
+    values[300] = -1.0
+    expected = brute_cagr_by_date(values, dates, offset, years=0.25)
+    np.testing.assert_array_equal(rolling_cagr_by_date(values, dates, window, years=0.25), expected)
+
+
+@pytest.mark.parametrize('min_periods', [None, 20])
+def test_rank_by_date_matches_brute_force(min_periods):
+    rng = np.random.default_rng(3)
+    dates = irregular_dates(500, seed=3)
+    values = np.round(rng.normal(0, 1, 500), 1)
+    values[rng.choice(500, 15, replace=False)] = np.nan
+    expected = brute_rank_by_date(values, dates, pd.DateOffset(months=2), min_periods)
+    np.testing.assert_array_equal(rolling_percentile_rank_by_date(values, dates, '2M', min_periods), expected)
+
+
+# ---- streaming state --------------------------------------------------------
+
+def test_incremental_rank_matches_batch():
+    values = random_walk(400, seed=4)
+    cagrs = rolling_cagr(values, 30, 5)
+    ranks = rolling_percentile_rank(cagrs, 20)
+
+    state = IncrementalRank.from_history(values[:250], cagr_window=30, rank_window=20, years=5)
+    pushed = np.array([state.push(value) for value in values[250:]])
+    np.testing.assert_array_equal(pushed[:, 0], cagrs[250:])
+    np.testing.assert_array_equal(pushed[:, 1], ranks[250:])
+
+
+# ---- column application -----------------------------------------------------
+
+def cagr_rank(column, window):
+    return rolling_percentile_rank(rolling_cagr(column, window, 1), window)
+
+
+def test_apply_columns_masks_and_workers():
+    rng = np.random.default_rng(5)
+    values = np.asfortranarray(np.exp(rng.normal(0, 0.01, (300, 4)).cumsum(axis=0)))
+    values[:50, 1] = np.nan
+    values[rng.choice(300, 20), 2] = np.nan
+    mask = ~np.isnan(values)
+
+    kernel = partial(cagr_rank, window=20)
+    expected = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        rows = np.flatnonzero(mask[:, j])
+        expected[rows, j] = kernel(values[rows, j])
+
+    np.testing.assert_array_equal(apply_columns(values, kernel, mask=mask), expected)
+    np.testing.assert_array_equal(apply_columns(values, kernel, mask=mask, workers=2), expected)
+
+
+# ---- bucket means -----------------------------------------------------------
+
+def test_prefix_sums_match_grouped_means():
+    rng = np.random.default_rng(6)
+    dates = irregular_dates(700, seed=6)
+    matrix = rng.random((700, 3))
+    matrix[rng.random((700, 3)) < 0.2] = np.nan
+    matrix[:100, 2] = np.nan
+
+    ids = period_ids(dates, 'M')
+    starts = bucket_starts(ids)
+    means = PrefixSums(matrix).means(starts)
+
+    expected = pd.DataFrame(matrix, index=dates).groupby([dates.year, dates.month]).mean()
+    np.testing.assert_allclose(means, expected.to_numpy(), rtol=0, atol=1e-12)
@@ -0,0 +1,72 @@
+import email.utils
+import http.client
+import threading
+
+import pytest
+
+from server import AssetCache, MyHTTPRequestHandler, PooledHTTPServer, not_modified_since
+
+
+@pytest.fixture
+def served(tmp_path, monkeypatch):
+    """Server on a free port serving tmp_path; yields (port, tmp_path)"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'index.html').write_text('<html>' + 'heatmap ' * 200 + '</html>')
+    httpd = PooledHTTPServer(('127.0.0.1', 0), MyHTTPRequestHandler, max_workers=2)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1], tmp_path
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(port, path, **headers):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_not_modified_since():
+    mtime = 1_700_000_000.7
+    assert not_modified_since(email.utils.formatdate(mtime, usegmt=True), mtime)
+    assert not_modified_since(email.utils.formatdate(mtime + 60, usegmt=True), mtime)
+    assert not not_modified_since(email.utils.formatdate(mtime - 60, usegmt=True), mtime)
+    assert not not_modified_since('not a date', mtime)
+
+
+def test_if_modified_since_gives_304(served):
+    port, _ = served
+    first, body = get(port, '/index.html')
+    assert first.status == 200 and body
+
+    response, body = get(port, '/index.html', **{'If-Modified-Since': first.getheader('Last-Modified')})
+    assert response.status == 304 and body == b''
+
+
+def test_if_none_match_takes_precedence(served):
+    port, _ = served
+    first, _ = get(port, '/index.html')
+    response, _ = get(port, '/index.html', **{
+        'If-None-Match': '"something-else"',
+        'If-Modified-Since': first.getheader('Last-Modified'),
+    })
+    assert response.status == 200
+
+    response, _ = get(port, '/index.html', **{'If-None-Match': first.getheader('ETag')})
+    assert response.status == 304
+
+
+def test_asset_cache_evicts_least_recently_used(tmp_path):
+    for name in 'abc':
+        (tmp_path / name).write_bytes(bytes(1000))
+    cache = AssetCache(max_bytes=2500)
+    for name in 'abc':
+        cache.get(str(tmp_path / name), 'application/octet-stream')
+        if name == 'b':
+            cache.get(str(tmp_path / 'a'), 'application/octet-stream')
+
+    assert list(cache.assets) == [str(tmp_path / 'a'), str(tmp_path / 'c')]
+    assert cache.total == 2000
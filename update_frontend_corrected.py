@@ -4,7 +4,8 @@ Based on create_proper_mapping.py logic but using CORRECTED_METHOD1_summary.xlsx
 """
 
 import pandas as pd
-import json
+
+from compact_publish import save_frontend_data
 
 # Read the Excel file with categories
 df = pd.read_excel('data/NIFTY_Index_Short_Names.xlsx')
@@ -168,9 +169,8 @@ if unmatched:
     for item in unmatched[:10]:
         print(f"  - {item}")
 
-# Save the new data structure
-with open('data/indices_with_short_names.json', 'w') as f:
-    json.dump(new_data, f, indent=2)
+# Save the new data structure (and the compact copy the page loads first)
+save_frontend_data(new_data)
 
 print(f"\nSaved {len(new_data)} indices")
 
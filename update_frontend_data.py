@@ -6,6 +6,8 @@ import pandas as pd
 import json
 from pathlib import Path
 
+from compact_publish import save_frontend_data
+
 def main():
     print("="*80)
     print("UPDATING FRONTEND WITH CORRECTED VALUES")
@@ -81,12 +83,10 @@ def main():
     
     updated_data.sort(key=lambda x: (category_order.get(x['category'], 5), -x['percentile']))
     
-    # Save updated JSON
-    output_file = Path('data/indices_with_short_names.json')
-    with open(output_file, 'w') as f:
-        json.dump(updated_data, f, indent=2)
+    # Save updated JSON (and the compact copy the page loads first)
+    output_file, compact_file = save_frontend_data(updated_data)
     
-    print(f"\n✓ Saved {len(updated_data)} indices to: {output_file}")
+    print(f"\n✓ Saved {len(updated_data)} indices to: {output_file} (+ {compact_file})")
     
     # Show sample from each category
     print("\n" + "="*80)
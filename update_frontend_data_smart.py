@@ -2,75 +2,13 @@
 Update frontend data with corrected values using proper name mapping
 """
 
-import pandas as pd
 import json
 from pathlib import Path
 
-def create_csv_to_excel_mapping():
-    """Create mapping from CSV column names to Excel names"""
-    # Common patterns
-    mapping = {
-        # Exact matches for special cases
-        'NIFTY 50': 'tri - Nifty 50',
-        'NIFTY NEXT 50': 'tri - Nifty Next 50',
-        'NIFTY 100': 'tri - Nifty 100',
-        'NIFTY 200': 'tri - Nifty 200',
-        'NIFTY 500': 'tri - Nifty 500',
-        'NIFTY MIDCAP 50': 'tri - Nifty Midcap 50',
-        'NIFTY MIDCAP 100': 'tri - Nifty Midcap 100',
-        'NIFTY MIDCAP 150': 'tri - Nifty Midcap 150',
-        'NIFTY SMLCAP 50': 'tri - Nifty Smallcap 50',
-        'NIFTY SMLCAP 100': 'tri - Nifty Smallcap 100',
-        'NIFTY SMLCAP 250': 'tri - Nifty Smallcap 250',
-        'NIFTY IT': 'tri - Nifty IT',
-        'NIFTY BANK': 'tri - Nifty Bank',
-        'NIFTY AUTO': 'tri - Nifty Auto',
-        'NIFTY FINANCIAL SERVICES': 'tri - Nifty Financial Services',
-        'NIFTY FMCG': 'tri - Nifty FMCG',
-        'NIFTY METAL': 'tri - Nifty Metal',
-        'NIFTY PHARMA': 'tri - Nifty Pharma',
-        'NIFTY PSU BANK': 'tri - Nifty PSU Bank',
-        'NIFTY REALTY': 'tri - Nifty Realty',
-        'NIFTY PRIVATE BANK': 'tri - Nifty Private Bank',
-        'NIFTY CPSE': 'tri - Nifty CPSE',
-        'NIFTY ENERGY': 'tri - Nifty Energy',
-        'NIFTY INFRA': 'tri - Nifty Infra',
-        'NIFTY COMMODITIES': 'tri - Nifty Commodities',
-        'NIFTY CONSUMPTION': 'tri - Nifty Consumption',
-        'NIFTY DIVIDEND OPPORTUNITIES 50': 'tri - Nifty Dividend Opportunities 50',
-        'NIFTY50 VALUE 20': 'tri - Nifty50 Value 20',
-        'NIFTY ALPHA 50': 'tri - Nifty Alpha 50',
-        'NIFTY HIGH BETA 50': 'tri - Nifty High Beta 50',
-        'NIFTY LOW VOLATILITY 50': 'tri - Nifty Low Volatility 50',
-        'NIFTY100 QUALITY 30': 'tri - Nifty100 Quality 30',
-        'NIFTY MIDCAP LIQUID 15': 'tri - Nifty Midcap Liquid 15',
-        'NIFTY HEALTHCARE INDEX': 'tri - Nifty Healthcare',
-        'NIFTY CONSUMER DURABLES': 'tri - Nifty Consumer Durables',
-        'NIFTY OIL & GAS': 'tri - Nifty Oil & Gas',
-        'NIFTY MNC': 'tri - Nifty MNC',
-        'NIFTY MEDIA': 'tri - Nifty Media',
-        'NIFTY PSE': 'tri - Nifty PSE',
-        'NIFTY500 SHARIAH': 'tri - Nifty500 Shariah',
-        'NIFTY50 SHARIAH': 'tri - Nifty50 Shariah',
-        'NIFTY CHEMICALS': 'tri - Nifty Chemicals',
-        'NIFTY TOP 10 EQUAL WEIGHT': 'tri - Nifty Top 10 Equal Weight',
-        'NIFTY100 LIQUID 15': 'tri - Nifty100 Liquid 15',
-        'NIFTY500 VALUE 50': 'tri - Nifty500 Value 50',
-        'Nifty200 Value 30': 'tri - Nifty200 Value 30',
-        'NIFTY INDIA CORPORATE GROUP INDEX - TATA GROUP': 'tri - Nifty India Corporate Group Index - Tata Group',
-        'Nifty MidSmall Financial Services': 'tri - Nifty MidSmall Financial Services',
-        'Nifty Financial Services Ex Bank': 'tri - Nifty Financial Services Ex Bank',
-        'KOTAK GOLD': 'tri - Kotak Gold',
-        'UTI FLEX': 'tri - UTI Nifty 50 Arbitrage Fund',
-        'NIFTY 10 YR BENCHMARK G-SEC': 'tri - Nifty 10 yr Benchmark G-Sec',
-        'NIFTY 10 YR BENCHMARK G-SEC.1': 'tri - Nifty 10 yr Benchmark G-Sec (Clean Price)',
-    }
-    
-    return mapping
-
-def normalize_name(name):
-    """Normalize name for fuzzy matching"""
-    return name.upper().replace('TRI - ', '').replace('-', ' ').strip()
+from compact_publish import save_frontend_data
+from excel_stream import summary_values
+from name_matcher import NameMatcher
+from name_registry import load_registry
 
 def main():
     print("="*80)
@@ -80,9 +18,8 @@ def main():
     
     # Load corrected values
     corrected_file = Path('data/CORRECTED_METHOD1_summary.xlsx')
-    df_corrected = pd.read_excel(corrected_file)
-    df_corrected.columns = ['Index', 'Percentile']
-    print(f"✓ Loaded {len(df_corrected)} corrected values")
+    corrected = summary_values(corrected_file)
+    print(f"✓ Loaded {len(corrected)} corrected values")
     
     # Load existing mapping
     mapping_file = Path('data/indices_with_short_names.json')
@@ -90,62 +27,65 @@ def main():
         existing_data = json.load(f)
     print(f"✓ Loaded {len(existing_data)} existing mappings")
     
-    # Create name mappings
-    csv_to_excel = create_csv_to_excel_mapping()
+    # Every CSV / Excel / display spelling resolves through data/index_aliases.json
+    registry = load_registry()
     
-    # Create lookup from existing data
+    # Index the existing entries by canonical ID (or their own name if the
+    # registry does not know them yet)
     existing_lookup = {}
     for item in existing_data:
-        existing_lookup[item['fullName']] = {
-            'displayName': item['displayName'],
-            'category': item['category']
-        }
-    
-    # Also create normalized lookup for fuzzy matching
-    normalized_lookup = {}
-    for item in existing_data:
-        norm_name = normalize_name(item['fullName'])
-        normalized_lookup[norm_name] = item['fullName']
+        index_id = registry.resolve(item['fullName']) or registry.resolve(item['displayName'])
+        existing_lookup.setdefault(index_id or item['fullName'], item)
+    
+    # Fuzzy fallback over every known name of the existing entries
+    matcher = NameMatcher()
+    for key, item in existing_lookup.items():
+        names = [item['fullName'], item['displayName']]
+        if key in registry.records:
+            names.extend(registry.names(registry.records[key]))
+        for name in names:
+            matcher.add(key, name)
     
     # Merge data
     updated_data = []
-    matched_exact = 0
-    matched_fuzzy = 0
     unmatched = []
+    fuzzy_matched = []
+    ambiguous = []
     
-    for _, row in df_corrected.iterrows():
-        csv_name = row['Index']
-        percentile = row['Percentile']
+    for csv_name, percentile in corrected.items():
         
-        # Try exact mapping first
-        excel_name = csv_to_excel.get(csv_name)
+        # Names the registry already knows are never guessed at
+        key = registry.resolve(csv_name)
+        if key is None:
+            key = matcher.best(csv_name, rejected=ambiguous)
+            if key is not None:
+                score = matcher.match(csv_name, limit=1)[0][1]
+                fuzzy_matched.append((csv_name, existing_lookup[key]['displayName'], score))
         
-        if excel_name and excel_name in existing_lookup:
+        item = existing_lookup.get(key)
+        if item is not None:
             updated_data.append({
-                'fullName': excel_name,
-                'displayName': existing_lookup[excel_name]['displayName'],
+                'fullName': item['fullName'],
+                'displayName': item['displayName'],
                 'percentile': round(percentile, 6),
-                'category': existing_lookup[excel_name]['category']
+                'category': item['category']
             })
-            matched_exact += 1
         else:
-            # Try fuzzy matching
-            norm_csv = normalize_name(csv_name)
-            if norm_csv in normalized_lookup:
-                matched_excel_name = normalized_lookup[norm_csv]
-                updated_data.append({
-                    'fullName': matched_excel_name,
-                    'displayName': existing_lookup[matched_excel_name]['displayName'],
-                    'percentile': round(percentile, 6),
-                    'category': existing_lookup[matched_excel_name]['category']
-                })
-                matched_fuzzy += 1
-            else:
-                unmatched.append(csv_name)
-    
-    print(f"\n✓ Matched {matched_exact} exactly")
-    print(f"✓ Matched {matched_fuzzy} via fuzzy matching")
-    print(f"✓ Total matched: {len(updated_data)}/{len(df_corrected)}")
+            unmatched.append(csv_name)
+    
+    print(f"\n✓ Total matched: {len(updated_data)}/{len(corrected)}")
+    
+    if fuzzy_matched:
+        print(f"\n~ {len(fuzzy_matched)} matched by fuzzy name search (add them to data/index_aliases.json):")
+        for csv_name, display_name, score in fuzzy_matched:
+            print(f"   - {csv_name} -> {display_name} (score {score:.2f})")
+    
+    if ambiguous:
+        print(f"\n⚠ {len(ambiguous)} names close to more than one index, left unmatched "
+              f"(add the right one to data/index_aliases.json):")
+        for csv_name, candidates in ambiguous:
+            options = ', '.join(f"{existing_lookup[key]['displayName']} ({score:.2f})" for key, score, _ in candidates)
+            print(f"   - {csv_name}: {options}")
     
     if unmatched:
         print(f"\n⚠ {len(unmatched)} indices not matched:")
@@ -164,12 +104,10 @@ def main():
     
     updated_data.sort(key=lambda x: (category_order.get(x['category'], 5), -x['percentile']))
     
-    # Save updated JSON
-    output_file = Path('data/indices_with_short_names.json')
-    with open(output_file, 'w') as f:
-        json.dump(updated_data, f, indent=2)
+    # Save updated JSON (and the compact copy the page loads first)
+    output_file, compact_file = save_frontend_data(updated_data)
     
-    print(f"\n✓ Saved {len(updated_data)} indices to: {output_file}")
+    print(f"\n✓ Saved {len(updated_data)} indices to: {output_file} (+ {compact_file})")
     
     # Statistics by category
     print("\n" + "="*80)
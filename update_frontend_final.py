@@ -3,113 +3,115 @@ Update frontend data by loading full mapping from Excel file
 """
 
 import pandas as pd
-import json
 from pathlib import Path
 
-def create_csv_to_excel_mapping():
-    """Load the full mapping from create_proper_mapping.py logic"""
-    exact_mappings = {
-        'Nifty50 Shariah': 'NIFTY50 SHARIAH',
-        'Nifty500 Shariah': 'NIFTY500 SHARIAH',
-        'Nifty LargeMidcap 250': 'NIFTY LARGEMIDCAP 250',
-        'Nifty Midcap150 Quality 50': 'NIFTY MIDCAP150 QUALITY 50',
-        'Nifty50 Value 20': 'NIFTY50 VALUE 20',
-        'Nifty50 Equal Weight': 'NIFTY50 EQUAL WEIGHT',
-        'Nifty100 Quality 30': 'NIFTY100 QUALITY 30',
-        'Nifty100 Equal Weight': 'NIFTY100 EQUAL WEIGHT',
-        'Nifty Midcap50': 'NIFTY MIDCAP 50',
-        'Nifty Midcap 100': 'NIFTY MIDCAP 100',
-        'Nifty Midcap 150': 'NIFTY MIDCAP 150',
-        'Nifty Smallcap50': 'NIFTY SMLCAP 50',
-        'Nifty Smallcap 100': 'NIFTY SMLCAP 100',
-        'Nifty Smallcap 250': 'NIFTY SMLCAP 250',
-        'Nifty Midsmallcap 400': 'NIFTY MIDSMALLCAP 400',
-        'Nifty Auto': 'NIFTY AUTO',
-        'Nifty Bank': 'NIFTY BANK',
-        'Nifty Energy': 'NIFTY ENERGY',
-        'Nifty Financial Services': 'NIFTY FINANCIAL SERVICES',
-        'Nifty FMCG': 'NIFTY FMCG',
-        'Nifty IT': 'NIFTY IT',
-        'Nifty Media': 'NIFTY MEDIA',
-        'Nifty Metal': 'NIFTY METAL',
-        'Nifty Pharma': 'NIFTY PHARMA',
-        'Nifty PSU Bank': 'NIFTY PSU BANK',
-        'Nifty Private Bank': 'NIFTY PRIVATE BANK',
-        'Nifty Realty': 'NIFTY REALTY',
-        'Nifty Healthcare': 'NIFTY HEALTHCARE INDEX',
-        'Nifty Consumer Durables': 'NIFTY CONSUMER DURABLES',
-        'Nifty Oil & Gas': 'NIFTY OIL & GAS',
-        'Nifty Commodities': 'NIFTY COMMODITIES',
-        'Nifty Consumption': 'NIFTY CONSUMPTION',
-        'Nifty CPSE': 'NIFTY CPSE',
-        'Nifty Infra': 'NIFTY INFRA',
-        'Nifty MNC': 'NIFTY MNC',
-        'Nifty PSE': 'NIFTY PSE',
-        'Nifty Alpha 50': 'NIFTY ALPHA 50',
-        'Nifty High Beta 50': 'NIFTY HIGH BETA 50',
-        'Nifty Low Volatility 50': 'NIFTY LOW VOLATILITY 50',
-        'Nifty Dividend Opportunities 50': 'NIFTY DIVIDEND OPPORTUNITIES 50',
-        'Nifty Midcap Liquid 15': 'NIFTY MIDCAP LIQUID 15',
-        'Nifty200 Momentum 30': 'NIFTY200 MOMENTUM 30',
-        'Nifty400 Multicap': 'NIFTY400 MULTICAP',
-        'Nifty Top 10 Equal Weight': 'NIFTY TOP 10 EQUAL WEIGHT',
-        'Nifty100 Liquid 15': 'NIFTY100 LIQUID 15',
-        'Nifty500 Value 50': 'NIFTY500 VALUE 50',
-        'Nifty500 Multicap 50:25:25': 'NIFTY500 MULTICAP 50:25:25',
-        'Nifty Microcap 250': 'NIFTY MICROCAP 250',
-        'Nifty Total Market': 'NIFTY TOTAL MARKET',
-        'Nifty100 Low Volatility 30': 'NIFTY100 LOW VOLATILITY 30',
-        'Nifty India Defence': 'Nifty India Defence',
-        'Nifty Rural': 'Nifty Rural',
-        'Nifty Housing': 'Nifty Housing',
-        'Nifty Transportation & Logistics': 'Nifty Transportation & Logistics',
-        'Nifty MidSmall Healthcare': 'Nifty MidSmall Healthcare',
-        'Nifty MidSmall IT & Telecom': 'Nifty MidSmall IT & Telecom',
-        'Nifty MidSmall Financial Services': 'Nifty MidSmall Financial Services',
-        'Nifty MidSmall India Consumption': 'Nifty MidSmall India Consumption',
-        'Nifty Financial Services Ex Bank': 'Nifty Financial Services Ex Bank',
-        'Nifty200 Value 30': 'Nifty200 Value 30',
-        'Nifty Mobility': 'Nifty Mobility',
-        'Nifty India Manufacturing': 'Nifty India Manufacturing',
-        'Nifty Non-Cyclical Consumer': 'Nifty Non-Cyclical Consumer',
-        'Nifty Core Housing': 'Nifty Core Housing',
-        'Nifty100 ESG': 'NIFTY100 ESG',
-        'Nifty India Corporate Group Index - Tata Group': 'NIFTY INDIA CORPORATE GROUP INDEX - TATA GROUP',
-        'Nifty Chemicals': 'NIFTY CHEMICALS',
-        'UTI Nifty 50 Arbitrage Fund': 'UTI FLEX',
-        'Kotak Gold': 'KOTAK GOLD',
-        'Nifty 10 yr Benchmark G-Sec': 'NIFTY 10 YR BENCHMARK G-SEC',
-        'Nifty 10 yr Benchmark G-Sec (Clean Price)': 'NIFTY 10 YR BENCHMARK G-SEC.1',
-    }
-    return exact_mappings
+from compact_publish import save_frontend_data
+from excel_stream import summary_categories, summary_values
+from name_registry import load_registry
 
 def load_excel_categories():
-    """Load categories from Excel file"""
+    """Load categories from the section rows of the Excel summary"""
     excel_file = Path('data/251229_Final_summary.xlsx')
     if not excel_file.exists():
         return {}
+    return summary_categories(excel_file)
+
+def load_horizon_summary():
+    """Load the 1Y/3Y/5Y/10Y percentiles from calculate_corrected_method.py, if present"""
+    horizon_file = Path('data/MULTI_HORIZON_summary.xlsx')
+    if not horizon_file.exists():
+        return {}
     
-    df = pd.read_excel(excel_file, skiprows=1)
+    return horizons_from_frame(pd.read_excel(horizon_file, index_col=0))
+
+def load_cross_section_summary():
+    """Load the vs-all / vs-category percentiles from calculate_corrected_method.py, if present"""
+    cross_section_file = Path('data/CROSS_SECTIONAL_summary.xlsx')
+    if not cross_section_file.exists():
+        return {}
     
-    categories = {}
-    current_category = None
+    return cross_section_from_frame(pd.read_excel(cross_section_file, index_col=0))
+
+def cross_section_from_frame(df):
+    """{csv_name: {'all': ..., 'category': ...}} from a cross-sectional summary table"""
+    names = {'all_indices': 'all', 'category': 'category'}
+    cross_section = {}
+    for csv_name, row in df.iterrows():
+        cross_section[csv_name] = {
+            names[column]: round(float(value), 6)
+            for column, value in row.items()
+            if column in names and pd.notna(value)
+        }
+    return cross_section
+
+def horizons_from_frame(df):
+    """{csv_name: {'1Y': ..., '3Y': ...}} from a multi-horizon summary table"""
+    horizons = {}
+    for csv_name, row in df.iterrows():
+        horizons[csv_name] = {
+            horizon: round(float(value), 6)
+            for horizon, value in row.items()
+            if pd.notna(value)
+        }
+    return horizons
+
+def build_frontend_data(corrected, categories, horizons, registry, cross_section=None):
+    """
+    Heatmap entries for indices_with_short_names.json.
+    
+    Args:
+        corrected: {csv_name: latest-month percentile}
+        categories: {index name: category} from the Excel sections
+        horizons: {csv_name: {'1Y': ..., ...}} (may be empty)
+        registry: NameRegistry for CSV -> Excel / display names
+        cross_section: {csv_name: {'all': ..., 'category': ...}} ranks
+            against the other indices (optional)
+    
+    Returns:
+        Tuple of (entries sorted by category then percentile descending,
+        list of (csv_name, display_name, excel_name) with no category)
+    """
+    categories = {registry.resolve(name) or name: category for name, category in categories.items()}
     
-    for _, row in df.iterrows():
-        symbol = str(row.iloc[0]).strip() if pd.notna(row.iloc[0]) else ''
+    updated_data = []
+    unmatched = []
+    
+    for csv_name, percentile in corrected.items():
+        
+        # Find Excel name ("tri - " prefixed) and the name to display
+        excel_name = registry.field(csv_name, 'display', csv_name)
+        excel_lookup_name = registry.field(csv_name, 'excel', f"tri - {excel_name}")
         
-        if symbol in ['Broad Market Indices', 'Sectoral Indices', 'Strategy Indices', 'Thematic Indices']:
-            if 'Broad' in symbol:
-                current_category = 'Broad Market'
-            elif 'Sectoral' in symbol:
-                current_category = 'Sectoral'
-            elif 'Strategy' in symbol:
-                current_category = 'Strategy'
-            elif 'Thematic' in symbol:
-                current_category = 'Thematic'
-        elif symbol and current_category and symbol not in ['Broad Market Indices', 'Sectoral Indices', 'Strategy Indices', 'Thematic Indices']:
-            categories[symbol] = current_category
-    
-    return categories
+        # Get category (Excel sections first, then the registry's own category)
+        index_id = registry.resolve(csv_name)
+        category = categories.get(index_id) or registry.field(csv_name, 'category')
+        
+        if category:
+            # Use Excel name as display name (without "tri - " prefix)
+            item = {
+                'fullName': excel_lookup_name,
+                'displayName': excel_name,
+                'percentile': round(percentile, 6),
+                'category': category
+            }
+            if csv_name in horizons:
+                item['horizons'] = horizons[csv_name]
+            if cross_section and cross_section.get(csv_name):
+                item['crossSection'] = cross_section[csv_name]
+            updated_data.append(item)
+        else:
+            unmatched.append((csv_name, excel_name, excel_lookup_name))
+    
+    # Sort by category and percentile
+    category_order = {
+        'Broad Market': 1,
+        'Sectoral': 2,
+        'Strategy': 3,
+        'Thematic': 4
+    }
+    
+    updated_data.sort(key=lambda x: (category_order.get(x['category'], 5), -x['percentile']))
+    return updated_data, unmatched
 
 def main():
     print("="*80)
@@ -119,49 +121,33 @@ def main():
     
     # Load corrected values
     corrected_file = Path('data/CORRECTED_METHOD1_summary.xlsx')
-    df_corrected = pd.read_excel(corrected_file)
-    df_corrected.columns = ['Index', 'Percentile']
-    print(f"✓ Loaded {len(df_corrected)} corrected values")
+    corrected = summary_values(corrected_file)
+    print(f"✓ Loaded {len(corrected)} corrected values")
     
     # Load Excel categories
     categories = load_excel_categories()
     print(f"✓ Loaded {len(categories)} categories from Excel")
     
-    # Create CSV to Excel mapping
-    excel_to_csv = create_csv_to_excel_mapping()
-    csv_to_excel = {v: k for k, v in excel_to_csv.items()}
+    # Load multi-horizon percentiles (optional extra fields)
+    horizons = load_horizon_summary()
+    if horizons:
+        print(f"✓ Loaded multi-horizon values for {len(horizons)} indices")
     
-    # Create updated data
-    updated_data = []
-    matched = 0
-    unmatched = []
+    # Rank against the other indices on the same day (optional extra fields)
+    cross_section = load_cross_section_summary()
+    if cross_section:
+        print(f"✓ Loaded cross-sectional values for {len(cross_section)} indices")
     
-    for _, row in df_corrected.iterrows():
-        csv_name = row['Index']
-        percentile = row['Percentile']
-        
-        # Find Excel name
-        excel_name = csv_to_excel.get(csv_name, csv_name)
-        
-        # Add "tri - " prefix for category lookup
-        excel_lookup_name = f"tri - {excel_name}"
-        
-        # Get category
-        category = categories.get(excel_lookup_name)
-        
-        if category:
-            # Use Excel name as display name (without "tri - " prefix)
-            updated_data.append({
-                'fullName': excel_lookup_name,
-                'displayName': excel_name,
-                'percentile': round(percentile, 6),
-                'category': category
-            })
-            matched += 1
-        else:
-            unmatched.append((csv_name, excel_name, excel_lookup_name))
+    # CSV -> Excel / display names come from data/index_aliases.json
+    registry = load_registry()
+    print(f"✓ Loaded {len(registry)} indices from the name registry")
+    
+    # Create updated data
+    updated_data, unmatched = build_frontend_data(
+        corrected, categories, horizons, registry, cross_section
+    )
     
-    print(f"\n✓ Matched {matched}/{len(df_corrected)} indices")
+    print(f"\n✓ Matched {len(updated_data)}/{len(corrected)} indices")
     
     if unmatched:
         print(f"\n⚠ {len(unmatched)} indices not matched:")
@@ -173,22 +159,13 @@ def main():
         if len(unmatched) > 10:
             print(f"   ... and {len(unmatched) - 10} more")
     
-    # Sort by category and percentile
-    category_order = {
-        'Broad Market': 1,
-        'Sectoral': 2,
-        'Strategy': 3,
-        'Thematic': 4
-    }
-    
-    updated_data.sort(key=lambda x: (category_order.get(x['category'], 5), -x['percentile']))
-    
-    # Save updated JSON
-    output_file = Path('data/indices_with_short_names.json')
-    with open(output_file, 'w') as f:
-        json.dump(updated_data, f, indent=2)
+    # Save updated JSON and the same entries in the columnar format
+    # loadData() fetches first
+    output_file, compact_file = save_frontend_data(updated_data)
     
     print(f"\n✓ Saved {len(updated_data)} indices to: {output_file}")
+    print(f"✓ Saved compact copy to: {compact_file} "
+          f"({compact_file.stat().st_size:,} vs {output_file.stat().st_size:,} bytes)")
     
     # Statistics by category
     print("\n" + "="*80)